@@ -0,0 +1,124 @@
+"""
+Сравнение пула потоков и пула процессов на одном наборе документов.
+
+Запуск в контейнере из `/app`:
+
+    python -m benchmarks.bench_backends --folder /app/data/bench --key /app/src/sign/keys/stas.jks --password ...
+
+Без нативной библиотеки и ключа - на фиктивном бэкенде и сгенерированных файлах:
+
+    python -m benchmarks.bench_backends --signer fake --generate 2000 --fake-latency 0.05
+
+С локальной заглушкой OCSP/TSP, которая отвечает с задержкой сети (без выхода в сеть;
+только с фиктивным бэкендом - EUSignCP отвергнет записанные ответы TSP):
+
+    python -m benchmarks.bench_backends --signer fake --generate 2000 --standin-latency 0.2
+
+Каждый прогон работает на свежей копии папки, поэтому .p7s от предыдущих
+прогонов не влияют на результат.
+"""
+import time
+import shutil
+import logging
+import argparse
+import tempfile
+from pathlib import Path
+
+from src.sign.thread_signer import BatchSigner
+from src.sign.validation_proxy import ValidationProxyConfig
+
+
+def generate_documents(
+    folder: Path,
+    count: int,
+    size: int = 64 * 1024,
+    per_folder: int = 20
+):
+    """Сгенерировать `count` псевдо-PDF по `per_folder` в подпапке"""
+    payload = b"%PDF-1.4\n" + b"0" * size
+    for i in range(count):
+        claim_dir = folder / f"claim_{i // per_folder:05d}"
+        claim_dir.mkdir(parents=True, exist_ok=True)
+        (claim_dir / f"doc_{i:06d}.pdf").write_bytes(payload + str(i).encode())
+
+
+def run_once(
+    folder: Path,
+    args: argparse.Namespace,
+    backend: str,
+    workers: int
+) -> tuple[int, int, float]:
+    """Один прогон: (успешно, всего, секунд)"""
+    with tempfile.TemporaryDirectory() as tmp:
+        work_dir = Path(tmp) / folder.name
+        shutil.copytree(folder, work_dir)
+
+        signer = BatchSigner(
+            key_file_path=args.key or "",
+            cert_file_path=args.cert,
+            is_sign_long_type=not args.bes,
+            max_attempts=1,
+            max_workers=workers,
+            extensions=['.pdf', '.xml'],
+            execution_backend=backend,
+            signer_backend=args.signer,
+            fake_latency=args.fake_latency,
+            fake_failure_rate=args.fake_failure_rate,
+            validation_proxy=(
+                ValidationProxyConfig(offline=True, latency=args.standin_latency)
+                if args.standin_latency is not None else None
+            )
+        )
+
+        start = time.perf_counter()
+        summary = signer.sign_documents_batch(work_dir, args.password or "")
+        elapsed = time.perf_counter() - start
+
+    return summary.successful, summary.total, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Threads vs processes signing benchmark")
+    parser.add_argument("--folder", default=None, help="Папка с документами для прогона")
+    parser.add_argument("--generate", type=int, default=0, help="Сгенерировать N документов вместо --folder")
+    parser.add_argument("--signer", default="eusign", choices=["eusign", "fake"], help="Бэкенд подписи")
+    parser.add_argument("--fake-latency", type=float, default=0.0, help="Задержка фиктивного бэкенда, с")
+    parser.add_argument("--fake-failure-rate", type=float, default=0.0, help="Доля ошибок фиктивного бэкенда")
+    parser.add_argument("--standin-latency", type=float, default=None, help="Локальная заглушка OCSP/TSP с задержкой, с (только --signer fake)")
+    parser.add_argument("--key", default=None, help="Файл ключа")
+    parser.add_argument("--cert", default=None, help="Файл сертификата")
+    parser.add_argument("--password", default=None, help="Пароль ключа")
+    parser.add_argument("--workers", default="1,2,4,8,16", help="Количество воркеров через запятую")
+    parser.add_argument("--backends", default="thread,process", help="Бэкенды через запятую")
+    parser.add_argument("--bes", action="store_true", help="CAdES-BES вместо CAdES-X Long")
+    args = parser.parse_args()
+
+    if args.signer == "eusign" and not (args.key and args.password):
+        parser.error("--key and --password are required for the eusign backend")
+    if not args.folder and not args.generate:
+        parser.error("either --folder or --generate is required")
+    if args.standin_latency is not None and args.signer != "fake":
+        parser.error("--standin-latency works only with --signer fake")
+
+    logging.basicConfig(level=logging.WARNING)
+
+    workers_list = [int(w) for w in args.workers.split(",")]
+    backends = args.backends.split(",")
+
+    with tempfile.TemporaryDirectory() as source_tmp:
+        if args.generate:
+            folder = Path(source_tmp) / "generated"
+            generate_documents(folder, args.generate)
+        else:
+            folder = Path(args.folder)
+
+        print(f"{'backend':<10}{'workers':>8}{'ok/total':>12}{'seconds':>10}{'files/s':>10}")
+        for backend in backends:
+            for workers in workers_list:
+                ok, total, elapsed = run_once(folder, args, backend, workers)
+                rate = total / elapsed if elapsed else 0.0
+                print(f"{backend:<10}{workers:>8}{f'{ok}/{total}':>12}{elapsed:>10.2f}{rate:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
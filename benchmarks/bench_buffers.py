@@ -0,0 +1,94 @@
+"""
+Сколько байт копируется в память Python на каждый подписанный мегабайт:
+чтение файла в `bytes` против передачи через mmap.
+
+Без нативной библиотеки - на фиктивном бэкенде (SHA-256 по тому же буферу):
+
+    python -m benchmarks.bench_buffers --signer fake --sizes 1,16,64
+
+С EUSignCP (в контейнере из `/app`):
+
+    python -m benchmarks.bench_buffers --key /app/src/sign/keys/stas.jks --password ... --bes
+
+`copied/MB` - байт, скопированных в объекты Python на 1 МБ подписанных данных
+(1 МБ при чтении в bytes, 0 при mmap, если обёртка принимает буферы).
+`peak/MB` - пик аллокаций Python (tracemalloc) на 1 МБ самого большого файла.
+Копии внутри нативной библиотеки этим не видны.
+"""
+import time
+import logging
+import argparse
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+from src.sign.model import SignTask, SignerConfig
+from src.sign.backends import create_backend
+from src.sign.buffers import copy_stats
+
+MB = 1024 * 1024
+
+
+def run_mode(
+    files: list[Path],
+    args: argparse.Namespace,
+    zero_copy: bool
+) -> tuple[float, float, float, int]:
+    """(секунд, скопировано байт на МБ, пик аллокаций на МБ, fallback-ов)"""
+    config = SignerConfig(
+        key_file_path=Path(args.key or ""),
+        is_sign_long_type=not args.bes,
+        signer_backend=args.signer,
+        zero_copy_input=zero_copy,
+        write_behind=False
+    )
+    backend = create_backend(config)
+    copy_stats.reset()
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        for path in files:
+            backend.sign(SignTask(file_path=str(path), key_password=args.password or ""))
+    finally:
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        backend.close()
+
+    largest_mb = max(path.stat().st_size for path in files) / MB
+    return elapsed, copy_stats.copied_per_mb, peak / largest_mb, copy_stats.fallbacks
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bytes copied per signed MB: read() vs mmap")
+    parser.add_argument("--signer", default="eusign", choices=["eusign", "fake"], help="Бэкенд подписи")
+    parser.add_argument("--sizes", default="1,16,64", help="Размеры файлов в МБ через запятую")
+    parser.add_argument("--files", type=int, default=3, help="Файлов каждого размера")
+    parser.add_argument("--key", default=None, help="Файл ключа")
+    parser.add_argument("--password", default=None, help="Пароль ключа")
+    parser.add_argument("--bes", action="store_true", help="CAdES-BES вместо CAdES-X Long")
+    args = parser.parse_args()
+
+    if args.signer == "eusign" and not (args.key and args.password):
+        parser.error("--key and --password are required for the eusign backend")
+
+    logging.basicConfig(level=logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"{'size MB':>8}{'mode':>11}{'seconds':>10}{'copied/MB':>12}{'peak/MB':>12}{'fallbacks':>11}")
+        for size in (int(s) for s in args.sizes.split(",")):
+            files = []
+            for i in range(args.files):
+                path = Path(tmp) / f"doc_{size}mb_{i}.pdf"
+                path.write_bytes(b"%PDF-1.4\n" + bytes([i % 256]) * (size * MB))
+                files.append(path)
+
+            for zero_copy in (False, True):
+                elapsed, copied, peak, fallbacks = run_mode(files, args, zero_copy)
+                mode = "mmap" if zero_copy else "read"
+                print(f"{size:>8}{mode:>11}{elapsed:>10.2f}{copied:>12.0f}{peak:>12.0f}{fallbacks:>11}")
+
+
+if __name__ == "__main__":
+    main()
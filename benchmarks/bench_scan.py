@@ -0,0 +1,93 @@
+"""
+Время обхода дерева сканером: чтение папок в одном потоке против пула.
+
+Синтетическое дерево из 50 000 папок (по 2 документа в каждой):
+
+    python -m benchmarks.bench_scan --generate 50000 --workers 1,4,8,16
+
+Задержка сетевого диска (SMB/bind mount с хоста Windows) имитируется паузой
+на каждый `os.scandir` - локальный диск отвечает быстрее, чем обход успевает
+выиграть от потоков:
+
+    python -m benchmarks.bench_scan --generate 50000 --listing-latency 0.002
+
+На реальном дереве (в контейнере из `/app`):
+
+    python -m benchmarks.bench_scan --root /app/data/Projects --workers 1,8
+"""
+import os
+import time
+import logging
+import argparse
+import tempfile
+from pathlib import Path
+
+from src.sign.thread_signer import FileScanner
+
+
+def generate_tree(
+    root: Path,
+    folders: int,
+    files_per_folder: int
+):
+    """`folders` папок дел по 1000 в папке верхнего уровня"""
+    for i in range(folders):
+        folder = root / f"group_{i // 1000:03d}" / f"claim_{i:06d}"
+        folder.mkdir(parents=True)
+        for j in range(files_per_folder):
+            (folder / f"doc_{j}.pdf").write_bytes(b"%PDF-1.4\n")
+
+
+def with_latency(latency: float):
+    """Обернуть os.scandir паузой на каждый вызов"""
+    scandir = os.scandir
+
+    def delayed_scandir(path="."):
+        time.sleep(latency)
+        return scandir(path)
+
+    os.scandir = delayed_scandir
+
+
+def run(
+    root: Path,
+    workers: int
+) -> tuple[float, int, int]:
+    """(секунд, найдено файлов, папок)"""
+    scanner = FileScanner(['.pdf', '.xml'], scan_workers=workers)
+    start = time.perf_counter()
+    files = sum(1 for _ in scanner.iter_unsigned_files(root))
+    return time.perf_counter() - start, files, scanner.folders_scanned
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Folder scan: sequential vs parallel listing")
+    parser.add_argument("--root", default=None, help="Существующее дерево документов")
+    parser.add_argument("--generate", type=int, default=50000, help="Папок в синтетическом дереве")
+    parser.add_argument("--files", type=int, default=2, help="Документов в каждой папке")
+    parser.add_argument("--workers", default="1,4,8,16", help="Потоков чтения папок через запятую")
+    parser.add_argument("--listing-latency", type=float, default=0.0, help="Пауза на каждый os.scandir, сек")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.root:
+            root = Path(args.root)
+        else:
+            root = Path(tmp)
+            start = time.perf_counter()
+            generate_tree(root, args.generate, args.files)
+            print(f"Generated {args.generate} folders in {time.perf_counter() - start:.1f}s")
+
+        if args.listing_latency:
+            with_latency(args.listing_latency)
+
+        print(f"{'workers':>8}{'seconds':>10}{'files':>10}{'folders':>10}{'folders/s':>12}")
+        for workers in (int(w) for w in args.workers.split(",")):
+            elapsed, files, folders = run(root, workers)
+            print(f"{workers:>8}{elapsed:>10.2f}{files:>10}{folders:>10}{folders / elapsed:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
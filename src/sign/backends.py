@@ -0,0 +1,226 @@
+import time
+import random
+import hashlib
+import logging
+import threading
+import urllib.request
+from collections import defaultdict
+from typing import Optional, Protocol, runtime_checkable
+
+from src.sign.model import SignTask, SignerConfig
+from src.sign.metrics import StageTimer
+from src.sign.writer import SignatureWriter, write_atomic
+from src.sign.buffers import open_input_buffer, call_with_buffer
+from src.sign.retry import validation_step
+from src.sign.validation_proxy import get_validation_proxy
+
+# Префикс фиктивной подписи - чтобы её нельзя было спутать с настоящим .p7s
+FAKE_SIGNATURE_MAGIC = b"IITSIGN-FAKE-P7S\n"
+
+# Минимальный OCSPRequest с одним CertID - одинаковый для всех подписей,
+# как запрос статуса сертификата подписанта у настоящего бэкенда
+FAKE_OCSP_REQUEST = bytes.fromhex("300c300a3008300630040402abcd")
+
+
+@runtime_checkable
+class SignerBackend(Protocol):
+    """
+    Бэкенд, который создаёт внешнюю подпись файла.
+    `SignatureService` и `BatchOrchestrator` работают только через этот интерфейс.
+    """
+    
+    def load_certificate(self, password: Optional[str] = None) -> bool:
+        """Загрузить и проверить сертификат подписанта"""
+        ...
+    
+    def sign(self, task: SignTask, timer: Optional[StageTimer] = None) -> str:
+        """Подписать файл задачи, вернуть путь к созданному .p7s; этапы - в `timer`"""
+        ...
+    
+    def close(self) -> None:
+        """Освободить ресурсы бэкенда после пакета"""
+        ...
+
+
+@runtime_checkable
+class SignatureVerifier(Protocol):
+    """Проверка внешней подписи .p7s для документа"""
+    
+    def verify(self, file_path: str, signature_path: str) -> dict:
+        """Проверить подпись; вернуть сведения о подписанте или бросить исключение"""
+        ...
+    
+    def close(self) -> None:
+        ...
+
+
+class FakeSignerBackend:
+    """
+    Детерминированный бэкенд без нативной библиотеки и ключа.
+    
+    Читает файл и пишет .p7s, как настоящий, но вместо подписи кладёт SHA-256
+    содержимого. Задержка и доля ошибок настраиваются, решение об ошибке зависит
+    только от `seed`, пути файла и номера вызова - прогоны воспроизводимы.
+    
+    Если заданы `ocsp_url`/`tsp_url`, каждая подпись делает те же сетевые
+    запросы, что и CAdES-X Long (обычно к локальному `ValidationProxy`).
+    """
+    
+    def __init__(
+        self,
+        latency: float = 0.0,
+        failure_rate: float = 0.0,
+        seed: int = 0,
+        ocsp_url: Optional[str] = None,
+        tsp_url: Optional[str] = None,
+        writer: Optional[SignatureWriter] = None,
+        zero_copy: bool = True
+    ):
+        if not 0.0 <= failure_rate <= 1.0:
+            raise ValueError(f"failure_rate must be in [0, 1], got {failure_rate}")
+        
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.seed = seed
+        self.ocsp_url = ocsp_url
+        self.tsp_url = tsp_url
+        self.writer = writer
+        self.zero_copy = zero_copy
+        self._calls: defaultdict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+    
+    def load_certificate(
+        self,
+        password: Optional[str] = None
+    ) -> bool:
+        return True
+    
+    def _should_fail(
+        self,
+        file_path: str
+    ) -> bool:
+        with self._lock:
+            self._calls[file_path] += 1
+            call = self._calls[file_path]
+        
+        rng = random.Random(f"{self.seed}:{file_path}:{call}")
+        return rng.random() < self.failure_rate
+    
+    def _post(
+        self,
+        url: str,
+        body: bytes,
+        content_type: str
+    ):
+        request = urllib.request.Request(
+            url,
+            data=body,
+            headers={"Content-Type": content_type},
+            method="POST"
+        )
+        with urllib.request.urlopen(request, timeout=30) as response:
+            response.read()
+    
+    def sign(
+        self,
+        task: SignTask,
+        timer: Optional[StageTimer] = None
+    ) -> str:
+        timer = timer or StageTimer()
+        
+        # Хэширование - аналог передачи файла в CtxSignData, с тем же mmap
+        with timer.stage("read"), open_input_buffer(task.file_path, self.zero_copy) as data:
+            digest = call_with_buffer("sha256", hashlib.sha256, data)
+        
+        with timer.stage("sign"):
+            with validation_step("OCSP/TSP"):
+                if self.ocsp_url:
+                    self._post(self.ocsp_url, FAKE_OCSP_REQUEST, "application/ocsp-request")
+                if self.tsp_url:
+                    self._post(self.tsp_url, digest.digest(), "application/timestamp-query")
+            
+            if self.latency > 0:
+                time.sleep(self.latency)
+            
+            if self._should_fail(task.file_path):
+                raise RuntimeError(f"Fake signer failure for {task.file_path}")
+        
+        output_file = task.get_signature_path()
+        signature = FAKE_SIGNATURE_MAGIC + digest.hexdigest().encode()
+        with timer.stage("write"):
+            if self.writer is not None:
+                self.writer.submit(output_file, signature)
+            else:
+                write_atomic(output_file, signature)
+        
+        return output_file
+    
+    def verify(
+        self,
+        file_path: str,
+        signature_path: str
+    ) -> dict:
+        """Проверить фиктивную подпись: совпадает ли SHA-256 документа"""
+        digest = hashlib.sha256()
+        with open(file_path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(chunk)
+        
+        with open(signature_path, "rb") as f:
+            signature = f.read()
+        
+        if not signature.startswith(FAKE_SIGNATURE_MAGIC):
+            raise ValueError("Not a fake signature")
+        if signature[len(FAKE_SIGNATURE_MAGIC):] != digest.hexdigest().encode():
+            raise ValueError("Signature does not match document content")
+        
+        return {"pszSubjCN": "Fake signer"}
+    
+    def close(self):
+        pass
+
+
+def create_backend(
+    config: SignerConfig,
+    writer: Optional[SignatureWriter] = None
+) -> SignerBackend:
+    """Создать бэкенд подписи по `SignerConfig.signer_backend`; с `writer` запись .p7s отложенная"""
+    if config.signer_backend == "fake":
+        logging.info(
+            f"Using fake signer backend (latency={config.fake_latency}s, "
+            f"failure_rate={config.fake_failure_rate})"
+        )
+        ocsp_url = tsp_url = None
+        if config.validation_proxy:
+            proxy = get_validation_proxy(config.validation_proxy)
+            ocsp_url, tsp_url = proxy.ocsp_url, proxy.tsp_url
+        
+        return FakeSignerBackend(
+            latency=config.fake_latency,
+            failure_rate=config.fake_failure_rate,
+            seed=config.fake_seed,
+            ocsp_url=ocsp_url,
+            tsp_url=tsp_url,
+            writer=writer,
+            zero_copy=config.zero_copy_input
+        )
+    
+    if config.signer_backend == "eusign":
+        # Импорт здесь: нативная библиотека нужна только настоящему бэкенду
+        from src.sign.eusign_backend import EUSignBackend
+        return EUSignBackend(config, writer)
+    
+    raise ValueError(f"Unknown signer backend: {config.signer_backend}")
+
+
+
+def create_verifier(config: SignerConfig) -> SignatureVerifier:
+    """Создать проверяющий бэкенд по `SignerConfig.signer_backend`"""
+    if config.signer_backend == "fake":
+        return FakeSignerBackend()
+    
+    if config.signer_backend == "eusign":
+        from src.sign.eusign_backend import EUSignVerifier
+        return EUSignVerifier(config)
+    
+    raise ValueError(f"Unknown signer backend: {config.signer_backend}")
@@ -0,0 +1,120 @@
+import os
+import mmap
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Union
+
+Buffer = Union[bytes, mmap.mmap, memoryview]
+
+
+class CopyStats:
+    """Сколько байт данных подписи скопировано в память Python на каждый подписанный"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.bytes_signed = 0
+        self.bytes_copied = 0
+        self.fallbacks = 0
+
+    def record(
+        self,
+        signed: int,
+        copied: int,
+        fallback: bool = False
+    ):
+        with self._lock:
+            self.bytes_signed += signed
+            self.bytes_copied += copied
+            self.fallbacks += int(fallback)
+
+    @property
+    def copied_per_mb(self) -> float:
+        """Скопировано байт на 1 МБ подписанных данных"""
+        if not self.bytes_signed:
+            return 0.0
+        return self.bytes_copied / (self.bytes_signed / (1024 * 1024))
+
+    def reset(self):
+        with self._lock:
+            self.bytes_signed = self.bytes_copied = self.fallbacks = 0
+
+    def summary(self) -> str:
+        return (
+            f"signed={self.bytes_signed / (1024 * 1024):.1f}MB, "
+            f"copied={self.bytes_copied / (1024 * 1024):.1f}MB "
+            f"({self.copied_per_mb / (1024 * 1024):.2f}x), fallbacks={self.fallbacks}"
+        )
+
+
+copy_stats = CopyStats()
+
+# Принимает ли нативный вызов объекты с buffer protocol (нет ключа - ещё не проверяли)
+_native_accepts_buffers: dict[str, bool] = {}
+
+
+@contextmanager
+def open_input_buffer(
+    path: str,
+    zero_copy: bool = True
+):
+    """
+    Содержимое файла для передачи в нативный вызов.
+
+    С `zero_copy` файл отображается в память (mmap, только чтение): страницы
+    читаются ядром по мере обращения и не копируются в объект `bytes`.
+    Пустой файл, `zero_copy=False` и файл, который нельзя отобразить
+    (сетевые и FUSE-тома, специальные файлы), - обычное чтение в `bytes`.
+    """
+    size = os.path.getsize(path)
+
+    with open(path, "rb") as f:
+        mapped = None
+        if zero_copy and size > 0:
+            try:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except (OSError, ValueError) as e:
+                logging.debug(f"mmap is not available for {path}, reading into memory: {e}")
+
+        if mapped is None:
+            data = f.read()
+            copy_stats.record(len(data), len(data))
+            yield data
+            return
+
+        with mapped:
+            yield mapped
+
+
+def call_with_buffer(
+    name: str,
+    func: Callable[[Buffer], Any],
+    buffer: Buffer
+) -> Any:
+    """
+    Вызвать `func(buffer)` без копирования буфера.
+
+    Если обёртка принимает только `bytes` (TypeError на mmap), буфер один
+    раз копируется, и для `name` дальше сразу передаётся `bytes` - проба
+    выполняется один раз на процесс. Копии учитываются в `copy_stats`.
+    """
+    size = len(buffer)
+
+    if isinstance(buffer, bytes):
+        return func(buffer)
+
+    if _native_accepts_buffers.get(name, True):
+        try:
+            result = func(buffer)
+            _native_accepts_buffers[name] = True
+            copy_stats.record(size, 0)
+            return result
+        except TypeError as e:
+            if name in _native_accepts_buffers:
+                raise
+            logging.info(f"{name} does not accept buffer objects, falling back to bytes: {e}")
+            _native_accepts_buffers[name] = False
+
+    data = bytes(buffer)
+    copy_stats.record(size, size, fallback=True)
+    return func(data)
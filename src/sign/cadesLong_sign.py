@@ -1,17 +1,47 @@
 import os
 import sys
+import time
 import base64
 import logging
 import platform
 
 from typing import Optional, Tuple
+from contextlib import ExitStack
+
+from src.sign.signManager import EUSignCPManager, KeyContext, native_module
+from src.sign.metrics import StageTimer
+from src.sign.writer import SignatureWriter, write_atomic
+from src.sign.buffers import Buffer, open_input_buffer, call_with_buffer
+from src.sign.retry import validation_step
+
+# Размер блока при потоковом хэшировании больших файлов
+HASH_CHUNK_SIZE = 4 * 1024 * 1024
+
+
+def _output_filename(
+    target_file_path: str,
+    output_dir: Optional[str] = None
+) -> str:
+    """Путь к файлу внешней подписи .p7s"""
+    if output_dir:
+        return os.path.join(output_dir, os.path.basename(target_file_path) + ".p7s")
+    return target_file_path + ".p7s"
+
+
+def _write_signature(
+    signature_data: bytes,
+    target_file_path: str,
+    output_dir: Optional[str] = None,
+    writer: Optional[SignatureWriter] = None
+) -> str:
+    """Записать .p7s атомарно или отдать в очередь `writer`"""
+    output_filename = _output_filename(target_file_path, output_dir)
+    if writer is not None:
+        writer.submit(output_filename, signature_data)
+    else:
+        write_atomic(output_filename, signature_data)
+    return output_filename
 
-if platform.system() == "Windows":
-    from Modules.EUSignCP import *
-elif platform.system() == "Linux":
-    from ModulesUNIX.EUSignCP import *
-    
-from src.sign.signManager import EUSignCPManager
 
 def sign_file_cades_x_long(
     iface: EUSignCPManager,
@@ -20,6 +50,10 @@ def sign_file_cades_x_long(
     # is_sign_Long_type: bool,
     target_file_path: str,
     output_dir: Optional[str] = None,
+    key_context: Optional[KeyContext] = None,
+    timer: Optional[StageTimer] = None,
+    writer: Optional[SignatureWriter] = None,
+    zero_copy: bool = True
 ) -> Tuple[bytes, str]:
     """
     Функция подписи файла.
@@ -30,9 +64,15 @@ def sign_file_cades_x_long(
     
     и инстант класса `EUSignCPManager`
     (инициализация библиотеки внутри)
+    
+    Если передан `key_context`, ключ не перечитывается и контекст
+    не освобождается - им владеет вызывающая сторона.
+    
+    Время этапов (read, key_load, sign, write) пишется в `timer`.
+    С `writer` подпись только ставится в очередь записи.
+    С `zero_copy` файл передаётся в библиотеку через mmap, без копии в `bytes`.
     """
-    if isinstance(key_password, str):
-        key_password = key_password.encode("utf-8")
+    timer = timer or StageTimer()
     
     # orig_path = Path(target_file_path)
     
@@ -44,31 +84,40 @@ def sign_file_cades_x_long(
     
     # target_file_path = str(tmp_ascii_path)
     
-    # Чтение файла для подписи
-    with open(target_file_path, "rb") as f:
-        file_data = f.read()
+    with ExitStack() as stack:
+        # Файл для подписи: отображение в память или чтение в bytes
+        with timer.stage("read"):
+            file_data = stack.enter_context(open_input_buffer(target_file_path, zero_copy))
+        
+        return _sign_data_cades(
+            iface, key_bytes, key_password, file_data, target_file_path,
+            output_dir, key_context, timer, writer
+        )
+
+
+def _sign_data_cades(
+    iface: EUSignCPManager,
+    key_bytes: str,
+    key_password: str,
+    file_data: Buffer,
+    target_file_path: str,
+    output_dir: Optional[str],
+    key_context: Optional[KeyContext],
+    timer: StageTimer,
+    writer: Optional[SignatureWriter]
+) -> Tuple[bytes, str]:
     
     # if is_sign_Long_type:
     #     sign_type = EU_SIGN_TYPE_CADES_X_LONG # Тип подписи CAdES-X Long
     # else: 
     #     sign_type = EU_SIGN_TYPE_CADES_BES
     
-    lib_ctx = []
-    pk_ctx = []
+    own_context = key_context is None
+    if own_context:
+        with timer.stage("key_load"):
+            key_context = KeyContext(iface, key_bytes, key_password)
     
     try:
-        iface.CtxCreate(lib_ctx)
-        
-        owner_info = {}
-        iface.CtxReadPrivateKeyBinary(
-            lib_ctx[0],           # контекст библиотеки
-            key_bytes,            # бинарные данные ZS2 файла
-            len(key_bytes),       # длина данных
-            key_password,         # пароль ключа
-            pk_ctx,              # выходной контекст приватного ключа
-            owner_info           # информация о владельце
-        )
-        
         # получить собственный сертификат
         # cert_info = {}
         # cert_bytes_out = []
@@ -94,7 +143,7 @@ def sign_file_cades_x_long(
         # if cert_info2 is None:
         #     raise RuntimeError(f"Error parsing certificate {cert_info2}")
         
-        sign_algo = EU_CTX_SIGN_DSTU4145_WITH_GOST34311
+        sign_algo = native_module().EU_CTX_SIGN_DSTU4145_WITH_GOST34311
         # hash_algo = EU_CTX_HASH_ALGO_GOST34311
         
         # # хэширование данных файла
@@ -201,41 +250,224 @@ def sign_file_cades_x_long(
         
         sign_out_bytes = []
         
-        iface.CtxSignData(
-            pk_ctx[0],           # pvPrivateKeyContext - контекст приватного ключа
-            sign_algo,           # dwSignAlgo - алгоритм подписи
-            file_data,           # pbData - данные для подписи
-            len(file_data),      # dwDataLength - размер данных
-            True,                # bExternal = True - внешняя подпись (detached)
-            True,                # bAppendCert = True - включить сертификат
-            sign_out_bytes       # ppbSign - выходной массив с подписью
-        )
+        # Подпись вместе с запросами TSP/OCSP
+        with timer.stage("sign"), validation_step("CtxSignData"):
+            call_with_buffer("CtxSignData", lambda data: iface.CtxSignData(
+                key_context.pk_ctx,  # pvPrivateKeyContext - контекст приватного ключа
+                sign_algo,           # dwSignAlgo - алгоритм подписи
+                data,                # pbData - данные для подписи
+                len(data),           # dwDataLength - размер данных
+                True,                # bExternal = True - внешняя подпись (detached)
+                True,                # bAppendCert = True - включить сертификат
+                sign_out_bytes       # ppbSign - выходной массив с подписью
+            ), file_data)
         
         # Получаем подпись как bytes
         if not sign_out_bytes or not sign_out_bytes[0]:
             raise RuntimeError("Failed to create signature")
         
         signature_data = sign_out_bytes[0]
-        
-        if output_dir:
-            output_filename = os.path.join(output_dir, os.path.basename(target_file_path) + ".p7s")
-        else:
-            output_filename = target_file_path + ".p7s"
-        
-        with open(output_filename, "wb") as f:
-            f.write(signature_data)
+        with timer.stage("write"):
+            output_filename = _write_signature(signature_data, target_file_path, output_dir, writer)
 
         return signature_data, output_filename
         
+    finally:
+        if own_context:
+            key_context.close()
+
+
+def hash_file_chunked(
+    iface: EUSignCPManager,
+    key_context: KeyContext,
+    target_file_path: str,
+    chunk_size: int = HASH_CHUNK_SIZE
+) -> bytes:
+    """
+    Хэш файла ГОСТ 34.311 блоками по `chunk_size` байт.
+    В памяти одновременно находится не больше одного блока.
+    """
+    cert_bytes = key_context.get_certificate()
+    hash_ctx = []
+    
+    iface.CtxHashDataBegin(
+        key_context.lib_ctx,
+        native_module().EU_CTX_HASH_ALGO_GOST34311,
+        cert_bytes,
+        len(cert_bytes),
+        hash_ctx
+    )
+    
+    try:
+        # Один буфер на весь файл: блоки читаются в него без новых объектов bytes
+        chunk_buffer = bytearray(chunk_size)
+        chunk_view = memoryview(chunk_buffer)
+        with open(target_file_path, "rb") as f:
+            while True:
+                read = f.readinto(chunk_buffer)
+                if not read:
+                    break
+                call_with_buffer("CtxHashDataContinue", lambda data: iface.CtxHashDataContinue(
+                    hash_ctx[0], data, len(data)
+                ), chunk_view[:read])
+        
+        digest_out = []
+        iface.CtxHashDataEnd(hash_ctx[0], digest_out)
     finally:
         try:
-            if pk_ctx:
-                iface.CtxFreePrivateKey(pk_ctx[0])
+            iface.CtxFreeHash(hash_ctx[0])
         except Exception:
             pass
+    
+    if not digest_out or not digest_out[0]:
+        raise RuntimeError("Error get digest file")
+    
+    return digest_out[0]
+
+
+def sign_file_hash_cades_x_long(
+    iface: EUSignCPManager,
+    key_bytes: str,
+    key_password: str,
+    target_file_path: str,
+    output_dir: Optional[str] = None,
+    key_context: Optional[KeyContext] = None,
+    is_sign_Long_type: bool = True,
+    chunk_size: int = HASH_CHUNK_SIZE,
+    timer: Optional[StageTimer] = None,
+    writer: Optional[SignatureWriter] = None
+) -> Tuple[bytes, str]:
+    """
+    Потоковая подпись файла: хэш считается блоками, подписывается только хэш.
+    
+    Память на один файл ограничена `chunk_size` независимо от размера документа.
+    Результат - такая же внешняя (detached) подпись .p7s, как у `sign_file_cades_x_long`.
+    Потоковое хэширование учитывается как этап read.
+    """
+    timer = timer or StageTimer()
+    native = native_module()
+    
+    if is_sign_Long_type:
+        sign_type = native.EU_SIGN_TYPE_CADES_X_LONG # Тип подписи CAdES-X Long
+    else: 
+        sign_type = native.EU_SIGN_TYPE_CADES_BES
+    
+    own_context = key_context is None
+    if own_context:
+        with timer.stage("key_load"):
+            key_context = KeyContext(iface, key_bytes, key_password)
+    
+    try:
+        sign_algo = native.EU_CTX_SIGN_DSTU4145_WITH_GOST34311
+        with timer.stage("key_load"):
+            cert_bytes = key_context.get_certificate()
         
-        try:
-            if lib_ctx:
-                iface.CtxFree(lib_ctx[0])
-        except Exception:
-            pass
\ No newline at end of file
+        with timer.stage("read"):
+            digest = hash_file_chunked(iface, key_context, target_file_path, chunk_size)
+        
+        sign_started = time.perf_counter()
+        
+        # создание подписи с метками времени
+        signer = []
+        with validation_step("CtxCreateSignerEx"):
+            iface.CtxCreateSignerEx(
+                key_context.pk_ctx,
+                sign_algo,
+                digest, len(digest),
+                False,  # bNoContentTimeStamp = False для включения меток времени
+                sign_type,  # Тип подписи
+                signer
+            )
+        
+        if not signer or not signer[0]:
+            raise RuntimeError("Failed to create signer")
+        
+        final_signer = signer[0]
+        
+        if is_sign_Long_type:
+            # Добавить валидационные данные к signer (не ко всей подписи!)
+            up_signer_str, up_signer_bytes = [], []
+            with validation_step("AppendValidationDataToSignerEx"):
+                iface.AppendValidationDataToSignerEx(
+                    None,
+                    final_signer, len(final_signer),
+                    cert_bytes, len(cert_bytes),
+                    sign_type,
+                    up_signer_str, up_signer_bytes
+                )
+            
+            if up_signer_bytes and up_signer_bytes[0]:
+                final_signer = up_signer_bytes[0]
+            elif up_signer_str and up_signer_str[0]:
+                final_signer = base64.b64decode(up_signer_str[0])
+            else:
+                raise RuntimeError("Failed to append validation data to signer")
+        
+        # Собрать контейнер: пустая внешняя подпись -> добавить signer
+        empty_sign = []
+        iface.CtxCreateEmptySign(
+            key_context.lib_ctx,
+            sign_algo,
+            None, 0,  # внешняя подпись - данные не включаются
+            cert_bytes, len(cert_bytes),
+            empty_sign
+        )
+        
+        sign_out_bytes = []
+        iface.CtxAppendSigner(
+            key_context.lib_ctx,
+            sign_algo,
+            final_signer, len(final_signer),
+            cert_bytes, len(cert_bytes),
+            empty_sign[0], len(empty_sign[0]),
+            sign_out_bytes
+        )
+        
+        if not sign_out_bytes or not sign_out_bytes[0]:
+            raise RuntimeError("Failed to create signature")
+        
+        timer.add("sign", time.perf_counter() - sign_started)
+        
+        signature_data = sign_out_bytes[0]
+        with timer.stage("write"):
+            output_filename = _write_signature(signature_data, target_file_path, output_dir, writer)
+        
+        return signature_data, output_filename
+    
+    finally:
+        if own_context:
+            key_context.close()
+
+
+def verify_file_signature(
+    iface: EUSignCPManager,
+    target_file_path: str,
+    signature_file_path: str,
+    stream_threshold: Optional[int] = None
+) -> dict:
+    """
+    Проверка внешней подписи .p7s для файла.
+    
+    Возвращает информацию о подписанте, при недействительной подписи
+    библиотека бросает исключение. Файлы от `stream_threshold` байт
+    проверяются через `VerifyFile`, без чтения в память.
+    """
+    sign_info = {}
+    
+    if stream_threshold is not None and os.path.getsize(target_file_path) >= stream_threshold:
+        iface.VerifyFile(signature_file_path, target_file_path, sign_info)
+        return sign_info
+    
+    with open(signature_file_path, "rb") as f:
+        signature_data = f.read()
+    
+    with open_input_buffer(target_file_path) as file_data:
+        call_with_buffer("VerifyData", lambda data: iface.VerifyData(
+            data,                 # pbData - подписанные данные
+            len(data),            # dwDataLength
+            None,                 # pszSign - подпись в BASE64 (не используется)
+            signature_data,       # pbSign - подпись
+            len(signature_data),  # dwSignLength
+            sign_info             # pSignInfo - информация о подписанте
+        ), file_data)
+    return sign_info
\ No newline at end of file
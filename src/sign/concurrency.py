@@ -0,0 +1,101 @@
+import time
+import logging
+import threading
+
+from src.sign.metrics import percentile
+
+class AdaptiveConcurrencyLimiter:
+    """
+    AIMD-ограничитель количества подписей в работе.
+    
+    После каждого окна из `window` завершений смотрит на p95 задержки и долю
+    ошибок: если всё в норме - лимит растёт на 1, если p95 выше цели или ошибок
+    больше допустимого (TSP/OCSP троттлит или недоступен) - лимит умножается
+    на `decrease_factor`. История лимита хранится в `history`.
+    """
+    
+    def __init__(
+        self,
+        initial_limit: int,
+        min_limit: int = 1,
+        max_limit: int = 17,
+        target_p95_latency: float = 15.0,
+        max_error_rate: float = 0.1,
+        window: int = 20,
+        decrease_factor: float = 0.5
+    ):
+        if not min_limit <= initial_limit <= max_limit:
+            raise ValueError(
+                f"initial_limit must be within [{min_limit}, {max_limit}], got {initial_limit}"
+            )
+        
+        self.limit = initial_limit
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.target_p95_latency = target_p95_latency
+        self.max_error_rate = max_error_rate
+        self.window = window
+        self.decrease_factor = decrease_factor
+        
+        self._in_flight = 0
+        self._latencies: list[float] = []
+        self._errors = 0
+        self._condition = threading.Condition()
+        self._started = time.monotonic()
+        self.history: list[tuple[float, int]] = [(0.0, initial_limit)]
+    
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+    
+    def acquire(self):
+        """Дождаться свободного места под текущим лимитом"""
+        with self._condition:
+            while self._in_flight >= self.limit:
+                self._condition.wait()
+            self._in_flight += 1
+    
+    def release(
+        self,
+        latency: float,
+        success: bool
+    ):
+        """Освободить место и учесть результат подписи"""
+        with self._condition:
+            self._in_flight -= 1
+            self._latencies.append(latency)
+            if not success:
+                self._errors += 1
+            
+            if len(self._latencies) >= self.window:
+                self._adjust()
+            
+            self._condition.notify_all()
+    
+    def _adjust(self):
+        p95 = percentile(self._latencies, 95)
+        error_rate = self._errors / len(self._latencies)
+        
+        if error_rate > self.max_error_rate or p95 > self.target_p95_latency:
+            new_limit = max(self.min_limit, int(self.limit * self.decrease_factor))
+        else:
+            new_limit = min(self.max_limit, self.limit + 1)
+        
+        self._latencies = []
+        self._errors = 0
+        
+        if new_limit != self.limit:
+            logging.info(
+                f"Concurrency {self.limit} -> {new_limit} "
+                f"(p95={p95:.2f}s, errors={error_rate:.0%})"
+            )
+            self.limit = new_limit
+            self.history.append((time.monotonic() - self._started, new_limit))
+    
+    def summary(self) -> str:
+        """Краткое описание изменения лимита за пакет"""
+        limits = [limit for _, limit in self.history]
+        return (
+            f"{limits[0]} -> {limits[-1]} "
+            f"(min {min(limits)}, max {max(limits)}, {len(limits) - 1} changes)"
+        )
@@ -0,0 +1,71 @@
+import os
+import hashlib
+import logging
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from src.sign.model import SignTask
+
+
+def content_digest(
+    path: str,
+    chunk_size: int = 1024 * 1024
+) -> str:
+    """SHA-256 содержимого файла"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def group_duplicates(
+    tasks: list[SignTask],
+    max_workers: int = 4
+) -> tuple[list[SignTask], dict[str, list[SignTask]]]:
+    """
+    Разделить задачи на уникальные и копии.
+
+    Хэшируются только файлы с совпадающим размером - файл уникального
+    размера не может быть копией. Возвращает (задачи к подписи,
+    {путь подписываемого файла: задачи его побайтовых копий}).
+    Файлы, которые не удалось прочитать, подписываются как уникальные.
+    """
+    by_size: defaultdict[int, list[SignTask]] = defaultdict(list)
+    primaries: list[SignTask] = []
+
+    for task in tasks:
+        try:
+            by_size[os.path.getsize(task.file_path)].append(task)
+        except OSError:
+            primaries.append(task)
+
+    candidates = [task for group in by_size.values() if len(group) > 1 for task in group]
+    primaries.extend(group[0] for group in by_size.values() if len(group) == 1)
+
+    def digest_or_none(task: SignTask):
+        try:
+            return content_digest(task.file_path)
+        except OSError as e:
+            logging.warning(f"Cannot hash {task.file_path}, signing separately: {e}")
+            return None
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        digests = list(executor.map(digest_or_none, candidates))
+
+    first_by_digest: dict[str, SignTask] = {}
+    duplicates: dict[str, list[SignTask]] = {}
+
+    for task, digest in zip(candidates, digests):
+        if digest is None:
+            primaries.append(task)
+            continue
+
+        primary = first_by_digest.get(digest)
+        if primary is None:
+            first_by_digest[digest] = task
+            primaries.append(task)
+        else:
+            duplicates.setdefault(primary.file_path, []).append(task)
+
+    return primaries, duplicates
@@ -0,0 +1,173 @@
+import os
+import threading
+from typing import Optional
+from contextlib import ExitStack
+
+from src.sign.model import SignTask, SignerConfig
+from src.sign.metrics import StageTimer
+from src.sign.writer import SignatureWriter
+from src.sign.key_registry import KeyProfile
+from src.sign.signManager import (
+    EUSignCPManager,
+    get_key_registry,
+    acquire_validation_endpoints,
+    release_validation_endpoints
+)
+from src.sign.cadesLong_sign import (
+    sign_file_cades_x_long,
+    sign_file_hash_cades_x_long,
+    verify_file_signature
+)
+from src.sign.validation_proxy import DEFAULT_ENDPOINTS, get_validation_proxy, proxy_endpoints
+
+class EUSignBackend:
+    """Бэкенд подписи на нативной библиотеке EUSignCP"""
+    
+    def __init__(
+        self,
+        config: SignerConfig,
+        writer: Optional[SignatureWriter] = None
+    ):
+        self.config = config
+        self.writer = writer
+        self._init_sign_manager()
+    
+    def _init_sign_manager(self):
+        """Прогретый ключ из реестра процесса (общий для пакетов и сессий)"""
+        self.key_profile: Optional[KeyProfile] = None
+        self._key_lock = threading.Lock()
+        self.key_entry = None
+        
+        # Адреса OCSP/TSP задаются явно и в обычном режиме: после пакета
+        # через прокси библиотека иначе осталась бы направлена на него
+        self.endpoints = DEFAULT_ENDPOINTS
+        if self.config.validation_proxy:
+            self.endpoints = proxy_endpoints(get_validation_proxy(self.config.validation_proxy))
+        
+        self._acquire_key()
+    
+    def _acquire_key(self):
+        """
+        Запись реестра для ключа и адреса OCSP/TSP пакета; после `close`
+        берутся заново при следующей подписи (заменённый файл ключа
+        загружается заново)
+        """
+        with self._key_lock:
+            if self.key_entry is None:
+                self.key_profile = KeyProfile.for_files(
+                    key_file_path=str(self.config.key_file_path),
+                    cert_path=str(self.config.cert_file_path) if self.config.cert_file_path else None,
+                    is_sign_long_type=self.config.is_sign_long_type
+                )
+                acquire_validation_endpoints(self.endpoints)
+                try:
+                    self.key_entry = get_key_registry().acquire(self.key_profile)
+                except Exception:
+                    release_validation_endpoints()
+                    raise
+                self.sign_manager = self.key_entry.manager
+                self.key_bytes = self.key_entry.key_bytes
+            return self.key_entry
+    
+    def load_certificate(
+        self,
+        password: Optional[str] = None
+    ) -> bool:
+        if self.config.cert_file_path:
+            return self.sign_manager.load_and_check_certificate()
+        return self.sign_manager.load_and_check_certificate(password)
+    
+    def sign(
+        self,
+        task: SignTask,
+        timer: Optional[StageTimer] = None
+    ) -> str:
+        """Выполнить операцию подписания"""
+        timer = timer or StageTimer()
+        
+        with ExitStack() as stack:
+            key_context = None
+            with timer.stage("key_load"):
+                key_entry = self._acquire_key()
+                if self.config.reuse_key_context:
+                    key_context = stack.enter_context(key_entry.key_contexts.lease(task.key_password))
+            
+            if self._use_stream_signing(task.file_path):
+                _, output_file = sign_file_hash_cades_x_long(
+                    iface=key_entry.manager.iface,
+                    key_bytes=key_entry.key_bytes,
+                    key_password=task.key_password,
+                    target_file_path=task.file_path,
+                    output_dir=task.output_dir,
+                    key_context=key_context,
+                    is_sign_Long_type=self.config.is_sign_long_type,
+                    chunk_size=self.config.hash_chunk_size,
+                    timer=timer,
+                    writer=self.writer
+                )
+                return output_file
+            
+            _, output_file = sign_file_cades_x_long(
+                iface=key_entry.manager.iface,
+                key_bytes=key_entry.key_bytes,
+                key_password=task.key_password,
+                target_file_path=task.file_path,
+                output_dir=task.output_dir,
+                key_context=key_context,
+                timer=timer,
+                writer=self.writer,
+                zero_copy=self.config.zero_copy_input
+            )
+            return output_file
+    
+    def _use_stream_signing(
+        self,
+        file_path: str
+    ) -> bool:
+        """Подписывать ли файл по хэшу (без чтения целиком в память)"""
+        if not self.config.is_sign_long_type:
+            # CtxSignData берёт глобальный тип подписи библиотеки (CAdES-X Long),
+            # путь по хэшу передаёт тип явно
+            return True
+        threshold = self.config.stream_sign_threshold
+        if threshold is None:
+            return False
+        return os.path.getsize(file_path) >= threshold
+    
+    def close(self):
+        """Вернуть ключ в реестр: контексты остаются прогретыми до вытеснения"""
+        with self._key_lock:
+            if self.key_entry is not None:
+                self.key_entry = None
+                get_key_registry().release(self.key_profile)
+                release_validation_endpoints()
+
+
+
+class EUSignVerifier:
+    """Проверка подписей на EUSignCP (ключ для проверки не нужен)"""
+    
+    def __init__(
+        self,
+        config: SignerConfig
+    ):
+        self.config = config
+        self.sign_manager = EUSignCPManager(
+            key_file_path=str(self.config.key_file_path),
+            is_sign_Long_type=self.config.is_sign_long_type
+        )
+    
+    def verify(
+        self,
+        file_path: str,
+        signature_path: str
+    ) -> dict:
+        return verify_file_signature(
+            self.sign_manager.iface,
+            file_path,
+            signature_path,
+            stream_threshold=self.config.stream_sign_threshold
+        )
+    
+    def close(self):
+        pass
@@ -0,0 +1,272 @@
+import os
+import json
+import time
+import uuid
+import logging
+import threading
+from pathlib import Path
+from collections import deque
+from dataclasses import dataclass, field, asdict, replace, fields
+from typing import Callable, Optional, Union
+
+from src.sign.model import FolderResult
+from src.sign.services import sign_folder_documents
+
+JOB_STATES = ("queued", "running", "done", "failed", "interrupted")
+
+# Прогресс задания пишется на диск не чаще раза в столько секунд
+PERSIST_INTERVAL = 1.0
+
+
+@dataclass
+class SignJob:
+    """Фоновое задание пакетной подписи (без пароля ключа)"""
+    id: str
+    root_folder: str
+    key_file: str
+    workers: int
+    options: dict = field(default_factory=dict)  # остальные аргументы sign_folder_documents
+    state: str = "queued"  # 'queued' | 'running' | 'done' | 'failed' | 'interrupted'
+    created_at: float = 0.0
+    started_at: float = 0.0
+    finished_at: float = 0.0
+    completed: int = 0
+    total: int = 0
+    elements_message: str = "документів"
+    folders_completed: int = 0
+    success: Optional[bool] = None
+    message: str = ""
+
+    @property
+    def active(self) -> bool:
+        return self.state in ("queued", "running")
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "SignJob":
+        names = {f.name for f in fields(cls)}
+        return cls(**{key: value for key, value in data.items() if key in names})
+
+
+class JobManager:
+    """
+    Фоновое выполнение пакетов подписи, не зависящее от сессии Streamlit.
+
+    Задание выполняется в своём потоке (`sign_folder_documents`), состояние,
+    прогресс и итог хранятся в памяти и в `jobs_dir/<id>.json`: любая
+    сессия видит задание, а закрытие вкладки или перезапуск скрипта его
+    не прерывают. Повторная отправка той же папки с тем же ключом и
+    параметрами, пока её задание в очереди или выполняется, возвращает
+    это задание; с другим ключом или параметрами - ValueError.
+
+    Все задания делят `max_workers` потоков подписи: задание ждёт в очереди
+    (по порядку отправки), пока свободных потоков не хватит на его `workers`.
+    Пароль ключа хранится только в памяти до старта задания. Задание,
+    не завершённое к перезапуску сервиса, помечается 'interrupted';
+    повторная отправка продолжит пакет по журналу.
+    """
+
+    def __init__(
+        self,
+        jobs_dir: Union[str, Path] = "jobs",
+        max_workers: int = 17,
+        runner: Callable[..., tuple[bool, str]] = sign_folder_documents
+    ):
+        self.jobs_dir = Path(jobs_dir)
+        self.max_workers = max_workers
+        self.runner = runner
+
+        self._lock = threading.Lock()
+        self._jobs: dict[str, SignJob] = {}
+        self._queue: deque[str] = deque()
+        self._passwords: dict[str, str] = {}
+        self._finished: dict[str, threading.Event] = {}
+        self._persisted: dict[str, float] = {}
+        self._workers_in_use = 0
+
+        self._load()
+
+    def _load(self):
+        if not self.jobs_dir.exists():
+            return
+
+        for path in self.jobs_dir.glob("*.json"):
+            try:
+                job = SignJob.from_dict(json.loads(path.read_text(encoding="utf-8")))
+            except (OSError, ValueError, TypeError) as e:
+                logging.warning(f"Ignoring unreadable job file {path}: {e}")
+                continue
+
+            if job.active:
+                job.state = "interrupted"
+                job.finished_at = time.time()
+                job.message = "Service restarted before the job finished; submit it again to resume from the journal"
+                self._persist(job)
+            self._jobs[job.id] = job
+
+    def submit(
+        self,
+        root_folder: str,
+        key_file: Union[str, Path],
+        key_password: str,
+        workers: int = 10,
+        **options
+    ) -> SignJob:
+        """Поставить пакет в очередь (или вернуть уже активное задание этой папки)"""
+        options = {
+            key: str(value) if isinstance(value, Path) else value
+            for key, value in options.items()
+        }
+        with self._lock:
+            for job in self._jobs.values():
+                if not job.active or job.root_folder != str(root_folder):
+                    continue
+                if job.key_file != str(key_file) or job.options != options:
+                    raise ValueError(
+                        f"Folder {root_folder} is already being signed by job {job.id} "
+                        f"with another key or settings"
+                    )
+                logging.info(f"Job {job.id} for {root_folder} is already {job.state}")
+                return replace(job)
+
+            job = SignJob(
+                id=f"{time.strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}",
+                root_folder=str(root_folder),
+                key_file=str(key_file),
+                workers=max(1, min(workers, self.max_workers)),
+                options=options,
+                created_at=time.time()
+            )
+            self._jobs[job.id] = job
+            self._queue.append(job.id)
+            self._passwords[job.id] = key_password
+            self._finished[job.id] = threading.Event()
+            self._persist(job)
+            logging.info(f"Job {job.id} queued: {job.root_folder}, {job.workers} workers")
+
+            self._start_ready()
+            return replace(job)
+
+    def get(
+        self,
+        job_id: str
+    ) -> Optional[SignJob]:
+        """Копия состояния задания"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return replace(job) if job else None
+
+    def jobs(self) -> list[SignJob]:
+        """Все задания, новые первыми"""
+        with self._lock:
+            jobs = [replace(job) for job in self._jobs.values()]
+        return sorted(jobs, key=lambda job: job.created_at, reverse=True)
+
+    def wait(
+        self,
+        job_id: str,
+        timeout: Optional[float] = None
+    ) -> Optional[SignJob]:
+        """Дождаться завершения задания этого процесса"""
+        finished = self._finished.get(job_id)
+        if finished:
+            finished.wait(timeout)
+        return self.get(job_id)
+
+    def _start_ready(self):
+        """Запустить задания из начала очереди, пока хватает потоков (под блокировкой)"""
+        while self._queue:
+            job = self._jobs[self._queue[0]]
+            if self._workers_in_use + job.workers > self.max_workers:
+                break
+
+            self._queue.popleft()
+            self._workers_in_use += job.workers
+            job.state = "running"
+            job.started_at = time.time()
+            self._persist(job)
+
+            password = self._passwords.pop(job.id)
+            threading.Thread(
+                target=self._run,
+                args=(job, password),
+                name=f"sign-job-{job.id}",
+                daemon=True
+            ).start()
+
+    def _run(
+        self,
+        job: SignJob,
+        key_password: str
+    ):
+        logging.info(f"Job {job.id} started: {job.root_folder}")
+
+        def on_progress(
+            completed: int,
+            total: int,
+            elements_message: str = "документів"
+        ):
+            with self._lock:
+                job.completed, job.total, job.elements_message = completed, total, elements_message
+                if time.monotonic() - self._persisted.get(job.id, 0.0) >= PERSIST_INTERVAL:
+                    self._persist(job)
+
+        def on_folder(result: FolderResult):
+            with self._lock:
+                job.folders_completed += 1
+
+        try:
+            success, message = self.runner(
+                root_folder=job.root_folder,
+                key_file=job.key_file,
+                key_password=key_password,
+                workers=job.workers,
+                callback_progress=on_progress,
+                callback_folder=on_folder,
+                **job.options
+            )
+        except Exception as e:
+            logging.exception(f"Job {job.id} crashed")
+            success, message = False, f"Batch signing failed: {e}"
+
+        with self._lock:
+            job.state = "done" if success else "failed"
+            job.success = success
+            job.message = message
+            job.finished_at = time.time()
+            self._persist(job)
+            self._workers_in_use -= job.workers
+            self._start_ready()
+
+        logging.info(f"Job {job.id} {job.state} in {job.finished_at - job.started_at:.1f}s")
+        self._finished[job.id].set()
+
+    def _persist(
+        self,
+        job: SignJob
+    ):
+        """Записать состояние задания (временный файл и переименование)"""
+        self._persisted[job.id] = time.monotonic()
+        try:
+            self.jobs_dir.mkdir(parents=True, exist_ok=True)
+            path = self.jobs_dir / f"{job.id}.json"
+            tmp_path = path.with_suffix(".tmp")
+            tmp_path.write_text(json.dumps(asdict(job), ensure_ascii=False), encoding="utf-8")
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logging.warning(f"Failed to save job {job.id}: {e}")
+
+
+_manager: Optional[JobManager] = None
+_manager_lock = threading.Lock()
+
+
+def get_job_manager(
+    jobs_dir: Union[str, Path] = "jobs",
+    max_workers: int = 17
+) -> JobManager:
+    """Менеджер заданий процесса: создаётся один раз, общий для всех сессий"""
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = JobManager(jobs_dir, max_workers)
+    return _manager
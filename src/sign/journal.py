@@ -0,0 +1,283 @@
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from typing import Optional, Iterable
+
+from src.sign.model import SignResult
+
+JOURNAL_SUFFIX = ".journal.jsonl"
+
+
+def _file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class SigningJournal:
+    """
+    Журнал пакетной подписи (JSON Lines, только дописывание).
+
+    Записи:
+        begin  - начало пакета
+        task   - файл поставлен в пакет
+        done   - подпись записана (путь и SHA-256 .p7s)
+        failed - все попытки неудачны
+        dir    - в папке все файлы подписаны (mtime и подпапки на момент записи)
+        end    - пакет завершён
+
+    fsync выполняется группами: каждые `fsync_every` записей или не реже
+    `fsync_interval` секунд, и всегда на `begin`/`end`. Пакет без `end`
+    после перезапуска продолжается по записям `task` без повторного
+    сканирования дерева; `.p7s` файлов без `done` подписываются заново,
+    даже если файл подписи уже есть (он мог быть записан не до конца).
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        fsync_every: int = 64,
+        fsync_interval: float = 1.0
+    ):
+        self.path = Path(path)
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+
+        self._lock = threading.Lock()
+        self._file = None
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+        # Состояние, восстановленное из журнала
+        self.tasks: dict[str, str] = {}  # файл -> pending | done | failed
+        self.dirs: dict[str, tuple[int, list[str]]] = {}  # папка -> (mtime_ns, подпапки)
+        self.unfinished = False
+
+        # Папки, просмотренные сканером в текущем пакете
+        self._scanned_dirs: dict[str, list[str]] = {}
+        self._failed_dirs: set[str] = set()
+
+        self._replay()
+
+    @classmethod
+    def for_folder(
+        cls,
+        journal_dir: Path,
+        root_folder: Path,
+        output_base_dir: Optional[Path] = None,
+        extensions: Iterable[str] = (),
+        **kwargs
+    ) -> "SigningJournal":
+        """
+        Журнал для пары (папка документов, папка подписей) и набора расширений:
+        папка, подписанная для .pdf, не считается подписанной для .docx
+        """
+        key = f"{root_folder}|{output_base_dir or ''}|{','.join(sorted(extensions))}"
+        key = hashlib.sha1(key.encode()).hexdigest()[:16]
+        return cls(Path(journal_dir) / f"{key}{JOURNAL_SUFFIX}", **kwargs)
+
+    def _replay(self):
+        """Восстановить состояние из журнала; оборванная последняя строка пропускается"""
+        if not self.path.exists():
+            return
+
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    logging.warning(f"Skipping torn journal record in {self.path}")
+                    continue
+
+                event = record.get("event")
+                if event == "begin":
+                    self.tasks = {}
+                    self.unfinished = True
+                elif event == "task":
+                    self.tasks[record["file"]] = "pending"
+                elif event in ("done", "failed"):
+                    self.tasks[record["file"]] = event
+                    if event == "failed":
+                        self.dirs.pop(os.path.dirname(record["file"]), None)
+                elif event == "dir":
+                    self.dirs[record["dir"]] = (record["mtime_ns"], record["subdirs"])
+                elif event == "end":
+                    self.unfinished = False
+
+    def pending_files(self) -> list[Path]:
+        """Незавершённые файлы прерванного пакета"""
+        return [Path(file) for file, state in self.tasks.items() if state != "done"]
+
+    def complete_subdirs(
+        self,
+        path: Path
+    ) -> Optional[list[str]]:
+        """
+        Подпапки полностью подписанной папки или None.
+
+        Папка считается неизменной, пока её mtime совпадает с записанным:
+        добавление и удаление файлов и подпапок меняет mtime папки.
+        """
+        entry = self.dirs.get(str(path))
+        if entry is None:
+            return None
+        try:
+            if os.stat(path).st_mtime_ns != entry[0]:
+                return None
+        except OSError:
+            return None
+        return entry[1]
+
+    def note_scanned_dir(
+        self,
+        path: Path,
+        subdirs: list[str],
+        has_unsigned: bool
+    ):
+        """Сканер просмотрел папку: после пакета она станет полностью подписанной"""
+        if has_unsigned:
+            self._scanned_dirs[str(path)] = subdirs
+        else:
+            # Неподписанных нет - ничего в ней не изменится, mtime берётся сразу
+            self._record_dir(str(path), subdirs)
+
+    def begin(
+        self,
+        files: Iterable[Path],
+        root_folder: Path
+    ):
+        """Начать новый пакет"""
+        self._compact()
+        self._append({"event": "begin", "root": str(root_folder), "ts": time.time()}, sync=False)
+        for file in files:
+            self.tasks[str(file)] = "pending"
+            self._append({"event": "task", "file": str(file)}, sync=False)
+        self.unfinished = True
+        self.flush()
+
+    def add_task(
+        self,
+        file: Path
+    ):
+        """Добавить файл в начатый пакет (сканер находит файлы по ходу подписи)"""
+        self.tasks[str(file)] = "pending"
+        self._append({"event": "task", "file": str(file)})
+
+    def resume(self):
+        """Продолжить прерванный пакет"""
+        self._append({"event": "begin", "resumed": True, "ts": time.time()}, sync=False)
+        pending = self.pending_files()
+        self.tasks = {}
+        for file in pending:
+            self.tasks[str(file)] = "pending"
+            self._append({"event": "task", "file": str(file)}, sync=False)
+        self.flush()
+
+    def record_result(
+        self,
+        result: SignResult
+    ):
+        """Записать окончательный результат файла"""
+        if result.success:
+            try:
+                output_hash = _file_sha256(result.output_path)
+            except OSError as e:
+                logging.warning(f"Cannot hash {result.output_path}: {e}")
+                output_hash = ""
+            record = {
+                "event": "done",
+                "file": result.file_path,
+                "output": result.output_path,
+                "sha256": output_hash
+            }
+        else:
+            record = {"event": "failed", "file": result.file_path, "error": result.error_message}
+            with self._lock:
+                self._failed_dirs.add(os.path.dirname(result.file_path))
+
+        self.tasks[result.file_path] = record["event"]
+        self._append(record)
+
+    def end(self):
+        """Завершить пакет: отметить полностью подписанные папки"""
+        for path, subdirs in self._scanned_dirs.items():
+            if path not in self._failed_dirs:
+                self._record_dir(path, subdirs)
+        self._scanned_dirs = {}
+        self._failed_dirs = set()
+
+        self._append({"event": "end", "ts": time.time()}, sync=False)
+        self.unfinished = False
+        self.flush()
+
+    def _record_dir(
+        self,
+        path: str,
+        subdirs: list[str]
+    ):
+        try:
+            mtime_ns = os.stat(path).st_mtime_ns
+        except OSError:
+            return
+        self.dirs[path] = (mtime_ns, subdirs)
+        self._append({"event": "dir", "dir": path, "mtime_ns": mtime_ns, "subdirs": subdirs}, sync=False)
+
+    def _compact(self):
+        """Переписать завершённый журнал, оставив только записи о папках"""
+        if self.unfinished or not self.path.exists():
+            return
+
+        self.close()
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for path, (mtime_ns, subdirs) in self.dirs.items():
+                f.write(json.dumps({"event": "dir", "dir": path, "mtime_ns": mtime_ns, "subdirs": subdirs}, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        self.tasks = {}
+
+    def _append(
+        self,
+        record: dict,
+        sync: bool = True
+    ):
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with self._lock:
+            if self._file is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._file = open(self.path, "a", encoding="utf-8")
+            self._file.write(line)
+            self._unsynced += 1
+
+            if sync and (
+                self._unsynced >= self.fsync_every
+                or time.monotonic() - self._last_sync >= self.fsync_interval
+            ):
+                self._sync_locked()
+
+    def _sync_locked(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def flush(self):
+        """Принудительно сбросить журнал на диск"""
+        with self._lock:
+            if self._file is not None and self._unsynced:
+                self._sync_locked()
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                if self._unsynced:
+                    self._sync_locked()
+                self._file.close()
+                self._file = None
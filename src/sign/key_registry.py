@@ -0,0 +1,210 @@
+import os
+import time
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+
+def _file_stamp(path: Optional[str]) -> Optional[tuple[int, int]]:
+    """mtime и размер файла (None - файла нет)"""
+    if not path:
+        return None
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+@dataclass(frozen=True)
+class KeyProfile:
+    """Ключ и тип подписи, для которых держится отдельный набор контекстов"""
+    key_file_path: str
+    cert_path: Optional[str] = None
+    is_sign_long_type: bool = True
+    # mtime и размер файлов ключа и сертификата: заменённый файл - другой профиль
+    files_stamp: tuple = ()
+
+    @classmethod
+    def for_files(
+        cls,
+        key_file_path: str,
+        cert_path: Optional[str] = None,
+        is_sign_long_type: bool = True
+    ) -> "KeyProfile":
+        """Профиль с текущими mtime и размером файлов ключа и сертификата"""
+        return cls(
+            key_file_path=key_file_path,
+            cert_path=cert_path,
+            is_sign_long_type=is_sign_long_type,
+            files_stamp=(_file_stamp(key_file_path), _file_stamp(cert_path))
+        )
+
+    def same_key(
+        self,
+        other: "KeyProfile"
+    ) -> bool:
+        """Тот же ключ и тип подписи (возможно, другая версия файлов)"""
+        return (self.key_file_path, self.cert_path, self.is_sign_long_type) == \
+            (other.key_file_path, other.cert_path, other.is_sign_long_type)
+
+
+class KeyRegistry:
+    """
+    Реестр прогретых ключей: по одной записи на `KeyProfile`.
+
+    Запись создаётся `factory(profile)` при первом `acquire` и живёт между
+    пакетами и сессиями. Записи, которые сейчас никто не держит (на каждый
+    `acquire` уже был `release`), вытесняются по LRU сверх `max_entries`
+    и по простою дольше `idle_timeout` секунд; при вытеснении вызывается
+    `entry.close()`.
+
+    Когда создаётся запись для новой версии файлов ключа (`files_stamp`),
+    записи старых версий того же ключа вытесняются, как только их
+    никто не держит.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[KeyProfile], Any],
+        max_entries: int = 4,
+        idle_timeout: Optional[float] = 900.0
+    ):
+        if max_entries < 1:
+            raise ValueError(f"max_entries must be >= 1, got {max_entries}")
+
+        self.factory = factory
+        self.max_entries = max_entries
+        self.idle_timeout = idle_timeout
+
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[KeyProfile, Any] = OrderedDict()
+        self._users: dict[KeyProfile, int] = {}
+        self._last_used: dict[KeyProfile, float] = {}
+        self._creating: dict[KeyProfile, threading.Event] = {}
+        self._superseded: set[KeyProfile] = set()
+
+    def acquire(
+        self,
+        profile: KeyProfile
+    ) -> Any:
+        """Получить запись профиля (создаётся один раз, даже при параллельных вызовах)"""
+        while True:
+            with self._lock:
+                entry = self._entries.get(profile)
+                if entry is not None:
+                    self._entries.move_to_end(profile)
+                    self._users[profile] += 1
+                    self._last_used[profile] = time.monotonic()
+                    return entry
+
+                pending = self._creating.get(profile)
+                if pending is None:
+                    pending = self._creating[profile] = threading.Event()
+                    break
+
+            # Запись уже создаёт другой поток - ждём и берём её
+            pending.wait()
+
+        try:
+            entry = self.factory(profile)
+        except Exception:
+            with self._lock:
+                self._creating.pop(profile).set()
+            raise
+
+        with self._lock:
+            self._entries[profile] = entry
+            self._users[profile] = 1
+            self._last_used[profile] = time.monotonic()
+            self._creating.pop(profile).set()
+            self._superseded.update(
+                p for p in self._entries if p != profile and p.same_key(profile)
+            )
+            evicted = self._evict_locked()
+
+        logging.info(f"Key registry: loaded {profile.key_file_path} (long={profile.is_sign_long_type})")
+        self._close_entries(evicted)
+        return entry
+
+    def release(
+        self,
+        profile: KeyProfile
+    ):
+        """Вернуть запись; она остаётся прогретой до вытеснения"""
+        with self._lock:
+            if self._users.get(profile, 0) > 0:
+                self._users[profile] -= 1
+                self._last_used[profile] = time.monotonic()
+            evicted = self._evict_locked()
+
+        self._close_entries(evicted)
+
+    def users(
+        self,
+        profile: KeyProfile
+    ) -> int:
+        """Сколько раз запись профиля взята и ещё не возвращена"""
+        with self._lock:
+            return self._users.get(profile, 0)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def __contains__(self, profile: KeyProfile) -> bool:
+        with self._lock:
+            return profile in self._entries
+
+    def close(self):
+        """Закрыть все записи (при завершении процесса)"""
+        with self._lock:
+            entries = list(self._entries.items())
+            self._entries.clear()
+            self._users.clear()
+            self._last_used.clear()
+            self._superseded.clear()
+
+        self._close_entries(entries)
+
+    def _evict_locked(self) -> list[tuple[KeyProfile, Any]]:
+        """Выбрать записи к вытеснению: старые версии файлов, по простою, затем по LRU"""
+        now = time.monotonic()
+        idle = [profile for profile in self._entries if self._users[profile] == 0]
+
+        victims = [p for p in idle if p in self._superseded]
+        if self.idle_timeout is not None:
+            victims += [
+                p for p in idle
+                if p not in self._superseded and now - self._last_used[p] > self.idle_timeout
+            ]
+
+        overflow = len(self._entries) - len(victims) - self.max_entries
+        for profile in idle:
+            if overflow <= 0:
+                break
+            if profile not in victims:
+                victims.append(profile)
+                overflow -= 1
+
+        evicted = []
+        for profile in victims:
+            evicted.append((profile, self._entries.pop(profile)))
+            del self._users[profile]
+            del self._last_used[profile]
+            self._superseded.discard(profile)
+        return evicted
+
+    def _close_entries(
+        self,
+        entries: list[tuple[KeyProfile, Any]]
+    ):
+        for profile, entry in entries:
+            try:
+                entry.close()
+            except Exception as e:
+                logging.warning(f"Failed to close key entry {profile.key_file_path}: {e}")
+            else:
+                logging.info(f"Key registry: evicted {profile.key_file_path} (long={profile.is_sign_long_type})")
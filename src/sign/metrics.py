@@ -0,0 +1,125 @@
+import math
+import time
+from contextlib import contextmanager
+from typing import Sequence
+
+
+def percentile(
+    values: Sequence[float],
+    q: float
+) -> float:
+    """Перцентиль `q` (0-100) методом ближайшего ранга; 0.0 для пустой выборки"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(q / 100 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+# Этапы подписи одного файла, которые попадают в SignResult.stage_times
+# (flush - отложенная запись .p7s на диск, от передачи писателю до переименования)
+STAGES = ("read", "key_load", "sign", "write", "flush", "backoff")
+
+
+class StageTimer:
+    """Накопитель времени по этапам подписи (сек)"""
+    
+    def __init__(self):
+        self.timings: dict[str, float] = {}
+    
+    @contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+    
+    def add(
+        self,
+        name: str,
+        seconds: float
+    ):
+        self.timings[name] = self.timings.get(name, 0.0) + seconds
+
+
+class LatencyHistogram:
+    """
+    Гистограмма задержек с логарифмическими корзинами (память не растёт с числом файлов).
+    
+    Корзины от `min_value` с шагом 2^(1/4): перцентиль - верхняя граница
+    корзины, погрешность не больше ~19%. Значения не больше `min_value`
+    (в том числе нулевые) попадают в первую корзину и дают 0.0.
+    """
+    
+    STEPS_PER_DOUBLING = 4
+    
+    def __init__(
+        self,
+        min_value: float = 1e-4,
+        buckets: int = 128
+    ):
+        self.min_value = min_value
+        self.counts = [0] * buckets
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+    
+    def add(self, value: float):
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+        
+        index = 0
+        if value > self.min_value:
+            index = 1 + int(math.log2(value / self.min_value) * self.STEPS_PER_DOUBLING)
+        self.counts[min(index, len(self.counts) - 1)] += 1
+    
+    def _upper_bound(self, index: int) -> float:
+        if index == 0:
+            return 0.0
+        return self.min_value * 2 ** (index / self.STEPS_PER_DOUBLING)
+    
+    def percentile(self, q: float) -> float:
+        """Перцентиль `q` (0-100); 0.0 для пустой гистограммы"""
+        if not self.count:
+            return 0.0
+        rank = max(1, math.ceil(q / 100 * self.count))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return min(self._upper_bound(index), self.max)
+        return self.max
+    
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+
+def summarize_histograms(
+    histograms: dict[str, LatencyHistogram]
+) -> dict[str, dict[str, float]]:
+    """p50/p95/p99 по гистограммам этапов (для format_stage_summary)"""
+    return {
+        stage: {
+            "p50": histogram.percentile(50),
+            "p95": histogram.percentile(95),
+            "p99": histogram.percentile(99)
+        }
+        for stage, histogram in histograms.items()
+        if histogram.count
+    }
+
+
+def format_stage_summary(
+    summary: dict[str, dict[str, float]],
+    indent: str = ""
+) -> str:
+    """Таблица перцентилей по этапам для сообщения о результатах пакета"""
+    lines = [f"{indent}{'stage':<10}{'p50':>9}{'p95':>9}{'p99':>9}"]
+    for stage, values in summary.items():
+        lines.append(
+            f"{indent}{stage:<10}{values['p50']:>8.3f}s{values['p95']:>8.3f}s{values['p99']:>8.3f}s"
+        )
+    return "\n".join(lines)
@@ -1,7 +1,9 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Optional, Callable
 from pathlib import Path
 
+from src.sign.validation_proxy import ValidationProxyConfig
+
 @dataclass
 class SignTask:
     """Задача для подписания файла"""
@@ -14,6 +16,13 @@ class SignTask:
         """Возвращает форматированный путь для БД"""
         path = Path(self.file_path)
         return f"{path.parent.name}/{path.name}"
+    
+    def get_signature_path(self) -> str:
+        """Путь к файлу внешней подписи .p7s"""
+        path = Path(self.file_path)
+        if self.output_dir:
+            return str(Path(self.output_dir) / f"{path.name}.p7s")
+        return f"{self.file_path}.p7s"
 
 
 @dataclass
@@ -24,6 +33,52 @@ class SignResult:
     success: bool
     processing_time: float = 0.0
     error_message: str = ""
+    attempts: int = 1
+    stage_times: dict[str, float] = field(default_factory=dict)  # сек по этапам: read, key_load, sign, write, backoff
+    validation_error: bool = False  # ошибка TSP/OCSP (учитывается предохранителем)
+
+
+@dataclass
+class FolderResult:
+    """Все документы папки пакета обработаны"""
+    folder: str
+    total: int
+    successful: int
+    failed: int
+    
+    @property
+    def success(self) -> bool:
+        return self.failed == 0
+
+
+@dataclass
+class VerifyResult:
+    """Результат проверки подписи файла"""
+    file_path: str
+    signature_path: str
+    status: str  # 'valid' | 'invalid' | 'missing' | 'orphan'
+    signer: str = ""
+    error_message: str = ""
+    processing_time: float = 0.0
+
+
+@dataclass
+class TaskAttempt:
+    """Состояние задачи между попытками подписи"""
+    task: SignTask
+    attempt: int = 1
+    started_at: float = 0.0
+    retry_at: float = 0.0  # момент отправки в очередь повторов
+    stage_times: dict[str, float] = field(default_factory=dict)
+    finished: bool = False  # задача учтена в пакете (результат не записывается дважды)
+    
+    def add_stage_times(
+        self,
+        stage_times: dict[str, float]
+    ):
+        """Сложить время этапов очередной попытки"""
+        for stage, seconds in stage_times.items():
+            self.stage_times[stage] = self.stage_times.get(stage, 0.0) + seconds
 
 
 @dataclass
@@ -33,5 +88,31 @@ class SignerConfig:
     cert_file_path: Optional[Path] = None
     is_sign_long_type: bool = True
     max_attempts: int = 10
-    retry_delay: int = 10
+    retry_delay: int = 10  # базовая задержка экспоненциального backoff, сек
+    max_retry_delay: float = 300.0
+    breaker_failure_threshold: int = 5  # ошибок подряд до размыкания; 0 - выключен
+    breaker_reset_timeout: float = 30.0
     max_workers: int = 1
+    reuse_key_context: bool = True
+    stream_sign_threshold: Optional[int] = None  # байт; None - потоковая подпись выключена
+    hash_chunk_size: int = 4 * 1024 * 1024
+    zero_copy_input: bool = True  # файл в CtxSignData через mmap, без копии в bytes
+    execution_backend: str = "thread"  # 'thread' | 'process'
+    signer_backend: str = "eusign"  # 'eusign' | 'fake'
+    fake_latency: float = 0.0
+    fake_failure_rate: float = 0.0
+    fake_seed: int = 0
+    validation_proxy: Optional[ValidationProxyConfig] = None  # локальный OCSP/TSP прокси
+    adaptive_concurrency: bool = False  # AIMD-лимит подписей в работе (не больше max_workers)
+    min_workers: int = 1
+    target_p95_latency: float = 15.0
+    max_error_rate: float = 0.1
+    write_behind: bool = True  # запись .p7s в отдельном потоке (только execution_backend='thread')
+    deduplicate: bool = False  # одна подпись на побайтово одинаковые файлы пакета
+    journal_dir: Optional[Path] = None  # журнал пакета: продолжение после сбоя, пропуск подписанных папок
+    scan_workers: int = 1  # потоков чтения папок сканером (для сетевых дисков), отдельно от max_workers
+    snapshot_dir: Optional[Path] = None  # снимки дерева: папки с неизменным mtime не перечитываются
+    max_in_flight_per_worker: int = 4  # окно пакета: незавершённых задач на поток подписи
+    report_dir: Optional[Path] = None  # отчёт пакета по файлам (Parquet или JSON Lines)
+    report_format: str = "auto"  # 'auto' | 'parquet' | 'jsonl'
+    schedule_policy: str = "scan"  # 'scan' | 'largest_first' | 'by_folder' - порядок отправки задач
@@ -0,0 +1,232 @@
+import os
+import time
+import queue
+import fnmatch
+import logging
+from pathlib import Path
+from dataclasses import dataclass, field
+from typing import Optional, Callable
+from concurrent.futures import ThreadPoolExecutor, Future
+
+SIGNATURE_SUFFIX = ".p7s"
+
+
+@dataclass
+class PurgeSummary:
+    """Итог удаления подписей (или его предварительного подсчёта)"""
+    files: int = 0
+    bytes: int = 0
+    deleted: int = 0
+    failed: int = 0
+    elapsed: float = 0.0
+    # Папка первого уровня под корнем ("." - сам корень) -> [подписей, байт]
+    by_folder: dict[str, list[int]] = field(default_factory=dict)
+    # Найденные подписи (только при dry_run): удаляются потом через `delete`
+    paths: list[str] = field(default_factory=list)
+
+    def add(
+        self,
+        folder: str,
+        size: int
+    ):
+        self.files += 1
+        self.bytes += size
+        counts = self.by_folder.setdefault(folder, [0, 0])
+        counts[0] += 1
+        counts[1] += size
+
+
+class SignaturePurger:
+    """
+    Удаление файлов подписей `.p7s` в дереве.
+
+    Папки читаются пулом из `workers` потоков (`os.scandir`, без отдельной
+    проверки каждого файла). Найденные подписи удаляются пачками по
+    `batch_size` в том же пуле, пока обход продолжается. С `dry_run`
+    ничего не удаляется: только подсчёт подписей и байт по папкам
+    первого уровня.
+
+    Фильтры: `older_than` - только подписи с mtime старше стольких секунд,
+    `pattern` - шаблон fnmatch по пути подписи относительно корня
+    (например `*/Ace_*/*.pdf.p7s`). Размер и mtime читаются только когда
+    нужны (подсчёт, фильтр по возрасту).
+    """
+
+    def __init__(
+        self,
+        workers: int = 8,
+        batch_size: int = 256,
+        older_than: Optional[float] = None,
+        pattern: Optional[str] = None
+    ):
+        self.workers = workers
+        self.batch_size = batch_size
+        self.older_than = older_than
+        self.pattern = pattern
+
+    def run(
+        self,
+        root_folder: Path,
+        dry_run: bool = False,
+        progress_callback: Optional[Callable[[int, int, str], None]] = None
+    ) -> PurgeSummary:
+        """
+        Найти и (без `dry_run`) удалить подписи.
+
+        `progress_callback(удалено, найдено, ...)` вызывается в вызывающем
+        потоке; пока обход идёт, «найдено» растёт.
+        """
+        root = str(root_folder)
+        summary = PurgeSummary()
+        start = time.perf_counter()
+        need_stat = dry_run or self.older_than is not None
+        cutoff = time.time() - self.older_than if self.older_than is not None else None
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="purge") as pool:
+            # Завершённые задачи пула приходят через очередь: O(1) на задачу
+            completed: queue.Queue = queue.Queue()
+            kinds: dict[Future, str] = {}
+            listing = 0
+            reported = 0.0
+            batch: list[tuple[str, int]] = []
+
+            def submit(kind: str, fn: Callable, *args):
+                future = pool.submit(fn, *args)
+                kinds[future] = kind
+                future.add_done_callback(completed.put)
+
+            submit("list", self._list_directory, root, root, need_stat, cutoff)
+            listing += 1
+
+            while kinds:
+                future = completed.get()
+                if kinds.pop(future) == "list":
+                    listing -= 1
+                    subdirs, signatures = future.result()
+                    for path in subdirs:
+                        submit("list", self._list_directory, path, root, need_stat, cutoff)
+                        listing += 1
+                    for path, size in signatures:
+                        summary.add(self._top_folder(path, root), size)
+                    if dry_run:
+                        summary.paths.extend(path for path, _ in signatures)
+                    else:
+                        batch.extend(signatures)
+                else:
+                    deleted, failed = future.result()
+                    summary.deleted += deleted
+                    summary.failed += failed
+
+                # Неполная пачка уходит, когда обход закончен
+                while len(batch) >= self.batch_size or (batch and not listing):
+                    chunk, batch = batch[:self.batch_size], batch[self.batch_size:]
+                    submit("delete", self._delete, chunk)
+
+                # UI обновляется не чаще 5 раз в секунду и в конце
+                if progress_callback and (not kinds or time.perf_counter() - reported >= 0.2):
+                    reported = time.perf_counter()
+                    progress_callback(summary.deleted + summary.failed, summary.files, 'підписів')
+
+        summary.elapsed = time.perf_counter() - start
+        logging.info(
+            f"{'Dry run' if dry_run else 'Purge'} {root}: {summary.files} signatures, "
+            f"{summary.bytes} bytes, deleted {summary.deleted}, failed {summary.failed} "
+            f"in {summary.elapsed:.2f}s"
+        )
+        return summary
+
+    def delete(
+        self,
+        paths: list[str],
+        progress_callback: Optional[Callable[[int, int, str], None]] = None
+    ) -> PurgeSummary:
+        """
+        Удалить ровно эти подписи (например, найденные предварительным `run`
+        с `dry_run`), без повторного обхода дерева
+        """
+        summary = PurgeSummary(files=len(paths))
+        start = time.perf_counter()
+        chunks = [
+            [(path, 0) for path in paths[i:i + self.batch_size]]
+            for i in range(0, len(paths), self.batch_size)
+        ]
+        reported = 0.0
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="purge") as pool:
+            for done, (deleted, failed) in enumerate(pool.map(self._delete, chunks), start=1):
+                summary.deleted += deleted
+                summary.failed += failed
+                if progress_callback and (done == len(chunks) or time.perf_counter() - reported >= 0.2):
+                    reported = time.perf_counter()
+                    progress_callback(summary.deleted + summary.failed, summary.files, 'підписів')
+
+        summary.elapsed = time.perf_counter() - start
+        logging.info(
+            f"Purge of {summary.files} previewed signatures: deleted {summary.deleted}, "
+            f"failed {summary.failed} in {summary.elapsed:.2f}s"
+        )
+        return summary
+
+    def _list_directory(
+        self,
+        path: str,
+        root: str,
+        need_stat: bool,
+        cutoff: Optional[float]
+    ) -> tuple[list[str], list[tuple[str, int]]]:
+        """Подпапки и подписи (путь, размер) одной папки"""
+        subdirs = []
+        signatures = []
+        try:
+            with os.scandir(path) as it:
+                for entry in it:
+                    try:
+                        # По ссылкам на папки не ходим: удаление не должно выйти за корень
+                        if entry.is_dir(follow_symlinks=False):
+                            subdirs.append(entry.path)
+                            continue
+                        if not entry.name.lower().endswith(SIGNATURE_SUFFIX) or not entry.is_file():
+                            continue
+                        if self.pattern and not fnmatch.fnmatch(
+                            Path(os.path.relpath(entry.path, root)).as_posix(), self.pattern
+                        ):
+                            continue
+
+                        size = 0
+                        if need_stat:
+                            stat = entry.stat()
+                            if cutoff is not None and stat.st_mtime > cutoff:
+                                continue
+                            size = stat.st_size
+                        signatures.append((entry.path, size))
+                    except OSError as e:
+                        logging.warning(f"Error scan entry {entry.path}: {e}")
+        except OSError as e:
+            logging.warning(f"Error scan directory {path}: {e}")
+        return subdirs, signatures
+
+    def _delete(
+        self,
+        batch: list[tuple[str, int]]
+    ) -> tuple[int, int]:
+        """(удалено, ошибок)"""
+        deleted = failed = 0
+        for path, _ in batch:
+            try:
+                os.unlink(path)
+                deleted += 1
+            except FileNotFoundError:
+                # Уже удалена - результат тот же
+                deleted += 1
+            except OSError as e:
+                failed += 1
+                logging.warning(f"Failed to delete {path}: {e}")
+        return deleted, failed
+
+    def _top_folder(
+        self,
+        path: str,
+        root: str
+    ) -> str:
+        relative = os.path.relpath(os.path.dirname(path), root)
+        return relative.split(os.sep, 1)[0]
@@ -0,0 +1,212 @@
+import json
+import time
+import logging
+import threading
+from pathlib import Path
+from dataclasses import dataclass, field
+from typing import Iterator, Optional
+
+from src.sign.model import SignResult
+from src.sign.metrics import STAGES, LatencyHistogram, summarize_histograms
+
+# Сколько ошибок держать в сводке для сообщения и журнала (все - в отчёте)
+FAILURES_SAMPLE = 20
+
+
+@dataclass
+class BatchSummary:
+    """Итог пакета: счётчики и гистограммы вместо списка всех результатов"""
+    total: int = 0
+    successful: int = 0
+    failed: int = 0
+    retried: int = 0
+    report_path: Optional[Path] = None
+    processing: LatencyHistogram = field(default_factory=LatencyHistogram)
+    stages: dict[str, LatencyHistogram] = field(
+        default_factory=lambda: {stage: LatencyHistogram() for stage in STAGES}
+    )
+    # Первые FAILURES_SAMPLE ошибок: (файл, сообщение)
+    failures: list[tuple[str, str]] = field(default_factory=list)
+
+    def add(
+        self,
+        result: SignResult
+    ):
+        self.total += 1
+        if result.success:
+            self.successful += 1
+        else:
+            self.failed += 1
+            if len(self.failures) < FAILURES_SAMPLE:
+                self.failures.append((result.file_path, result.error_message))
+        if result.attempts > 1:
+            self.retried += 1
+
+        self.processing.add(result.processing_time)
+        for stage in STAGES:
+            self.stages[stage].add(result.stage_times.get(stage, 0.0))
+
+    def stage_summary(self) -> dict[str, dict[str, float]]:
+        """p50/p95/p99 по этапам (для format_stage_summary)"""
+        return summarize_histograms(self.stages)
+
+
+def _result_row(result: SignResult) -> dict:
+    row = {
+        "file_path": result.file_path,
+        "output_path": result.output_path,
+        "success": result.success,
+        "error_message": result.error_message,
+        "attempts": result.attempts,
+        "processing_time": result.processing_time
+    }
+    for stage in STAGES:
+        row[f"stage_{stage}"] = result.stage_times.get(stage, 0.0)
+    return row
+
+
+class JsonlReportWriter:
+    """Отчёт пакета построчно в JSON Lines"""
+
+    suffix = ".jsonl"
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._file = open(path, "w", encoding="utf-8")
+
+    def write(self, result: SignResult):
+        self._file.write(json.dumps(_result_row(result), ensure_ascii=False) + "\n")
+
+    def close(self):
+        self._file.close()
+
+
+class ParquetReportWriter:
+    """Отчёт пакета в Parquet: строки копятся до `row_group_size` и пишутся группой"""
+
+    suffix = ".parquet"
+
+    def __init__(
+        self,
+        path: Path,
+        row_group_size: int = 4096
+    ):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self.path = path
+        self.row_group_size = row_group_size
+        self._pa = pa
+        self._schema = pa.schema(
+            [
+                ("file_path", pa.string()),
+                ("output_path", pa.string()),
+                ("success", pa.bool_()),
+                ("error_message", pa.string()),
+                ("attempts", pa.int32()),
+                ("processing_time", pa.float64())
+            ]
+            + [(f"stage_{stage}", pa.float64()) for stage in STAGES]
+        )
+        self._writer = pq.ParquetWriter(str(path), self._schema)
+        self._rows: list[dict] = []
+
+    def write(self, result: SignResult):
+        self._rows.append(_result_row(result))
+        if len(self._rows) >= self.row_group_size:
+            self._flush()
+
+    def _flush(self):
+        if self._rows:
+            self._writer.write_table(self._pa.Table.from_pylist(self._rows, schema=self._schema))
+            self._rows = []
+
+    def close(self):
+        self._flush()
+        self._writer.close()
+
+
+def _pyarrow_available() -> bool:
+    try:
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class BatchResults:
+    """
+    Приём результатов пакета из рабочих потоков.
+
+    Каждый результат сразу учитывается в сводке и дописывается в отчёт
+    (Parquet, если установлен pyarrow, иначе JSON Lines) - в памяти
+    не остаётся ничего, кроме счётчиков и гистограмм.
+    """
+
+    def __init__(
+        self,
+        report_dir: Optional[Path] = None,
+        report_format: str = "auto"
+    ):
+        self.summary = BatchSummary()
+        self._lock = threading.Lock()
+        self._writer = None
+
+        if report_dir is not None:
+            self._writer = self._open_writer(Path(report_dir), report_format)
+            self.summary.report_path = self._writer.path
+
+    def _open_writer(
+        self,
+        report_dir: Path,
+        report_format: str
+    ):
+        if report_format == "auto":
+            report_format = "parquet" if _pyarrow_available() else "jsonl"
+        if report_format not in ("parquet", "jsonl"):
+            raise ValueError(f"Unknown report format: {report_format}")
+
+        writer_class = ParquetReportWriter if report_format == "parquet" else JsonlReportWriter
+        report_dir.mkdir(parents=True, exist_ok=True)
+        stem = f"sign_{time.strftime('%Y%m%d_%H%M%S')}"
+        path = report_dir / f"{stem}{writer_class.suffix}"
+        index = 1
+        while path.exists():
+            path = report_dir / f"{stem}_{index}{writer_class.suffix}"
+            index += 1
+        return writer_class(path)
+
+    def add(
+        self,
+        result: SignResult
+    ):
+        with self._lock:
+            self.summary.add(result)
+            if self._writer is not None:
+                try:
+                    self._writer.write(result)
+                except Exception as e:
+                    logging.error(f"Failed to write batch report {self._writer.path}: {e}")
+                    self._writer = None
+
+    def close(self) -> BatchSummary:
+        with self._lock:
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+        return self.summary
+
+
+def read_report(path: Path) -> Iterator[dict]:
+    """Строки отчёта пакета (Parquet или JSON Lines)"""
+    path = Path(path)
+    if path.suffix == ".parquet":
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(str(path)).iter_batches():
+            yield from batch.to_pylist()
+        return
+
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            yield json.loads(line)
@@ -0,0 +1,159 @@
+import time
+import heapq
+import random
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Any, Optional
+
+
+def backoff_delay(
+    attempt: int,
+    base_delay: float,
+    max_delay: float,
+    rng: Optional[random.Random] = None
+) -> float:
+    """
+    Экспоненциальная задержка с полным джиттером:
+    случайное значение из [0, min(max_delay, base_delay * 2 ** (attempt - 1))].
+    """
+    rng = rng or random
+    ceiling = min(max_delay, base_delay * 2 ** (attempt - 1))
+    return rng.uniform(0, ceiling)
+
+
+class RetryQueue:
+    """Очередь отложенных повторов: элемент становится доступен через `delay` секунд"""
+    
+    def __init__(self):
+        self._heap: list[tuple[float, int, Any]] = []
+        self._counter = 0
+        self._lock = threading.Lock()
+    
+    def push(
+        self,
+        item: Any,
+        delay: float
+    ):
+        with self._lock:
+            heapq.heappush(self._heap, (time.monotonic() + delay, self._counter, item))
+            self._counter += 1
+    
+    def pop_due(self) -> list[Any]:
+        """Забрать все элементы, время которых наступило"""
+        now = time.monotonic()
+        due = []
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now:
+                due.append(heapq.heappop(self._heap)[2])
+        return due
+    
+    def next_due_in(self) -> Optional[float]:
+        """Секунд до ближайшего элемента (None - очередь пуста)"""
+        with self._lock:
+            if not self._heap:
+                return None
+            return max(self._heap[0][0] - time.monotonic(), 0.0)
+    
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._heap)
+
+
+class ValidationServiceError(RuntimeError):
+    """Ошибка шага подписи, которому нужен ответ TSP/OCSP (сеть, сервис АЦСК)"""
+
+
+@contextmanager
+def validation_step(name: str):
+    """Любая ошибка шага считается ошибкой сервисов TSP/OCSP"""
+    try:
+        yield
+    except ValidationServiceError:
+        raise
+    except Exception as e:
+        raise ValidationServiceError(f"{name}: {e}") from e
+
+
+class CircuitBreaker:
+    """
+    Общий предохранитель для сетевых подписей (TSP/OCSP).
+    
+    После `failure_threshold` ошибок TSP/OCSP подряд размыкается: новые
+    подписи ждут `reset_timeout` секунд, затем проходит одна пробная
+    подпись. Успех замыкает предохранитель, ошибка - снова размыкает его.
+    Ошибки самого файла (чтение, запись, испорченный документ) ничего не
+    говорят о сервисах и учитываются через `record_neutral`.
+    """
+    
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+    
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.trips = 0
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._condition = threading.Condition()
+    
+    def wait_for_permission(self):
+        """Дождаться разрешения на подпись (блокирует, пока предохранитель разомкнут)"""
+        with self._condition:
+            while True:
+                if self.state == self.CLOSED:
+                    return
+                
+                if self.state == self.OPEN:
+                    remaining = self._opened_at + self.reset_timeout - time.monotonic()
+                    if remaining > 0:
+                        self._condition.wait(remaining)
+                        continue
+                    self.state = self.HALF_OPEN
+                    logging.info("Circuit breaker half-open: probing TSP/OCSP")
+                
+                if not self._probe_in_flight:
+                    self._probe_in_flight = True
+                    return
+                
+                self._condition.wait()
+    
+    def record_success(self):
+        with self._condition:
+            self._failures = 0
+            if self.state != self.CLOSED:
+                logging.info("Circuit breaker closed: signing resumed")
+            self.state = self.CLOSED
+            self._probe_in_flight = False
+            self._condition.notify_all()
+    
+    def record_failure(self):
+        with self._condition:
+            self._failures += 1
+            probe_failed = self.state == self.HALF_OPEN
+            
+            if probe_failed or (self.state == self.CLOSED and self._failures >= self.failure_threshold):
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+                self.trips += 1
+                logging.warning(
+                    f"Circuit breaker open for {self.reset_timeout}s "
+                    f"after {self._failures} consecutive failures"
+                )
+            
+            self._probe_in_flight = False
+            self._condition.notify_all()
+    
+    def record_neutral(self):
+        """Ошибка, не связанная с TSP/OCSP: состояние предохранителя не меняется"""
+        with self._condition:
+            # Пробная попытка ничего не показала - пусть пройдёт следующая
+            self._probe_in_flight = False
+            self._condition.notify_all()
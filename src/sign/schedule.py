@@ -0,0 +1,108 @@
+import os
+import logging
+import threading
+from typing import Callable, Iterable, Iterator, Optional
+
+from src.sign.model import SignTask, SignResult, FolderResult
+
+SCHEDULE_POLICIES = ("scan", "largest_first", "by_folder")
+
+
+def _file_size(path: str) -> int:
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        # Недоступный файл - в конец: его ошибка не задержит остальные
+        return -1
+
+
+def _folder(task: SignTask) -> str:
+    return os.path.dirname(task.file_path)
+
+
+def largest_first(tasks: list[SignTask]) -> list[SignTask]:
+    """Сначала большие файлы: самая долгая подпись не остаётся на конец пакета"""
+    sizes = {task.file_path: _file_size(task.file_path) for task in tasks}
+    return sorted(tasks, key=lambda task: sizes[task.file_path], reverse=True)
+
+
+def group_by_folder(tasks: Iterable[SignTask]) -> Iterator[list[SignTask]]:
+    """
+    Задачи папками подряд, папки - в порядке первого появления.
+
+    Внутри папки большие файлы идут первыми: папка ждёт свою самую
+    долгую подпись не в самом конце.
+    """
+    folders: dict[str, list[SignTask]] = {}
+    for task in tasks:
+        folders.setdefault(_folder(task), []).append(task)
+    for folder_tasks in folders.values():
+        yield largest_first(folder_tasks)
+
+
+def order_tasks(
+    tasks: list[SignTask],
+    policy: str
+) -> list[SignTask]:
+    """Порядок отправки задач пакета в пул"""
+    if policy not in SCHEDULE_POLICIES:
+        raise ValueError(f"Unknown schedule policy: {policy}")
+    if policy == "largest_first":
+        return largest_first(tasks)
+    if policy == "by_folder":
+        return [task for folder_tasks in group_by_folder(tasks) for task in folder_tasks]
+    return tasks
+
+
+class FolderTracker:
+    """
+    Учёт завершения папок пакета.
+
+    Папка регистрируется числом своих задач (`expect`) до отправки первой
+    из них; когда результат получен для каждой, вызывается `on_complete`
+    с итогом папки - в потоке, завершившем последнюю задачу, без ожидания
+    конца пакета. Исключение обработчика записывается в журнал и не
+    прерывает подпись.
+    """
+
+    def __init__(
+        self,
+        on_complete: Optional[Callable[[FolderResult], None]] = None
+    ):
+        self.on_complete = on_complete
+        self.completed = 0
+
+        self._lock = threading.Lock()
+        # Папка -> [ожидается, успешно, с ошибкой]
+        self._folders: dict[str, list[int]] = {}
+
+    def expect(
+        self,
+        tasks: Iterable[SignTask]
+    ):
+        with self._lock:
+            for task in tasks:
+                self._folders.setdefault(_folder(task), [0, 0, 0])[0] += 1
+
+    def record(
+        self,
+        result: SignResult
+    ):
+        folder = os.path.dirname(result.file_path)
+        with self._lock:
+            counts = self._folders.get(folder)
+            if counts is None:
+                return
+            counts[1 if result.success else 2] += 1
+            if counts[1] + counts[2] < counts[0]:
+                return
+            del self._folders[folder]
+            self.completed += 1
+            folder_result = FolderResult(folder, counts[0], counts[1], counts[2])
+
+        logging.debug(f"Folder completed: {folder_result}")
+        if self.on_complete:
+            try:
+                self.on_complete(folder_result)
+            except Exception as e:
+                logging.error(f"Folder completion handler failed for {folder}: {e}")
@@ -3,7 +3,11 @@ import logging
 from pathlib import Path
 from typing import Callable, Union, Optional
 
+from src.sign.model import SignerConfig, FolderResult
 from src.sign.thread_signer import BatchSigner
+from src.sign.verify import BatchVerifier
+from src.sign.metrics import format_stage_summary
+from src.sign.validation_proxy import ValidationProxyConfig
 
 def sign_folder_documents(
     root_folder: str,
@@ -16,7 +20,18 @@ def sign_folder_documents(
     output_base_dir: Optional[Union[str, Path]] = None,
     callback_progress: Optional[Callable[[int, int, str], None]] = None,
     max_attempts: int = 3,
-    retry_delay: int = 10
+    retry_delay: int = 10,
+    stream_sign_threshold_mb: Optional[int] = None,
+    execution_backend: str = "thread",
+    use_validation_proxy: bool = False,
+    adaptive_concurrency: bool = False,
+    journal_dir: Optional[Union[str, Path]] = "journal",
+    deduplicate: bool = False,
+    scan_workers: int = 1,
+    snapshot_dir: Optional[Union[str, Path]] = "snapshots",
+    report_dir: Optional[Union[str, Path]] = "reports",
+    schedule_policy: str = "scan",
+    callback_folder: Optional[Callable[[FolderResult], None]] = None
 ) -> tuple[bool, str]:
     """
     Выполнить пакетную подпись документов
@@ -33,6 +48,27 @@ def sign_folder_documents(
         callback_progress: Callback для отслеживания прогресса (completed, total)
         max_attempts: Максимальное количество попыток подписи
         retry_delay: Задержка между попытками в секундах
+        stream_sign_threshold_mb: Файлы от этого размера (МБ) подписываются по хэшу,
+                                  без чтения целиком в память
+        execution_backend: 'thread' - пул потоков, 'process' - пул процессов
+                           (своя инициализация библиотеки в каждом процессе)
+        use_validation_proxy: OCSP/TSP через локальный прокси с кэшем ответов OCSP
+        adaptive_concurrency: Подбирать число одновременных подписей (до `workers`)
+                              по задержке и доле ошибок
+        journal_dir: Папка журналов пакетов; прерванный пакет продолжается с места
+                     остановки, полностью подписанные папки не сканируются заново
+        deduplicate: Подписывать побайтово одинаковые файлы один раз и копировать
+                     подпись к остальным
+        scan_workers: Потоков чтения папок при сканировании (больше 1 - для
+                      сетевых дисков с высокой задержкой)
+        snapshot_dir: Папка снимков дерева; при повторном сканировании папки
+                      с неизменным mtime не перечитываются
+        report_dir: Папка отчётов пакета (результат по каждому файлу,
+                    Parquet при установленном pyarrow, иначе JSON Lines)
+        schedule_policy: Порядок подписи: 'scan' - как найдены, 'largest_first' -
+                         сначала большие файлы, 'by_folder' - папками подряд
+        callback_folder: Вызывается из рабочего потока, как только подписаны
+                         все документы папки
     
     Returns:
         Сообщение с результатами подписи
@@ -49,45 +85,78 @@ def sign_folder_documents(
             max_attempts=max_attempts,
             retry_delay=retry_delay,
             max_workers=workers,
-            extensions=extensions
+            extensions=extensions,
+            stream_sign_threshold=(
+                stream_sign_threshold_mb * 1024 * 1024
+                if stream_sign_threshold_mb is not None else None
+            ),
+            execution_backend=execution_backend,
+            validation_proxy=ValidationProxyConfig() if use_validation_proxy else None,
+            adaptive_concurrency=adaptive_concurrency,
+            journal_dir=journal_dir,
+            deduplicate=deduplicate,
+            scan_workers=scan_workers,
+            snapshot_dir=snapshot_dir,
+            report_dir=report_dir,
+            schedule_policy=schedule_policy,
+            on_folder_complete=callback_folder
         )
         
         start_time = time.time()
         
-        results = batch_signer.sign_documents_batch(
+        summary = batch_signer.sign_documents_batch(
             root_folder=root_folder,
             key_password=key_password,
             output_base_dir=output_base_dir,
             progress_callback=callback_progress
         )
         
-        if not results:
+        if not summary.total:
             return (False, "No file for sign!")
         
         elapsed_time = time.time() - start_time
         
-        successful = sum(1 for r in results if r.success)
-        failed = sum(1 for r in results if not r.success)
-        
         message = f"""
 Batch signing completed:
 
-    Successful: {successful}
+    Successful: {summary.successful}
     
-    Failed: {failed}
+    Failed: {summary.failed}
     
-    Total files: {len(results)}
+    Total files: {summary.total}
     
     Total time: {elapsed_time:.2f}s
     
-    Average time per file: {elapsed_time / len(results):.2f}s
+    Average time per file: {elapsed_time / summary.total:.2f}s
         """.strip()
         
-        if failed > 0:
+        message += "\n\n    Stage timings:\n" + format_stage_summary(summary.stage_summary(), indent="    ")
+        
+        dedup_stats = batch_signer.orchestrator.dedup_stats
+        if dedup_stats:
+            message += (
+                f"\n\n    Deduplication: {dedup_stats['unique']} unique, "
+                f"{dedup_stats['signatures_saved']} signatures saved, "
+                f"{dedup_stats['tsp_calls_saved']} TSP calls saved"
+            )
+        
+        concurrency = batch_signer.orchestrator.concurrency
+        if concurrency:
+            message += f"\n\n    Concurrency: {concurrency.summary()}"
+        
+        folders = batch_signer.orchestrator.folders
+        if folders and folders.completed:
+            message += f"\n\n    Folders completed: {folders.completed}"
+        
+        if summary.report_path:
+            message += f"\n\n    Report: {summary.report_path}"
+        
+        if summary.failed > 0:
             logging.warning(f"Failed files:")
-            for result in results:
-                if not result.success:
-                    logging.warning(f"  - {result.file_path}: {result.error_message}")
+            for file_path, error_message in summary.failures:
+                logging.warning(f"  - {file_path}: {error_message}")
+            if summary.failed > len(summary.failures):
+                logging.warning(f"  ... {summary.failed - len(summary.failures)} more, see {summary.report_path}")
         
         logging.info(message)
         return (True, message)
@@ -95,4 +164,85 @@ Batch signing completed:
     except Exception as e:
         message = f"Batch signing failed: {e}"
         logging.error(message)
-        return (False, message)
\ No newline at end of file
+        return (False, message)
+
+
+def verify_folder_signatures(
+    root_folder: str,
+    workers: int = 10,
+    extensions: Optional[list[str]] = None,
+    report_path: Optional[Union[str, Path]] = None,
+    callback_progress: Optional[Callable[[int, int, str], None]] = None,
+    stream_sign_threshold_mb: Optional[int] = None,
+    execution_backend: str = "thread"
+) -> tuple[bool, str]:
+    """
+    Выполнить пакетную проверку подписей .p7s
+    
+    Args:
+        root_folder: Папка с документами и подписями
+        workers: Количество рабочих потоков
+        extensions: Список расширений подписываемых файлов
+        report_path: Файл отчёта JSON Lines (по умолчанию в reports/)
+        callback_progress: Callback для отслеживания прогресса (completed, total)
+        stream_sign_threshold_mb: Файлы от этого размера (МБ) проверяются
+                                  без чтения целиком в память
+        execution_backend: 'thread' - пул потоков, 'process' - пул процессов
+    
+    Returns:
+        Сообщение с результатами проверки
+    """
+    
+    if extensions is None:
+        extensions = ['.pdf', '.xml']
+    
+    try:
+        # Ключ для проверки не нужен
+        config = SignerConfig(
+            key_file_path=Path(),
+            max_workers=workers,
+            stream_sign_threshold=(
+                stream_sign_threshold_mb * 1024 * 1024
+                if stream_sign_threshold_mb is not None else None
+            ),
+            execution_backend=execution_backend
+        )
+        verifier = BatchVerifier(config, extensions)
+        
+        start_time = time.time()
+        
+        summary = verifier.verify_folder(
+            root_folder,
+            report_path=Path(report_path) if report_path else None,
+            progress_callback=callback_progress
+        )
+        
+        total = sum(summary.values())
+        if not total:
+            return (False, "No files for verification!")
+        
+        elapsed_time = time.time() - start_time
+        
+        message = f"""
+Batch verification completed:
+
+    Valid: {summary['valid']}
+    
+    Invalid: {summary['invalid']}
+    
+    Signatures without document: {summary['orphan']}
+    
+    Documents without signature: {summary['missing']}
+    
+    Total time: {elapsed_time:.2f}s
+    
+    Report: {verifier.report_path}
+        """.strip()
+        
+        logging.info(message)
+        return (True, message)
+        
+    except Exception as e:
+        message = f"Batch verification failed: {e}"
+        logging.error(message)
+        return (False, message)
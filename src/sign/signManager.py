@@ -1,45 +1,188 @@
 import os
 import sys
+import atexit
+import importlib
 import threading
 import logging
 import platform
 from pathlib import Path
+from contextlib import contextmanager
+from typing import Union, Optional
+
+from src.sign.validation_proxy import DEFAULT_ENDPOINTS, Endpoints, SharedEndpoints
+from src.sign.key_registry import KeyProfile, KeyRegistry
 
 # Абсолютный путь к каталогу с DLL
 ROOT_DIR = Path(__file__).resolve().parents[2]
-MODULES_DIR = ROOT_DIR / "Modules"
+MODULES_DIR = ROOT_DIR / ("Modules" if platform.system() == "Windows" else "ModulesUNIX")
+
+# Нативный модуль EUSignCP: импортируется при первой подписи или прогреве,
+# а не при импорте этого модуля (веб-приложение импортирует его сразу)
+_native = None
+_native_lock = threading.Lock()
+
+
+def native_module():
+    """Модуль EUSignCP (константы и EULoad/EUGetInterface); импорт при первом вызове"""
+    global _native
+    if _native is None:
+        with _native_lock:
+            if _native is None:
+                _native = _import_native()
+    return _native
 
-sys.path.insert(0, str(ROOT_DIR))
 
-if platform.system() == "Windows":
-    # Для Windows: .pyd + dll
-    MODULES_DIR = ROOT_DIR / "Modules"
-    os.add_dll_directory(str(MODULES_DIR))
-    os.environ["PATH"] = str(MODULES_DIR) + os.pathsep + os.environ.get("PATH", "")
-    from Modules.EUSignCP import *
-elif platform.system() == "Linux":
+def _import_native():
+    sys.path.insert(0, str(ROOT_DIR))
+    
+    if platform.system() == "Windows":
+        # Для Windows: .pyd + dll
+        os.add_dll_directory(str(MODULES_DIR))
+        os.environ["PATH"] = str(MODULES_DIR) + os.pathsep + os.environ.get("PATH", "")
+        return importlib.import_module("Modules.EUSignCP")
+    
     # Для Linux: .so
-    MODULES_DIR = ROOT_DIR / "ModulesUNIX"
     os.environ["LD_LIBRARY_PATH"] = str(MODULES_DIR) + os.pathsep + os.environ.get("LD_LIBRARY_PATH", "")
-    from ModulesUNIX.EUSignCP import *
+    return importlib.import_module("ModulesUNIX.EUSignCP")
+
+
+def is_library_loaded() -> bool:
+    """Инициализирована ли библиотека в этом процессе"""
+    return _library_iface is not None
+
+
+# Интерфейс библиотеки: инициализируется один раз на процесс
+_library_iface = None
+_library_lock = threading.Lock()
+
+
+def get_library_interface():
+    """Интерфейс EUSignCP; библиотека загружается и настраивается при первом вызове"""
+    global _library_iface
+    if _library_iface is None:
+        with _library_lock:
+            if _library_iface is None:
+                _library_iface = _init_library()
+                atexit.register(_finalize_library)
+    return _library_iface
+
+
+def _init_library():
+    """Глобальная инициализация библиотеки"""
+    try:
+        native = native_module()
+        native.EULoad()
+        iface = native.EUGetInterface()
+        iface.SetUIMode(False)
+        if not iface.IsInitialized():
+            iface.Initialize()
+        iface.SetUIMode(False)
+
+        fs = {
+            'szPath': r'C:\Certificates',
+            'bCheckCRLs': False,
+            'bAutoRefresh': True,
+            'bOwnCRLsOnly': False,
+            'bFullAndDeltaCRLs': False,
+            'bAutoDownloadCRLs': False,
+            'bSaveLoadedCerts': True,
+            'dwExpireTime': 3600
+        }
+        iface.SetFileStoreSettings(fs)
+        
+        dSettings = {}
+        dSettings["bUseCMP"] = True
+        dSettings["szAddress"] = "http://acsk.privatbank.ua"
+        dSettings["szPort"] = "80"
+        dSettings["szCommonName"] = ""
+        iface.SetCMPSettings(dSettings)
+        
+        _set_validation_endpoints(iface, *DEFAULT_ENDPOINTS)
+        
+        # Включаємо тимчасові мітки TSP (обов'язково для X Long)
+        iface.SetRuntimeParameter(
+            "SignIncludeContentTimeStamp",
+            True
+        )
+        # Включаємо сертифікати ЦСК
+        iface.SetRuntimeParameter(
+            "SignIncludeCACertificates",
+            True
+        )
+        # Тип підпису глобально - CAdES-X Long. Параметр спільний для всіх
+        # ключів процесу, тому інші типи підписуються з явним типом
+        # (CtxCreateSignerEx), а не через CtxSignData
+        iface.SetRuntimeParameter(
+            "SignType",  # параметр типу підпису
+            native.EU_SIGN_TYPE_CADES_X_LONG  # 16 - CAdES-X Long
+        )
+        
+        logging.info("EUSignCP library initialized successfully")
+        return iface
+        
+    except Exception as e:
+        logging.error(f"Failed to initialize EUSignCP: {e}")
+        raise
+
+
+def _finalize_library():
+    """Cleanup при завершении процесса"""
+    try:
+        get_key_registry().close()
+        if _library_iface is not None:
+            _library_iface.Finalize()
+        native_module().EUUnload()
+        logging.info("EUUnload!")
+    except Exception:
+        pass
+
+
+def _set_validation_endpoints(
+    iface,
+    ocsp_address: str,
+    tsp_address: str,
+    ocsp_port: str = "80",
+    tsp_port: str = "80"
+):
+    dSettings = {}
+    dSettings["bUseOCSP"] = True
+    dSettings["bBeforeStore"] = False
+    dSettings["szAddress"] = ocsp_address
+    dSettings["szPort"] = ocsp_port
+    iface.SetOCSPSettings(dSettings)
+    
+    dSettings = {}
+    dSettings["bGetStamps"] = True
+    dSettings["szAddress"] = tsp_address
+    dSettings["szPort"] = tsp_port
+    iface.SetTSPSettings(dSettings)
+    
+    logging.info(f"Validation endpoints: OCSP {ocsp_address}:{ocsp_port}, TSP {tsp_address}:{tsp_port}")
+
+
+_validation_endpoints = SharedEndpoints(
+    lambda endpoints: _set_validation_endpoints(get_library_interface(), *endpoints)
+)
+
+
+def acquire_validation_endpoints(endpoints: Endpoints = DEFAULT_ENDPOINTS):
+    """
+    Адреса OCSP/TSP на время пакета (АЦСК или локальный `ValidationProxy`).
+    Настройка общая для процесса: пакет с другими адресами ждёт `release`.
+    """
+    _validation_endpoints.acquire(endpoints)
 
 
+def release_validation_endpoints():
+    _validation_endpoints.release()
+
 
 class EUSignCPManager:
     """
-    Менеджер для работы с EUSignCP.
-    Инициализируется один раз и переиспользуется.
+    Менеджер для работы с EUSignCP для одного ключа.
+    Библиотека инициализируется один раз на процесс и общая для всех
+    менеджеров; ключ, сертификат и тип подписи у каждого свои.
     """
-    _instance = None
-    _lock = threading.Lock()
-    _initialized = False
-    
-    def __new__(cls, *args, **kwargs):
-        if cls._instance is None:
-            with cls._lock:
-                if cls._instance is None:
-                    cls._instance = super().__new__(cls)
-        return cls._instance
     
     def __init__(
         self,
@@ -47,84 +190,10 @@ class EUSignCPManager:
         cert_path: str = None,
         is_sign_Long_type: bool = True
     ):
-        if not self._initialized:
-            with self._lock:
-                if not self._initialized:
-                    self._initialized = True
-                    self.key_file_path = key_file_path
-                    self.cert_path = cert_path
-                    self.is_sign_Long_type = is_sign_Long_type
-                    self._init_library()
-    
-    
-    def _init_library(self):
-        """Глобальная инициализация библиотеки"""
-        try:
-            EULoad()
-            self.iface = EUGetInterface()
-            self.iface.SetUIMode(False)
-            if not self.iface.IsInitialized():
-                self.iface.Initialize()
-            self.iface.SetUIMode(False)
-
-            fs = {
-                'szPath': r'C:\Certificates',
-                'bCheckCRLs': False,
-                'bAutoRefresh': True,
-                'bOwnCRLsOnly': False,
-                'bFullAndDeltaCRLs': False,
-                'bAutoDownloadCRLs': False,
-                'bSaveLoadedCerts': True,
-                'dwExpireTime': 3600
-            }
-            self.iface.SetFileStoreSettings(fs)
-            
-            dSettings = {}
-            dSettings["bUseCMP"] = True
-            dSettings["szAddress"] = "http://acsk.privatbank.ua"
-            dSettings["szPort"] = "80"
-            dSettings["szCommonName"] = ""
-            self.iface.SetCMPSettings(dSettings)
-            
-            dSettings = {}
-            dSettings["bUseOCSP"] = True
-            dSettings["bBeforeStore"] = False
-            dSettings["szAddress"] = "http://acsk.privatbank.ua/services/ocsp/"
-            dSettings["szPort"] = "80"
-            self.iface.SetOCSPSettings(dSettings)
-            
-            dSettings = {}
-            dSettings["bGetStamps"] = True
-            dSettings["szAddress"] = "https://ca.informjust.ua/"
-            dSettings["szPort"] = "80"
-            self.iface.SetTSPSettings(dSettings)
-            
-            # Включаємо тимчасові мітки TSP (обов'язково для X Long)
-            self.iface.SetRuntimeParameter(
-                "SignIncludeContentTimeStamp",
-                True
-            )
-            # Включаємо сертифікати ЦСК
-            self.iface.SetRuntimeParameter(
-                "SignIncludeCACertificates",
-                True
-            )
-            # Встановлюємо тип підпису глобально
-            if self.is_sign_Long_type:
-                sign_type = EU_SIGN_TYPE_CADES_X_LONG # 16 - CAdES-X Long
-            else:
-                sign_type = EU_SIGN_TYPE_CADES_BES
-                
-            self.iface.SetRuntimeParameter(
-                "SignType",  # параметр типу підпису
-                sign_type  
-            )
-            
-            logging.info("EUSignCP library initialized successfully")
-            
-        except Exception as e:
-            logging.error(f"Failed to initialize EUSignCP: {e}")
-            raise
+        self.key_file_path = key_file_path
+        self.cert_path = cert_path
+        self.is_sign_Long_type = is_sign_Long_type
+        self.iface = get_library_interface()
         
         
     def load_key(self) -> bytes:
@@ -254,12 +323,184 @@ class EUSignCPManager:
             pass
         
         
-    def __del__(self):
-        """Cleanup при завершении"""
+
+class KeyContext:
+    """
+    Открытые контексты библиотеки и приватного ключа.
+    Ключ расшифровывается один раз, контекст переиспользуется для всех подписей.
+    """
+    
+    def __init__(
+        self,
+        iface,
+        key_bytes: bytes,
+        key_password: Union[str, bytes]
+    ):
+        if isinstance(key_password, str):
+            key_password = key_password.encode("utf-8")
+        
+        self.iface = iface
+        self.owner_info = {}
+        self.closed = False
+        self._certificate = None
+        
+        lib_ctx = []
+        pk_ctx = []
+        
+        try:
+            iface.CtxCreate(lib_ctx)
+            iface.CtxReadPrivateKeyBinary(
+                lib_ctx[0],           # контекст библиотеки
+                key_bytes,            # бинарные данные ZS2/JKS файла
+                len(key_bytes),       # длина данных
+                key_password,         # пароль ключа
+                pk_ctx,               # выходной контекст приватного ключа
+                self.owner_info       # информация о владельце
+            )
+        except Exception:
+            self._free(lib_ctx, pk_ctx)
+            raise
+        
+        self.lib_ctx = lib_ctx[0]
+        self.pk_ctx = pk_ctx[0]
+    
+    def get_certificate(self) -> bytes:
+        """Собственный сертификат ключа (запрашивается один раз)"""
+        if self._certificate is None:
+            cert_info = {}
+            cert_bytes_out = []
+            self.iface.CtxGetOwnCertificate(
+                self.pk_ctx,
+                native_module().EU_CERT_KEY_TYPE_UNKNOWN,
+                native_module().EU_KEY_USAGE_DIGITAL_SIGNATURE,
+                cert_info,
+                cert_bytes_out
+            )
+            
+            if not cert_bytes_out or not cert_bytes_out[0]:
+                raise RuntimeError("Error get certificate")
+            
+            self._certificate = cert_bytes_out[0]
+        
+        return self._certificate
+    
+    def _free(
+        self,
+        lib_ctx: list,
+        pk_ctx: list
+    ):
+        try:
+            if pk_ctx:
+                self.iface.CtxFreePrivateKey(pk_ctx[0])
+        except Exception:
+            pass
+        
+        try:
+            if lib_ctx:
+                self.iface.CtxFree(lib_ctx[0])
+        except Exception:
+            pass
+    
+    def close(self):
+        """Освободить контексты ключа и библиотеки"""
+        if self.closed:
+            return
+        self.closed = True
+        self._free([self.lib_ctx], [self.pk_ctx])
+
+
+class KeyContextCache:
+    """
+    Пул контекстов ключа. Контекст выдаётся одному потоку на время подписи
+    (`lease`) и возвращается в пул: потокобезопасность общего контекста в
+    EUSignCP не гарантирована. Контекстов создаётся не больше, чем подписей
+    шло одновременно, и они переживают пул потоков пакета.
+    """
+    
+    def __init__(
+        self,
+        iface,
+        key_bytes: bytes
+    ):
+        self.iface = iface
+        self.key_bytes = key_bytes
+        self._idle: dict[Union[str, bytes], list[KeyContext]] = {}
+        self._contexts: list[KeyContext] = []
+        self._lock = threading.Lock()
+    
+    @contextmanager
+    def lease(
+        self,
+        key_password: Union[str, bytes]
+    ):
+        """Взять свободный контекст ключа (создаётся, если свободных нет)"""
+        context = None
+        with self._lock:
+            idle = self._idle.get(key_password)
+            while idle and context is None:
+                candidate = idle.pop()
+                if not candidate.closed:
+                    context = candidate
+        
+        if context is None:
+            context = KeyContext(self.iface, self.key_bytes, key_password)
+            with self._lock:
+                self._contexts.append(context)
+            logging.info(f"Key context created for {threading.current_thread().name}")
+        
         try:
-            if hasattr(self, 'iface'):
-                self.iface.Finalize()
-            EUUnload()
-            logging.info("EUUnload!")
-        except:
-            pass
\ No newline at end of file
+            yield context
+        finally:
+            if not context.closed:
+                with self._lock:
+                    self._idle.setdefault(key_password, []).append(context)
+    
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._contexts)
+    
+    def close(self):
+        """Освободить все созданные контексты"""
+        with self._lock:
+            contexts = self._contexts
+            self._contexts = []
+            self._idle = {}
+        
+        for context in contexts:
+            context.close()
+        
+        if contexts:
+            logging.info(f"Released {len(contexts)} key contexts")
+
+
+class KeyEntry:
+    """Прогретый ключ в реестре: менеджер, байты ключа и пул контекстов"""
+    
+    def __init__(
+        self,
+        profile: KeyProfile
+    ):
+        self.profile = profile
+        self.manager = EUSignCPManager(
+            key_file_path=profile.key_file_path,
+            cert_path=profile.cert_path,
+            is_sign_Long_type=profile.is_sign_long_type
+        )
+        self.key_bytes = self.manager.load_key()
+        self.key_contexts = KeyContextCache(self.manager.iface, self.key_bytes)
+    
+    def close(self):
+        self.key_contexts.close()
+
+
+_key_registry: Optional[KeyRegistry] = None
+
+
+def get_key_registry() -> KeyRegistry:
+    """Реестр ключей процесса"""
+    global _key_registry
+    if _key_registry is None:
+        with _library_lock:
+            if _key_registry is None:
+                _key_registry = KeyRegistry(KeyEntry)
+    return _key_registry
@@ -0,0 +1,130 @@
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from typing import Optional
+
+SNAPSHOT_SUFFIX = ".snapshot.jsonl"
+
+# Папку, изменённую позже, чем за столько до чтения, не кэшируем: следующее
+# изменение в пределах той же отметки mtime было бы не видно
+RACY_WINDOW_NS = 2 * 10**9
+
+
+class ScanSnapshot:
+    """
+    Снимок дерева документов между запусками сканера (JSON Lines).
+
+    Для каждой прочитанной папки хранятся её mtime, подпапки, документы
+    (файлы с расширениями сканера) и подписи `.p7s`. При повторном обходе
+    папка с тем же mtime не перечитывается: состав берётся из снимка.
+    mtime папки меняется при добавлении, удалении и переименовании файлов
+    и подпапок в ней самой, поэтому на каждую папку остаётся один stat
+    вместо чтения списка.
+
+    Снимок переписывается целиком (временный файл и переименование) после
+    полного обхода; папки, которых больше нет, в него не попадают. Снимок,
+    снятый с другим набором расширений, не используется.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        extensions: list[str]
+    ):
+        self.path = Path(path)
+        self.extensions = sorted(ext.lower() for ext in extensions)
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._entries: dict[str, dict] = {}
+        self._seen: dict[str, dict] = {}
+
+        self._load()
+
+    @classmethod
+    def for_folder(
+        cls,
+        snapshot_dir: Path,
+        root_folder: Path,
+        extensions: list[str]
+    ) -> "ScanSnapshot":
+        """Снимок корневой папки документов"""
+        key = hashlib.sha1(str(root_folder).encode()).hexdigest()[:16]
+        return cls(Path(snapshot_dir) / f"{key}{SNAPSHOT_SUFFIX}", extensions)
+
+    def _load(self):
+        if not self.path.exists():
+            return
+
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                header = json.loads(f.readline() or "{}")
+                if header.get("extensions") != self.extensions:
+                    logging.info(f"Scan snapshot {self.path} was taken for other extensions, ignoring")
+                    return
+                for line in f:
+                    entry = json.loads(line)
+                    self._entries[entry["dir"]] = entry
+        except (OSError, ValueError, KeyError) as e:
+            logging.warning(f"Ignoring unreadable scan snapshot {self.path}: {e}")
+            self._entries = {}
+
+    def get(
+        self,
+        path: str,
+        mtime_ns: int
+    ) -> Optional[dict]:
+        """Запись папки, если с прошлого обхода её mtime не менялся"""
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is None or entry["mtime_ns"] != mtime_ns:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._seen[path] = entry
+            return entry
+
+    def put(
+        self,
+        path: str,
+        mtime_ns: int,
+        subdirs: list[str],
+        documents: list[str],
+        signatures: list[str]
+    ):
+        """Запомнить только что прочитанную папку"""
+        if time.time_ns() - mtime_ns < RACY_WINDOW_NS:
+            return
+
+        entry = {
+            "dir": path,
+            "mtime_ns": mtime_ns,
+            "subdirs": subdirs,
+            "documents": documents,
+            "signatures": signatures
+        }
+        with self._lock:
+            self._seen[path] = entry
+
+    def save(self):
+        """Записать папки текущего обхода вместо прежнего снимка"""
+        with self._lock:
+            entries, self._entries, self._seen = self._seen, self._seen, {}
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(json.dumps({"extensions": self.extensions}) + "\n")
+            for entry in entries.values():
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        os.replace(tmp_path, self.path)
+
+        logging.info(
+            f"Scan snapshot: {self.hits} folders from snapshot, {self.misses} listed, "
+            f"{len(entries)} saved to {self.path}"
+        )
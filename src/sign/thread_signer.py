@@ -1,22 +1,81 @@
+import os
 import time
 import queue
 import logging
+import threading
 import platform
+import multiprocessing
+import multiprocessing.util
+from dataclasses import dataclass, field, replace
+from collections import deque
 from pathlib import Path, PureWindowsPath
-from typing import Optional, Callable, Union
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Optional, Callable, Union, Iterator, Generator
+from concurrent.futures import Future, ThreadPoolExecutor, ProcessPoolExecutor
 
-from src.sign.model import SignTask, SignResult, SignerConfig
-from src.sign.signManager import EUSignCPManager
-from src.sign.cadesLong_sign import sign_file_cades_x_long
+from src.sign.model import SignTask, SignResult, SignerConfig, TaskAttempt, FolderResult
+from src.sign.metrics import StageTimer
+from src.sign.backends import SignerBackend, create_backend
+from src.sign.validation_proxy import ValidationProxyConfig, get_validation_proxy
+from src.sign.concurrency import AdaptiveConcurrencyLimiter
+from src.sign.retry import RetryQueue, CircuitBreaker, ValidationServiceError, backoff_delay
+from src.sign.journal import SigningJournal
+from src.sign.snapshot import ScanSnapshot
+from src.sign.report import BatchResults, BatchSummary
+from src.sign.schedule import SCHEDULE_POLICIES, FolderTracker, order_tasks, largest_first
+from src.sign.writer import SignatureWriter, write_atomic
+from src.sign.dedup import group_duplicates
 from src.db.dbManager import DatabaseManager
 
+# Главный поток пакета перепроверяет состояние не реже, чем раз в столько секунд,
+# даже если событий нет
+BATCH_WAKEUP_INTERVAL = 5.0
+
+
+def resolve_root_folder(
+    root_folder: Union[str, Path]
+) -> Path:
+    """
+    Путь корневой папки пакета на этой машине.
+
+    На Linux (в контейнере) папка ищется под /app/data: Windows-путь
+    (с \\ или дисковой меткой) переводится в относительный.
+    """
+    root_folder = str(root_folder)
+    if platform.system() == "Linux":
+        base = Path("/app/data")
+        
+        # Нормализация Windows-строки: \ и/или дисковая метка
+        if ("\\" in root_folder) or (":" in root_folder):
+            pw = PureWindowsPath(root_folder)
+            # Отбрасываем диск и корень Windows, оставляем только относительные части
+            parts = [p for p in pw.parts if p not in (pw.drive, pw.root)]
+            rel = Path(*parts)
+        else:
+            # Путь уже в формате Linux (абсолютный путь сохраняется как есть)
+            rel = Path(root_folder)
+        
+        path = base / rel
+        logging.info(f"Root folder: {path}")
+        return path
+    
+    path = Path(root_folder)
+    logging.info(f"Root folder: {path}")
+    return path
+
+
 class ProgressCounter:
     """Простой счётчик для отслеживания прогресса"""
     
-    def __init__(self, total: int):
+    def __init__(self, total: int, estimated: bool = False):
         self.total = total
         self.completed = 0
+        # total - оценка, пока сканер ещё обходит дерево
+        self.estimated = estimated
+    
+    def set_total(self, total: int, estimated: bool = False):
+        """Обновить общее число (оценку во время сканирования или итог)"""
+        self.total = max(total, self.completed)
+        self.estimated = estimated
     
     def increment(self, count: int = 1):
         """Увеличить счётчик"""
@@ -32,100 +91,373 @@ class ProgressCounter:
         return self.completed < self.total
 
 
+_SCAN_DONE = object()
+
+
+class ScanFeed:
+    """
+    Сканер в фоновом потоке, отдающий задачи через ограниченную очередь.
+    
+    Пока очередь заполнена, сканер ждёт: обход не уходит далеко вперёд
+    подписи и не копит задачи в памяти. О каждой задаче сканер сообщает
+    в `wakeup` (значение 0 в очереди прогресса), чтобы главный поток
+    забрал её сразу, а не по таймауту ожидания.
+    """
+    
+    def __init__(
+        self,
+        tasks: Iterator[SignTask],
+        maxsize: int,
+        wakeup: queue.Queue
+    ):
+        self._tasks = tasks
+        self._queue: queue.Queue = queue.Queue(maxsize=maxsize)
+        self._wakeup = wakeup
+        self._cancelled = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="folder-scanner", daemon=True)
+        self.taken = 0
+        self.finished = False
+    
+    def start(self) -> "ScanFeed":
+        self._thread.start()
+        return self
+    
+    def _run(self):
+        try:
+            for task in self._tasks:
+                if self._cancelled.is_set():
+                    break
+                self._queue.put(task)
+                self._wakeup.put(0)
+        except Exception as e:
+            # Подписываются файлы, найденные до ошибки
+            logging.error(f"Folder scan failed: {e}")
+        finally:
+            self._queue.put(_SCAN_DONE)
+            self._wakeup.put(0)
+    
+    def get_nowait(self) -> Optional[SignTask]:
+        """Следующая найденная задача или None, если пока нет"""
+        if self.finished:
+            return None
+        try:
+            item = self._queue.get_nowait()
+        except queue.Empty:
+            return None
+        if item is _SCAN_DONE:
+            self.finished = True
+            return None
+        self.taken += 1
+        return item
+    
+    def close(self):
+        """Остановить сканер (если пакет прерван до конца обхода)"""
+        self._cancelled.set()
+        while self._thread.is_alive():
+            try:
+                self._queue.get(timeout=0.1)
+            except queue.Empty:
+                pass
+
+
+@dataclass
+class DirListing:
+    """Одна папка, прочитанная сканером"""
+    subdirs: list[str] = field(default_factory=list)
+    unsigned: list[str] = field(default_factory=list)
+    # Папка по журналу подписана целиком и не читалась - известны только подпапки
+    complete: bool = False
+    deleted: int = 0
+
+
+class _ListingPrefetcher:
+    """
+    Чтение папок пулом потоков впереди обхода.
+    
+    Папки ждут в очереди в порядке обхода в глубину (подпапки только что
+    прочитанной папки встают в начало), и до `workers * 4` из них читаются
+    заранее. Обход забирает результаты через `get` в том же порядке.
+    """
+    
+    def __init__(
+        self,
+        lister: Callable[[str], DirListing],
+        workers: int
+    ):
+        self._lister = lister
+        self._limit = workers * 4
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="folder-scan")
+        self._pending: deque[str] = deque()
+        self._futures: dict[str, Future] = {}
+    
+    def push(self, paths: list[str]):
+        """Подпапки прочитанной папки: их обход - следующий"""
+        self._pending.extendleft(reversed(paths))
+        self._fill()
+    
+    def get(self, path: str) -> DirListing:
+        future = self._futures.pop(path, None)
+        if future is None:
+            # Ещё не отдана в пул - она первая в очереди
+            if self._pending and self._pending[0] == path:
+                self._pending.popleft()
+            future = self._pool.submit(self._lister, path)
+        self._fill()
+        return future.result()
+    
+    def _fill(self):
+        while self._pending and len(self._futures) < self._limit:
+            path = self._pending.popleft()
+            self._futures[path] = self._pool.submit(self._lister, path)
+    
+    def close(self):
+        self._pool.shutdown(wait=True, cancel_futures=True)
+
+
 class FileScanner:
     """Поиск неподписанных файлов"""
     
-    def __init__(self, extensions: list[str]):
+    def __init__(
+        self,
+        extensions: list[str],
+        scan_workers: int = 1
+    ):
         self.extensions = [ext.lower() for ext in extensions]
+        # Потоков чтения папок (отдельно от потоков подписи)
+        self.scan_workers = scan_workers
+        # Счётчики текущего обхода (см. iter_unsigned_files)
+        self.folders_scanned = 0
+        self.folders_discovered = 0
+        self.files_found = 0
+        self.expected_folders: Optional[int] = None
     
     
-    def _check_root_folder(
-        self,
-        root_folder: str
-    ) -> Path:
-        if platform.system() == "Linux":
-            base = Path("/app/data")
-            
-            # Нормализация Windows-строки: \ и/или дисковая метка
-            if ("\\" in root_folder) or (":" in root_folder):
-                pw = PureWindowsPath(root_folder)
-                # Отбрасываем диск и корень Windows, оставляем только относительные части
-                parts = [p for p in pw.parts if p not in (pw.drive, pw.root)]
-                rel = Path(*parts)
-            
-            path = base / rel
-            logging.info(f"Root folder: {path}")
-            return path
-        
-        path = Path(root_folder)
-        logging.info(f"Root folder: {path}")
-        return path
-    
-    def find_unsigned_files(
+    def iter_unsigned_files(
             self,
             root_folder: Path,
             progress_callback: Optional[Callable[[int, int, str], None]] = None,
-            delete_signatures: bool = False
-        ) -> list[Path]:
-        """Найти все неподписанные файлы в директории и опционально удалить все .p7s"""
+            delete_signatures: bool = False,
+            journal: Optional[SigningJournal] = None,
+            snapshot: Optional[ScanSnapshot] = None,
+            on_folder: Optional[Callable[[str, int], None]] = None
+        ) -> Iterator[Path]:
+        """
+        Неподписанные файлы по мере обхода дерева (генератор).
+        
+        Обход в один проход через `os.scandir`: тип записи берётся из
+        `DirEntry` без отдельного stat, наличие `.p7s` проверяется по именам
+        той же папки, а не запросом к диску на каждый файл. Сначала
+        отдаются файлы папки, затем обходятся подпапки (по имени).
+        
+        При `scan_workers > 1` папки читаются пулом потоков впереди обхода
+        (соседние подпапки - одновременно); порядок файлов тот же, что
+        и при чтении в одном потоке.
+        
+        Первый файл отдаётся сразу, как только найден: подпись может
+        начинаться, пока сканер обходит остальные папки. Счётчики
+        `folders_scanned`, `folders_discovered` и `files_found`
+        обновляются по ходу обхода.
+        
+        С журналом папки, отмеченные в нём полностью подписанными и с тем же
+        mtime, не перечитываются: сканер сразу переходит к их подпапкам.
+        Со снимком (`ScanSnapshot`) так же пропускается чтение любой папки
+        с неизменным mtime; после полного обхода снимок сохраняется.
         
-        root_folder = self._check_root_folder(root_folder)
+        `on_folder(папка, число файлов)` вызывается перед первым файлом
+        каждой папки с неподписанными файлами: файлы папки идут подряд.
+        """
+        if delete_signatures:
+            journal = None
+            snapshot = None
+        
+        root_folder = resolve_root_folder(root_folder)
         logging.info(f"{root_folder}: type {type(root_folder)}")
         
-        unsigned_files: list[Path] = []
-        folder_stats: dict[Path, int] = {}
-        folder_counter = 0
+        self.folders_scanned = 0
+        self.folders_discovered = 0
+        self.files_found = 0
+        # Ожидаемое число папок: из журнала прошлых пакетов, если он есть
+        self.expected_folders = len(journal.dirs) if journal and journal.dirs else None
+        
+        folder_stats: dict[str, int] = {}
         deleted_count = 0
 
-        def scan_directory(path: Path) -> int:
-            nonlocal folder_counter, deleted_count
-            local_unsigned = 0
+        def list_directory(path: str) -> DirListing:
+            return self._list_directory(path, journal, delete_signatures, snapshot)
 
-            try:
-                for item in path.iterdir():
-                    if item.is_dir():
-                        folder_counter += 1
-                        logging.info(f"[Folder #{folder_counter}] {item.name}")
-                        local_unsigned += scan_directory(item)
-                        if progress_callback:
-                            progress_callback(folder_counter, total_folders, 'папок')
-                    elif item.is_file():
-                        # Если включено удаление, удаляем все .p7s
-                        if delete_signatures and item.suffix.lower() == '.p7s':
-                            try:
-                                item.unlink()
-                                deleted_count += 1
-                            except Exception as e:
-                                logging.warning(f"Failed to delete {item}: {e}")
-                            continue
+        prefetcher = None
+        fetch = list_directory
+        if self.scan_workers > 1:
+            prefetcher = _ListingPrefetcher(list_directory, self.scan_workers)
+            fetch = prefetcher.get
 
-                        # Логика поиска неподписанных файлов исходных типов
-                        if item.suffix.lower() in self.extensions:
-                            signature_file = item.with_suffix(item.suffix + '.p7s')
-                            if not signature_file.exists():
-                                unsigned_files.append(item)
-                                local_unsigned += 1
-            except Exception as e:
-                logging.warning(f"Error scan directory {path}: {e}")
+        def report_folder():
+            self.folders_scanned += 1
+            if progress_callback:
+                total = max(self.expected_folders or 0, self.folders_discovered)
+                progress_callback(self.folders_scanned, total, 'папок')
+
+        def scan_directory(path: str) -> Generator[Path, None, int]:
+            nonlocal deleted_count
+            listing = fetch(path)
+            children = [os.path.join(path, name) for name in listing.subdirs]
+            if prefetcher:
+                prefetcher.push(children)
+            
+            self.folders_discovered += len(children)
+            deleted_count += listing.deleted
+
+            if on_folder and listing.unsigned:
+                on_folder(path, len(listing.unsigned))
+            for file_path in listing.unsigned:
+                self.files_found += 1
+                yield Path(file_path)
+            
+            local_unsigned = len(listing.unsigned)
+            for name, child in zip(listing.subdirs, children):
+                report_folder()
+                if not listing.complete:
+                    logging.info(f"[Folder #{self.folders_scanned}] {name}")
+                local_unsigned += yield from scan_directory(child)
+            
+            if journal and not listing.complete:
+                journal.note_scanned_dir(Path(path), listing.subdirs, has_unsigned=bool(listing.unsigned))
 
             if local_unsigned > 0:
                 folder_stats[path] = local_unsigned
 
             return local_unsigned
 
-        logging.info("Counting total folders...")
-        total_folders = sum(1 for _ in root_folder.rglob('*') if _.is_dir())
-        logging.info(f"Total folders: {total_folders}")
+        try:
+            yield from scan_directory(str(root_folder))
+        finally:
+            if prefetcher:
+                prefetcher.close()
 
-        scan_directory(root_folder)
+        if snapshot:
+            try:
+                snapshot.save()
+            except OSError as e:
+                logging.warning(f"Failed to save scan snapshot {snapshot.path}: {e}")
 
         for path, count in folder_stats.items():
-            logging.info(f"Folder {path.name} has {count} unsigned files")
+            logging.info(f"Folder {os.path.basename(path)} has {count} unsigned files")
 
         if delete_signatures:
             logging.info(f"Deleted {deleted_count} .p7s files")
 
-        return unsigned_files
+    def _list_directory(
+            self,
+            path: str,
+            journal: Optional[SigningJournal],
+            delete_signatures: bool,
+            snapshot: Optional[ScanSnapshot] = None
+        ) -> DirListing:
+        """Прочитать одну папку (вызывается и из потоков пула)"""
+        complete_subdirs = journal.complete_subdirs(Path(path)) if journal else None
+        if complete_subdirs is not None:
+            return DirListing(subdirs=complete_subdirs, complete=True)
+        
+        mtime_ns = None
+        if snapshot is not None:
+            try:
+                mtime_ns = os.stat(path).st_mtime_ns
+            except OSError as e:
+                logging.warning(f"Error scan directory {path}: {e}")
+                return DirListing()
+            entry = snapshot.get(path, mtime_ns)
+            if entry is not None:
+                return self._make_listing(path, entry["subdirs"], entry["documents"], entry["signatures"])
+        
+        try:
+            with os.scandir(path) as it:
+                entries = list(it)
+        except OSError as e:
+            logging.warning(f"Error scan directory {path}: {e}")
+            return DirListing()
+        
+        subdirs: list[str] = []
+        documents: list[str] = []
+        signatures: list[str] = []
+        deleted = 0
+
+        for entry in entries:
+            try:
+                if entry.is_dir():
+                    subdirs.append(entry.name)
+                elif entry.is_file():
+                    if entry.name.lower().endswith('.p7s'):
+                        # Если включено удаление, удаляем все .p7s
+                        if not delete_signatures:
+                            signatures.append(entry.name)
+                            continue
+                        try:
+                            os.unlink(entry.path)
+                            deleted += 1
+                        except OSError as e:
+                            logging.warning(f"Failed to delete {entry.path}: {e}")
+                    elif os.path.splitext(entry.name)[1].lower() in self.extensions:
+                        documents.append(entry.name)
+            except OSError as e:
+                logging.warning(f"Error scan entry {entry.path}: {e}")
+
+        if snapshot is not None:
+            snapshot.put(path, mtime_ns, subdirs, documents, signatures)
+        
+        listing = self._make_listing(path, subdirs, documents, signatures)
+        listing.deleted = deleted
+        return listing
+
+    def _make_listing(
+            self,
+            path: str,
+            subdirs: list[str],
+            documents: list[str],
+            signatures: list[str]
+        ) -> DirListing:
+        """Неподписанные документы папки по именам её файлов"""
+        # Логика поиска неподписанных файлов исходных типов
+        signed = {os.path.normcase(name) for name in signatures}
+        unsigned = sorted(
+            os.path.join(path, name) for name in documents
+            if os.path.normcase(name + '.p7s') not in signed
+        )
+        return DirListing(subdirs=sorted(subdirs), unsigned=unsigned)
+
+    def estimate_total(self) -> int:
+        """
+        Оценка числа неподписанных файлов во время обхода.
+        
+        Найденное экстраполируется с просмотренных папок на все известные:
+        найденные при обходе или записанные в журнале (что больше).
+        """
+        expected = max(self.expected_folders or 0, self.folders_discovered)
+        if expected and self.folders_scanned:
+            ratio = max(expected / self.folders_scanned, 1.0)
+            return max(self.files_found, round(self.files_found * ratio))
+        return self.files_found
+
+    def find_unsigned_files(
+            self,
+            root_folder: Path,
+            progress_callback: Optional[Callable[[int, int, str], None]] = None,
+            delete_signatures: bool = False,
+            journal: Optional[SigningJournal] = None,
+            snapshot: Optional[ScanSnapshot] = None
+        ) -> list[Path]:
+        """
+        Найти все неподписанные файлы в директории и опционально удалить все .p7s
+        
+        Отдельного прохода для подсчёта папок нет: в прогрессе всего папок -
+        уже найденные при обходе (или число папок из журнала, если больше).
+        """
+        return list(self.iter_unsigned_files(
+            root_folder,
+            progress_callback,
+            delete_signatures,
+            journal,
+            snapshot
+        ))
 
 
 class SignatureService:
@@ -133,30 +465,23 @@ class SignatureService:
     
     def __init__(
         self, 
-        config: SignerConfig
+        config: SignerConfig,
+        backend: Optional[SignerBackend] = None,
+        writer: Optional[SignatureWriter] = None
     ):
         self.config = config
-        self._init_sign_manager()
-    
-    def _init_sign_manager(self):
-        """Инициализация менеджера подписи"""
-        self.sign_manager = EUSignCPManager(
-            key_file_path=str(self.config.key_file_path),
-            cert_path=str(self.config.cert_file_path) if self.config.cert_file_path else None,
-            is_sign_Long_type=self.config.is_sign_long_type
-        )
-        
-        self.key_bytes = self.sign_manager.load_key()
+        self.backend = backend or create_backend(config, writer)
+    
+    def close(self):
+        """Освободить ресурсы бэкенда, открытые за время пакета"""
+        self.backend.close()
     
     
     def load_certificate(
         self,
         password: str
     ):
-        if self.config.cert_file_path:
-            self.sign_manager.load_and_check_certificate()
-        else:
-            self.sign_manager.load_and_check_certificate(password)
+        return self.backend.load_certificate(password)
             
     
     
@@ -164,75 +489,152 @@ class SignatureService:
         self, 
         task: SignTask
     ) -> SignResult:
-        """Подписать файл с повторными попытками при ошибках"""
-        start_time = time.time()
-        last_error = None
+        """Подписать файл с повторными попытками при ошибках (блокирует поток на время пауз)"""
+        state = TaskAttempt(task=task, started_at=time.time())
         
         for attempt in range(1, self.config.max_attempts + 1):
-            try:
-                output_file = self._perform_signing(task)
-                processing_time = time.time() - start_time
-                
-                if task.on_complete:
-                    task.on_complete()
-                
-                return SignResult(
-                    file_path=task.file_path,
-                    output_path=output_file,
-                    success=True,
-                    processing_time=processing_time
-                )
+            result = self.sign_once(task, attempt)
+            state.add_stage_times(result.stage_times)
             
-            except Exception as e:
-                last_error = e
-                logging.error(
-                    f"Error signing CAdES-X Long (attempt {attempt}/{self.config.max_attempts}): {e}"
-                )
-                
-                if attempt < self.config.max_attempts:
-                    sleep_time = self.config.retry_delay * attempt
-                    time.sleep(sleep_time)
-        
-        processing_time = time.time() - start_time
+            if not result.success and attempt < self.config.max_attempts:
+                delay = backoff_delay(attempt, self.config.retry_delay, self.config.max_retry_delay)
+                time.sleep(delay)
+                state.add_stage_times({"backoff": delay})
+                continue
+            
+            result.processing_time = time.time() - state.started_at
+            result.stage_times = state.stage_times
+            
+            if task.on_complete:
+                task.on_complete()
+            
+            return result
+    
+    def sign_once(
+        self,
+        task: SignTask,
+        attempt: int = 1
+    ) -> SignResult:
+        """Одна попытка подписи без пауз и повторов - их планирует вызывающая сторона"""
+        start_time = time.time()
+        timer = StageTimer()
         
-        if task.on_complete:
-            task.on_complete()
+        try:
+            output_file = self._perform_signing(task, timer)
+            return SignResult(
+                file_path=task.file_path,
+                output_path=output_file,
+                success=True,
+                processing_time=time.time() - start_time,
+                attempts=attempt,
+                stage_times=timer.timings
+            )
         
-        return SignResult(
-            file_path=task.file_path,
-            output_path="",
-            success=False,
-            error_message=str(last_error),
-            processing_time=processing_time
-        )
+        except Exception as e:
+            logging.error(
+                f"Error signing CAdES-X Long (attempt {attempt}/{self.config.max_attempts}): {e}"
+            )
+            return SignResult(
+                file_path=task.file_path,
+                output_path="",
+                success=False,
+                error_message=str(e),
+                processing_time=time.time() - start_time,
+                attempts=attempt,
+                stage_times=timer.timings,
+                validation_error=isinstance(e, ValidationServiceError)
+            )
     
     def _perform_signing(
         self, 
-        task: SignTask
+        task: SignTask,
+        timer: Optional[StageTimer] = None
     ) -> str:
         """Выполнить операцию подписания"""
-        _, output_file = sign_file_cades_x_long(
-            iface=self.sign_manager.iface,
-            key_bytes=self.key_bytes,
-            key_password=task.key_password,
-            target_file_path=task.file_path
-        )
-        return output_file
+        return self.backend.sign(task, timer)
+
+
+# Сервис подписи дочернего процесса (execution_backend="process")
+_process_service: Optional[SignatureService] = None
+
+
+def _init_process_worker(
+    config: SignerConfig,
+    log_level: int = logging.INFO
+):
+    """Инициализация процесса пула: свой EULoad/Initialize и свои контексты ключа"""
+    global _process_service
+    logging.basicConfig(
+        level=log_level,
+        format='%(asctime)s %(levelname)s [%(processName)s:%(funcName)s] %(message)s'
+    )
+    _process_service = SignatureService(config)
+    multiprocessing.util.Finalize(None, _process_service.close, exitpriority=10)
+
+
+def _process_sign_once(
+    task: SignTask,
+    attempt: int
+) -> SignResult:
+    """Одна попытка подписи в дочернем процессе (повторы планирует родитель)"""
+    return _process_service.sign_once(task, attempt)
 
 
 class BatchOrchestrator:
-    """Оркестратор для пакетной подписи документов"""
+    """
+    Оркестратор для пакетной подписи документов
+    
+    Порядок отправки задач - `config.schedule_policy`: 'scan' - как нашёл
+    сканер, 'largest_first' - сначала большие файлы (меньше хвост пакета),
+    'by_folder' - папками подряд, чтобы каждая папка дела была готова как
+    можно раньше. Когда обработан последний документ папки, вызывается
+    `on_folder_complete(FolderResult)` - сразу, в рабочем потоке.
+    """
     
     def __init__(
         self,
         config: SignerConfig,
         extensions: list[str],
-        db_manager: Optional[DatabaseManager] = None
+        db_manager: Optional[DatabaseManager] = None,
+        backend: Optional[SignerBackend] = None,
+        on_folder_complete: Optional[Callable[[FolderResult], None]] = None
     ):
+        if config.schedule_policy not in SCHEDULE_POLICIES:
+            raise ValueError(f"Unknown schedule policy: {config.schedule_policy}")
+        if config.validation_proxy and config.validation_proxy.offline and config.signer_backend != "fake":
+            # Записанный ответ TSP не подходит к новому запросу (nonce, хэш) - EUSignCP его отвергнет
+            raise ValueError("Offline validation proxy works only with the fake signer backend")
+        
         self.config = config
-        self.file_scanner = FileScanner(extensions)
-        self.signature_service = SignatureService(config)
+        self.on_folder_complete = on_folder_complete
+        # Папки текущего (последнего) пакета: завершённые и ожидающие
+        self.folders: Optional[FolderTracker] = None
+        self.file_scanner = FileScanner(extensions, config.scan_workers)
         self.db_manager = db_manager
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+        self.concurrency: Optional[AdaptiveConcurrencyLimiter] = None
+        self.breaker: Optional[CircuitBreaker] = None
+        self._retry_queue = RetryQueue()
+        self._journal: Optional[SigningJournal] = None
+        # Дедупликация: путь подписываемого файла -> задачи его копий
+        self._duplicates: dict[str, list[SignTask]] = {}
+        # Сводка и отчёт текущего пакета, число завершённых задач (для окна)
+        self._results: Optional[BatchResults] = None
+        self._finished_lock = threading.Lock()
+        self._finished = 0
+        self._progress_queue: queue.Queue = queue.Queue()
+        self.dedup_stats: Optional[dict[str, int]] = None
+        
+        # В режиме процессов бэкенд создаётся в каждом процессе пула по config
+        # и пишет .p7s сам: байты подписи не гоняются между процессами
+        self.signature_service = None
+        self.writer: Optional[SignatureWriter] = None
+        if config.execution_backend == "thread":
+            if config.write_behind:
+                self.writer = SignatureWriter()
+            self.signature_service = SignatureService(config, backend, self.writer)
+        elif config.execution_backend != "process":
+            raise ValueError(f"Unknown execution backend: {config.execution_backend}")
     
     def process_folder(
         self,
@@ -240,26 +642,89 @@ class BatchOrchestrator:
         key_password: str,
         output_base_dir: Optional[Path] = None,
         progress_callback: Optional[Callable[[int, int, str], None]] = None
-    ) -> list[SignResult]:
-        """Обработать все неподписанные файлы в папке"""
+    ) -> BatchSummary:
+        """
+        Обработать все неподписанные файлы в папке
         
-        unsigned_files = self.file_scanner.find_unsigned_files(
-            root_folder,
-            progress_callback
-        )
+        Обычно сканер работает в фоне, и подпись начинается с первого
+        найденного файла. Полный список до старта нужен только при
+        дедупликации (копии ищутся по всем файлам), при порядке
+        'largest_first' (сортировка по всем файлам) и при продолжении
+        прерванного пакета (список берётся из журнала).
+        
+        Ключ и адреса OCSP/TSP, взятые бэкендом, возвращаются при любом
+        выходе - и для пустой папки, и при ошибке до старта пакета.
+        """
+        try:
+            return self._process_folder(root_folder, key_password, output_base_dir, progress_callback)
+        finally:
+            # Ключ возвращается в реестр: прогретые контексты переживают пакет
+            if self.signature_service:
+                self.signature_service.close()
+    
+    def _process_folder(
+        self,
+        root_folder: Path,
+        key_password: str,
+        output_base_dir: Optional[Path],
+        progress_callback: Optional[Callable[[int, int, str], None]]
+    ) -> BatchSummary:
+        self.folders = FolderTracker(self.on_folder_complete)
+        
+        journal = None
+        if self.config.journal_dir:
+            journal = SigningJournal.for_folder(
+                self.config.journal_dir,
+                root_folder,
+                output_base_dir,
+                self.file_scanner.extensions
+            )
+        
+        snapshot = None
+        if self.config.snapshot_dir:
+            snapshot = ScanSnapshot.for_folder(self.config.snapshot_dir, root_folder, self.file_scanner.extensions)
+        
+        progress_queue = queue.Queue()
+        feed = None
+        
+        if journal and journal.unfinished:
+            # Прерванный пакет: только незавершённые файлы, без сканирования дерева
+            unsigned_files = journal.pending_files()
+            logging.info(f"Resuming interrupted batch from {journal.path}")
+            journal.resume()
+        elif self.config.deduplicate or self.config.schedule_policy == "largest_first":
+            unsigned_files = self.file_scanner.find_unsigned_files(
+                root_folder,
+                progress_callback,
+                journal=journal,
+                snapshot=snapshot
+            )
+            if journal:
+                journal.begin(unsigned_files, root_folder)
+        else:
+            unsigned_files = []
+            if journal:
+                journal.begin(unsigned_files, root_folder)
+            feed = ScanFeed(
+                self._scan_tasks(root_folder, key_password, output_base_dir, progress_queue, journal, snapshot),
+                maxsize=self.config.max_workers * 4,
+                wakeup=progress_queue
+            )
         
-        if not unsigned_files:
+        if not unsigned_files and feed is None:
             logging.warning(f"No unsigned documents found in {root_folder}")
-            return []
+            if journal:
+                journal.end()
+                journal.close()
+            return BatchSummary()
         
-        logging.info(f"Found {len(unsigned_files)} documents to sign")
+        if unsigned_files:
+            logging.info(f"Found {len(unsigned_files)} documents to sign")
         
-        if self.db_manager:
+        if self.db_manager and unsigned_files:
             file_paths = [str(f) for f in unsigned_files]
             self.db_manager.add_files_for_signing(file_paths, False)
         
-        progress_queue = queue.Queue()
-        
         tasks = self._create_tasks(
             unsigned_files,
             root_folder,
@@ -268,7 +733,70 @@ class BatchOrchestrator:
             progress_queue
         )
         
-        return self._execute_batch(tasks, progress_queue, progress_callback)
+        # Копии при дедупликации тоже входят в свою папку
+        self.folders.expect(tasks)
+        
+        if self.config.deduplicate:
+            tasks = self._deduplicate(tasks)
+        
+        tasks = order_tasks(tasks, self.config.schedule_policy)
+        
+        self._journal = journal
+        try:
+            summary = self._execute_batch(tasks, progress_queue, progress_callback, feed)
+            if feed and not feed.taken:
+                logging.warning(f"No unsigned documents found in {root_folder}")
+            # Без `end` пакет останется незавершённым и продолжится при следующем запуске
+            if journal:
+                journal.end()
+            return summary
+        finally:
+            self._journal = None
+            if journal:
+                journal.close()
+    
+    def _scan_tasks(
+        self,
+        root_folder: Path,
+        key_password: str,
+        output_base_dir: Optional[Path],
+        progress_queue: queue.Queue,
+        journal: Optional[SigningJournal],
+        snapshot: Optional[ScanSnapshot] = None
+    ) -> Iterator[SignTask]:
+        """
+        Задачи по мере обхода дерева (выполняется в потоке сканера)
+        
+        Файлы одной папки сканер отдаёт подряд; задачи папки отдаются
+        вместе, после её регистрации в `folders`. При 'by_folder' внутри
+        папки сначала большие файлы.
+        """
+        # Число файлов в папках, о которых сканер уже сообщил
+        folder_sizes: deque[int] = deque()
+        files = self.file_scanner.iter_unsigned_files(
+            root_folder,
+            journal=journal,
+            snapshot=snapshot,
+            on_folder=lambda path, count: folder_sizes.append(count)
+        )
+        
+        folder_files: list[Path] = []
+        for file_path in files:
+            if journal:
+                journal.add_task(file_path)
+            folder_files.append(file_path)
+            if len(folder_files) < folder_sizes[0]:
+                continue
+            
+            folder_sizes.popleft()
+            if self.db_manager:
+                self.db_manager.add_files_for_signing([str(f) for f in folder_files], False)
+            tasks = self._create_tasks(folder_files, root_folder, key_password, output_base_dir, progress_queue)
+            self.folders.expect(tasks)
+            if self.config.schedule_policy == "by_folder":
+                tasks = largest_first(tasks)
+            folder_files = []
+            yield from tasks
     
     def _create_tasks(
         self,
@@ -279,82 +807,456 @@ class BatchOrchestrator:
         progress_queue: queue.Queue
     ) -> list[SignTask]:
         """Создать задачи для подписания файлов"""
+        return [
+            self._create_task(file_path, root_folder, key_password, output_base_dir, progress_queue)
+            for file_path in files
+        ]
+    
+    def _create_task(
+        self,
+        file_path: Path,
+        root_folder: Path,
+        key_password: str,
+        output_base_dir: Optional[Path],
+        progress_queue: queue.Queue
+    ) -> SignTask:
+        """Создать задачу подписи одного файла"""
+        output_dir = None
+        if output_base_dir:
+            rel_path = file_path.relative_to(root_folder)
+            output_dir = output_base_dir / rel_path.parent
+            output_dir.mkdir(parents=True, exist_ok=True)
         
-        tasks = []
+        def on_complete_callback():
+            progress_queue.put(1)
         
-        for file_path in files:
-            output_dir = None
-            if output_base_dir:
-                rel_path = file_path.relative_to(root_folder)
-                output_dir = output_base_dir / rel_path.parent
-                output_dir.mkdir(parents=True, exist_ok=True)
-            
-            def on_complete_callback():
-                progress_queue.put(1)
-            
-            task = SignTask(
-                file_path=str(file_path),
-                key_password=key_password,
-                output_dir=str(output_dir) if output_dir else None,
-                on_complete=on_complete_callback
-            )
-            tasks.append(task)
+        return SignTask(
+            file_path=str(file_path),
+            key_password=key_password,
+            output_dir=str(output_dir) if output_dir else None,
+            on_complete=on_complete_callback
+        )
+    
+    def _deduplicate(
+        self,
+        tasks: list[SignTask]
+    ) -> list[SignTask]:
+        """Оставить по одной задаче на содержимое; копии получат ту же подпись"""
+        primaries, self._duplicates = group_duplicates(tasks, self.config.max_workers)
         
-        return tasks
+        saved = sum(len(copies) for copies in self._duplicates.values())
+        self.dedup_stats = {
+            "unique": len(primaries),
+            "duplicates": saved,
+            "signatures_saved": saved,
+            # Каждая подпись CAdES-X Long - минимум один запрос метки времени
+            "tsp_calls_saved": saved if self.config.is_sign_long_type else 0
+        }
+        logging.info(f"Deduplication: {len(primaries)} unique documents, {saved} copies")
+        return primaries
     
     def _execute_batch(
         self,
         tasks: list[SignTask],
         progress_queue: queue.Queue,
-        progress_callback: Optional[Callable[[int, int], None]]
-    ) -> list[SignResult]:
-        """Выполнить пакетную обработку задач"""
-        results = []
-        docs_counter = ProgressCounter(len(tasks))
-        
-        with ThreadPoolExecutor(max_workers=self.config.max_workers) as executor:
-            futures = {
-                executor.submit(self.signature_service.sign_file, task): task
-                for task in tasks
-            }
-            
-            logging.info(f"Starting batch processing with {self.config.max_workers} workers")
+        progress_callback: Optional[Callable[[int, int, str], None]],
+        feed: Optional[ScanFeed] = None
+    ) -> BatchSummary:
+        """
+        Выполнить пакетную обработку задач
+        
+        В пуле одновременно не больше `max_workers * max_in_flight_per_worker`
+        незавершённых задач (вместе с ждущими повтора): следующая задача
+        отдаётся, когда завершается одна из прежних. Главный поток не
+        опрашивает фьючерсы - он ждёт событий в `progress_queue`
+        (1 - документ завершён, 0 - новая задача сканера или повтор)
+        и просыпается к сроку ближайшего повтора.
+        
+        С `feed` задачи приходят от сканера во время работы, а общее число
+        в прогрессе - оценка, пока обход не закончен.
+        
+        Результаты не копятся списком: каждый сразу попадает в сводку
+        (счётчики, гистограммы времени) и в отчёт в `config.report_dir`.
+        """
+        docs_counter = ProgressCounter(
+            len(tasks) + sum(len(copies) for copies in self._duplicates.values()),
+            estimated=feed is not None
+        )
+        self._results = BatchResults(self.config.report_dir, self.config.report_format)
+        self._finished = 0
+        self._progress_queue = progress_queue
+        self._retry_queue = RetryQueue()
+        if self.writer:
+            self.writer.latencies = []
+        
+        if self.config.breaker_failure_threshold > 0:
+            self.breaker = CircuitBreaker(
+                failure_threshold=self.config.breaker_failure_threshold,
+                reset_timeout=self.config.breaker_reset_timeout
+            )
+        
+        if self.config.adaptive_concurrency:
+            # Пул создаётся на max_workers, реальное число подписей в работе задаёт лимитер
+            self.concurrency = AdaptiveConcurrencyLimiter(
+                initial_limit=max(self.config.min_workers, self.config.max_workers // 2),
+                min_limit=self.config.min_workers,
+                max_limit=self.config.max_workers,
+                target_p95_latency=self.config.target_p95_latency,
+                max_error_rate=self.config.max_error_rate
+            )
+        
+        if self.config.execution_backend == "process":
+            self._process_pool = ProcessPoolExecutor(
+                max_workers=self.config.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_process_worker,
+                initargs=(self._process_config(), logging.getLogger().getEffectiveLevel())
+            )
+        
+        window = self.config.max_workers * self.config.max_in_flight_per_worker
+        pending = iter(tasks)
+        listed_done = False
+        submitted = 0
+        
+        try:
+            # В режиме процессов потоки только передают задачи в пул процессов
+            with ThreadPoolExecutor(max_workers=self.config.max_workers) as executor:
+                
+                def submit(state: TaskAttempt):
+                    future = executor.submit(self._sign_task, state)
+                    future.add_done_callback(lambda f: self._attempt_done(f, state))
+                
+                logging.info(
+                    f"Starting batch processing with {self.config.max_workers} "
+                    f"{self.config.execution_backend} workers, window {window}"
+                )
+                if feed:
+                    feed.start()
             
-            while docs_counter.is_incomplete() or any(f.running() for f in futures):
-                try:
-                    # Ждём сигнал о завершении задачи из очереди (timeout 0.2 сек)
-                    progress_queue.get(timeout=0.2)
+                while True:
+                    # Новые задачи - пока окно не заполнено
+                    while submitted - self._finished < window:
+                        task = None
+                        if not listed_done:
+                            task = next(pending, None)
+                            listed_done = task is None
+                        if task is None and feed:
+                            task = feed.get_nowait()
+                        if task is None:
+                            break
+                        submit(TaskAttempt(task=task))
+                        submitted += 1
+                    
+                    if feed:
+                        if feed.finished:
+                            docs_counter.set_total(feed.taken)
+                        else:
+                            docs_counter.set_total(
+                                max(feed.taken, self.file_scanner.estimate_total()),
+                                estimated=True
+                            )
+                    
+                    # Повторы, время которых наступило, снова отправляются в пул
+                    for state in self._retry_queue.pop_due():
+                        submit(state)
+                    
+                    sources_done = listed_done and (feed is None or feed.finished)
+                    if sources_done and self._finished == submitted:
+                        break
+                    
+                    # Ждём события, но не дольше срока ближайшего повтора
+                    # и не дольше BATCH_WAKEUP_INTERVAL
+                    timeout = self._retry_queue.next_due_in()
+                    timeout = BATCH_WAKEUP_INTERVAL if timeout is None else min(timeout, BATCH_WAKEUP_INTERVAL)
+                    try:
+                        completed = progress_queue.get(timeout=timeout)
+                    except queue.Empty:
+                        continue
                     
                     # Увеличиваем счётчик
-                    docs_counter.increment()
+                    docs_counter.increment(completed)
                     
                     # Вызываем callback для обновления UI
                     # ВАЖНО: callback вызывается в ГЛАВНОМ потоке!
-                    if progress_callback:
-                        progress_callback(*docs_counter.get_value())
-                        
-                except queue.Empty:
-                    # Если очередь пуста, просто продолжаем ожидание
-                    pass
+                    if progress_callback and docs_counter.total:
+                        progress_callback(
+                            *docs_counter.get_value(),
+                            'документів (оцінка, пошук триває)' if docs_counter.estimated else 'документів'
+                        )
+        finally:
+            if feed:
+                feed.close()
+            if self.writer:
+                # Дописать очередь и остановить поток писателя: следующий пакет запустит новый
+                self.writer.close()
+            if self._process_pool:
+                self._process_pool.shutdown(wait=True)
+                self._process_pool = None
+            summary = self._results.close()
+        
+        # Последние события (копии при дедупликации) - в прогресс
+        while not progress_queue.empty():
+            docs_counter.increment(progress_queue.get_nowait())
+        if progress_callback and docs_counter.total:
+            progress_callback(*docs_counter.get_value(), 'документів')
+        
+        self._duplicates = {}
+        
+        if self.config.validation_proxy:
+            proxy = get_validation_proxy(self.config.validation_proxy)
+            logging.info(f"Validation proxy stats: {proxy.stats}")
+        
+        if self.concurrency:
+            logging.info(f"Adaptive concurrency: {self.concurrency.summary()}")
+        
+        if self.writer and self.writer.latencies:
+            logging.info(f"Signature write latency: {self.writer.summary()}")
+        
+        if self.breaker and self.breaker.trips:
+            logging.warning(f"Circuit breaker opened {self.breaker.trips} times during the batch")
+        
+        if self.folders and self.folders.completed:
+            logging.info(f"Folders completed during the batch: {self.folders.completed}")
+        
+        logging.info(
+            f"Batch processing completed: {summary.total} files processed, "
+            f"{summary.failed} failed, {summary.retried} retried"
+        )
+        if summary.report_path:
+            logging.info(f"Batch report: {summary.report_path}")
+        return summary
+    
+    def _attempt_done(
+        self,
+        future: Future,
+        state: TaskAttempt
+    ):
+        """Попытка упала вне обработки ошибок подписи - задача завершается ошибкой"""
+        error = future.exception()
+        if error is None or state.finished:
+            return
+        logging.error(f"Exception for {state.task.file_path}: {error}")
+        self._complete_task(
+            SignResult(
+                file_path=state.task.file_path,
+                output_path="",
+                success=False,
+                error_message=str(error),
+                attempts=state.attempt
+            ),
+            state
+        )
+    
+    def _process_config(self) -> SignerConfig:
+        """
+        Конфигурация для процессов пула: прокси OCSP/TSP запускается один раз
+        в родителе, процессы используют его адрес и общий кэш.
+        """
+        proxy_config = self.config.validation_proxy
+        if not proxy_config or not proxy_config.serve:
+            return self.config
+        
+        proxy = get_validation_proxy(proxy_config)
+        return replace(
+            self.config,
+            validation_proxy=replace(proxy_config, port=proxy.port, serve=False)
+        )
+    
+    def _sign_task(
+        self,
+        state: TaskAttempt
+    ) -> Optional[SignResult]:
+        """
+        Одна попытка подписи в рабочем потоке.
+        
+        При ошибке поток не спит: задача уходит в очередь повторов с
+        экспоненциальной задержкой, а поток берёт следующий файл.
+        Возвращает None, если задача отложена.
+        """
+        task, attempt = state.task, state.attempt
+        if not state.started_at:
+            state.started_at = time.time()
+        if state.retry_at:
+            # Время от неудачной попытки до новой - ожидание в очереди повторов
+            state.add_stage_times({"backoff": time.time() - state.retry_at})
+        
+        if self.breaker:
+            self.breaker.wait_for_permission()
+        if self.concurrency:
+            self.concurrency.acquire()
+        
+        attempt_start = time.time()
+        try:
+            result = self._dispatch_task(task, attempt)
+        except Exception as e:
+            logging.error(f"Exception for {task.file_path}: {e}")
+            result = SignResult(
+                file_path=task.file_path,
+                output_path="",
+                success=False,
+                error_message=str(e),
+                attempts=attempt,
+                validation_error=isinstance(e, ValidationServiceError)
+            )
+        
+        state.add_stage_times(result.stage_times)
+        
+        if self.concurrency:
+            # Снижать параллельность стоит только из-за TSP/OCSP (в т.ч. таймаутов):
+            # испорченный документ или ошибка записи от неё не зависят
+            self.concurrency.release(time.time() - attempt_start, not result.validation_error)
+        if self.breaker:
+            if result.success:
+                self.breaker.record_success()
+            elif result.validation_error:
+                self.breaker.record_failure()
+            else:
+                # Нечитаемый или испорченный документ, ошибка записи - не повод останавливать пакет
+                self.breaker.record_neutral()
+        
+        if not result.success and attempt < self.config.max_attempts:
+            delay = backoff_delay(attempt, self.config.retry_delay, self.config.max_retry_delay)
+            logging.info(
+                f"Retry {task.file_path} in {delay:.1f}s "
+                f"(attempt {attempt + 1}/{self.config.max_attempts})"
+            )
+            state.attempt += 1
+            state.retry_at = time.time()
+            self._retry_queue.push(state, delay)
+            # Главный поток ждёт событий - пусть пересчитает срок ожидания
+            self._progress_queue.put(0)
+            return None
+        
+        result.processing_time = time.time() - state.started_at
+        result.stage_times = state.stage_times
+        
+        pending_write = self.writer.take(result.output_path) if self.writer and result.success else None
+        if pending_write is not None:
+            # Задача завершится, когда писатель положит .p7s на место
+            pending_write.add_done_callback(
+                lambda future: self._complete_write(future, result, state)
+            )
+        else:
+            self._complete_task(result, state)
+        
+        return result
+    
+    def _complete_write(
+        self,
+        future: Future,
+        result: SignResult,
+        state: TaskAttempt
+    ):
+        """Итог отложенной записи: ошибка записи делает результат неуспешным"""
+        error = future.exception()
+        if error is not None:
+            result.success = False
+            result.error_message = f"Failed to write signature: {error}"
+        else:
+            result.stage_times["flush"] = future.result()
+        self._complete_task(result, state)
+    
+    def _complete_task(
+        self,
+        result: SignResult,
+        state: TaskAttempt
+    ):
+        """
+        Окончательный результат: журнал, копии, окно задач и прогресс
+        
+        Вызывается и из колбэков фьючерсов, где исключение было бы потеряно:
+        ошибка учёта записывается в журнал, а задача всё равно считается
+        завершённой - иначе главный поток ждал бы её вечно.
+        """
+        task = state.task
+        state.finished = True
+        try:
+            self._record_result(result)
             
-            for future in as_completed(futures):
-                task = futures[future]
-                
+            copies = self._duplicates.get(task.file_path)
+            if copies:
+                self._complete_duplicates(result, copies)
+        except Exception as e:
+            logging.error(f"Failed to record result for {task.file_path}: {e}")
+        finally:
+            with self._finished_lock:
+                self._finished += 1
+            # Сигнал главному потоку - только после учёта задачи в окне
+            if task.on_complete:
+                task.on_complete()
+            else:
+                self._progress_queue.put(0)
+    
+    def _record_result(
+        self,
+        result: SignResult
+    ):
+        if self._journal:
+            self._journal.record_result(result)
+        self._results.add(result)
+        if self.folders:
+            self.folders.record(result)
+    
+    def _complete_duplicates(
+        self,
+        result: SignResult,
+        copies: list[SignTask]
+    ):
+        """Положить подпись уникального файла рядом с каждой его копией"""
+        signature = None
+        error_message = result.error_message
+        if result.success:
+            try:
+                with open(result.output_path, "rb") as f:
+                    signature = f.read()
+            except OSError as e:
+                error_message = f"Failed to read signature {result.output_path}: {e}"
+        
+        for copy_task in copies:
+            timer = StageTimer()
+            copy_result = SignResult(
+                file_path=copy_task.file_path,
+                output_path="",
+                success=False,
+                error_message=f"Signature of identical file failed: {error_message}"
+            )
+            if signature is not None:
+                output_path = copy_task.get_signature_path()
                 try:
-                    result = future.result()
-                    results.append(result)
-                except Exception as e:
-                    logging.error(f"Exception for {task.file_path}: {e}")
-                    results.append(SignResult(
-                        file_path=task.file_path,
-                        output_path="",
-                        success=False,
-                        error_message=str(e)
-                    ))
-        
-        # self.signature_service.sign_manager.__del__()
-        logging.info(f"Batch processing completed: {len(results)} files processed")
-        return results
+                    with timer.stage("write"):
+                        write_atomic(output_path, signature)
+                    copy_result = SignResult(
+                        file_path=copy_task.file_path,
+                        output_path=output_path,
+                        success=True
+                    )
+                except OSError as e:
+                    copy_result.error_message = f"Failed to write signature: {e}"
+            
+            copy_result.stage_times = timer.timings
+            try:
+                self._record_result(copy_result)
+            except Exception as e:
+                logging.error(f"Failed to record result for {copy_task.file_path}: {e}")
+            if copy_task.on_complete:
+                copy_task.on_complete()
+    
+    def _dispatch_task(
+        self,
+        task: SignTask,
+        attempt: int
+    ) -> SignResult:
+        """Одна попытка подписи в текущем потоке или в процессе пула"""
+        if self._process_pool is None:
+            return self.signature_service.sign_once(task, attempt)
+        
+        # Callback не передаётся в процесс - прогресс отмечается в родителе
+        future = self._process_pool.submit(
+            _process_sign_once,
+            replace(task, on_complete=None),
+            attempt
+        )
+        return future.result()
 
 
 class BatchSigner:
@@ -368,7 +1270,23 @@ class BatchSigner:
         max_attempts: int = 10,
         retry_delay: int = 10,
         max_workers: int = 10,
-        extensions: Optional[list[str]] = None
+        extensions: Optional[list[str]] = None,
+        stream_sign_threshold: Optional[int] = None,
+        execution_backend: str = "thread",
+        signer_backend: str = "eusign",
+        fake_latency: float = 0.0,
+        fake_failure_rate: float = 0.0,
+        validation_proxy: Optional[ValidationProxyConfig] = None,
+        adaptive_concurrency: bool = False,
+        max_retry_delay: float = 300.0,
+        journal_dir: Optional[Union[str, Path]] = None,
+        deduplicate: bool = False,
+        scan_workers: int = 1,
+        snapshot_dir: Optional[Union[str, Path]] = None,
+        report_dir: Optional[Union[str, Path]] = None,
+        report_format: str = "auto",
+        schedule_policy: str = "scan",
+        on_folder_complete: Optional[Callable[[FolderResult], None]] = None
     ):
         self.config = SignerConfig(
             key_file_path=Path(key_file_path),
@@ -376,14 +1294,30 @@ class BatchSigner:
             is_sign_long_type=is_sign_long_type,
             max_attempts=max_attempts,
             retry_delay=retry_delay,
-            max_workers=max_workers
+            max_workers=max_workers,
+            stream_sign_threshold=stream_sign_threshold,
+            execution_backend=execution_backend,
+            signer_backend=signer_backend,
+            fake_latency=fake_latency,
+            fake_failure_rate=fake_failure_rate,
+            validation_proxy=validation_proxy,
+            adaptive_concurrency=adaptive_concurrency,
+            max_retry_delay=max_retry_delay,
+            journal_dir=Path(journal_dir) if journal_dir else None,
+            deduplicate=deduplicate,
+            scan_workers=scan_workers,
+            snapshot_dir=Path(snapshot_dir) if snapshot_dir else None,
+            report_dir=Path(report_dir) if report_dir else None,
+            report_format=report_format,
+            schedule_policy=schedule_policy
         )
         
         self.extensions = extensions or ['.pdf']
         self.orchestrator = BatchOrchestrator(
             config=self.config,
             extensions=self.extensions,
-            db_manager=None
+            db_manager=None,
+            on_folder_complete=on_folder_complete
         )
     
     def sign_documents_batch(
@@ -392,7 +1326,7 @@ class BatchSigner:
         key_password: str,
         output_base_dir: Optional[Union[str, Path]] = None,
         progress_callback: Optional[Callable[[int, int, str], None]] = None
-    ) -> list[SignResult]:
+    ) -> BatchSummary:
         """
         Пакетная подпись документов в папке
         
@@ -403,7 +1337,7 @@ class BatchSigner:
             progress_callback: Callback для отслеживания прогресса (completed, total)
         
         Returns:
-            Список результатов подписания
+            Сводка пакета (результаты по файлам - в отчёте `report_path`)
         """
         # self.orchestrator.signature_service.load_certificate(key_password)
         
@@ -0,0 +1,449 @@
+import time
+import base64
+import hashlib
+import logging
+import threading
+import urllib.request
+from pathlib import Path
+from dataclasses import dataclass, astuple
+from typing import Callable, Optional, Iterator
+from datetime import datetime, timezone, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Адреса сервисов АЦСК, которые использует EUSignCP
+DEFAULT_OCSP_URL = "http://acsk.privatbank.ua/services/ocsp/"
+DEFAULT_TSP_URL = "https://ca.informjust.ua/"
+
+OCSP_RESPONSE_TYPE = "application/ocsp-response"
+TSP_RESPONSE_TYPE = "application/timestamp-reply"
+
+# Заглушки для автономного режима без записанных ответов:
+# OCSPResponse {successful} и TimeStampResp {granted} без содержимого
+STUB_OCSP_RESPONSE = bytes.fromhex("30030a0100")
+STUB_TSP_RESPONSE = bytes.fromhex("30053003020100")
+
+
+@dataclass
+class ValidationProxyConfig:
+    """Настройки локального OCSP/TSP прокси"""
+    host: str = "127.0.0.1"
+    port: int = 0  # 0 - любой свободный порт
+    ocsp_upstream: str = DEFAULT_OCSP_URL
+    tsp_upstream: str = DEFAULT_TSP_URL
+    cache_ocsp: bool = True
+    ocsp_default_ttl: int = 300  # сек, если в ответе нет nextUpdate
+    latency: float = 0.0  # искусственная задержка на запрос, сек
+    offline: bool = False  # отвечать только записанными ответами, без сети (только фиктивный бэкенд)
+    record_dir: Optional[Path] = None  # куда писать/откуда читать ответы
+    serve: bool = True  # False - сервер уже запущен в другом процессе
+    timeout: float = 30.0
+
+
+# Адрес OCSP, адрес TSP, порт OCSP, порт TSP
+Endpoints = tuple[str, str, str, str]
+DEFAULT_ENDPOINTS: Endpoints = (DEFAULT_OCSP_URL, DEFAULT_TSP_URL, "80", "80")
+
+
+def proxy_endpoints(proxy: "ValidationProxy") -> Endpoints:
+    """Адреса OCSP/TSP, направляющие библиотеку через прокси"""
+    host = proxy.config.host
+    return (f"http://{host}/ocsp/", f"http://{host}/tsp/", str(proxy.port), str(proxy.port))
+
+
+class SharedEndpoints:
+    """
+    Адреса OCSP/TSP библиотеки - одна настройка на процесс.
+
+    Пакет занимает нужные адреса (`acquire`) на всё время работы и
+    освобождает их (`release`) в конце. Пакеты с теми же адресами идут
+    одновременно; пакет с другими ждёт, пока прежние адреса не освободят
+    все пакеты, и только тогда переключает библиотеку (`apply`).
+    """
+
+    def __init__(self, apply: Callable[[Endpoints], None]):
+        self.apply = apply
+        self.current: Optional[Endpoints] = None
+        self.users = 0
+        self._condition = threading.Condition()
+
+    def acquire(self, endpoints: Endpoints):
+        with self._condition:
+            if self.users and self.current != endpoints:
+                logging.info(f"Waiting for batches using OCSP/TSP {self.current[0]}, {self.current[1]} to finish")
+            while self.users and self.current != endpoints:
+                self._condition.wait()
+            if self.current != endpoints:
+                self.apply(endpoints)
+                self.current = endpoints
+            self.users += 1
+
+    def release(self):
+        with self._condition:
+            self.users -= 1
+            self._condition.notify_all()
+
+
+def _der_read(
+    data: bytes,
+    offset: int
+) -> tuple[int, int, int]:
+    """Прочитать заголовок DER: (тег, начало значения, конец значения)"""
+    tag = data[offset]
+    length = data[offset + 1]
+    offset += 2
+    if length & 0x80:
+        size = length & 0x7F
+        length = int.from_bytes(data[offset:offset + size], "big")
+        offset += size
+    end = offset + length
+    if end > len(data):
+        raise ValueError("Truncated DER element")
+    return tag, offset, end
+
+
+def _der_children(
+    data: bytes,
+    start: int,
+    end: int
+) -> Iterator[tuple[int, int, int, int]]:
+    """Дочерние элементы: (тег, начало элемента, начало значения, конец)"""
+    while start < end:
+        tag, value_start, value_end = _der_read(data, start)
+        yield tag, start, value_start, value_end
+        start = value_end
+
+
+def _parse_generalized_time(value: bytes) -> datetime:
+    text = value.decode("ascii").rstrip("Z")
+    base, _, fraction = text.partition(".")
+    moment = datetime.strptime(base, "%Y%m%d%H%M%S").replace(tzinfo=timezone.utc)
+    if fraction:
+        moment += timedelta(seconds=float(f"0.{fraction}"))
+    return moment
+
+
+def ocsp_cache_key(request: bytes) -> bytes:
+    """
+    Ключ кэша OCSP - список запрашиваемых CertID (requestList).
+    Расширения запроса (в т.ч. nonce) в ключ не входят.
+    """
+    try:
+        _, start, end = _der_read(request, 0)  # OCSPRequest
+        _, start, end = _der_read(request, start)  # TBSRequest
+        for tag, element_start, _, element_end in _der_children(request, start, end):
+            if tag == 0x30:  # requestList
+                return hashlib.sha256(request[element_start:element_end]).digest()
+    except (IndexError, ValueError):
+        pass
+    return hashlib.sha256(request).digest()
+
+
+def ocsp_response_status(response: bytes) -> Optional[int]:
+    """Значение OCSPResponseStatus (0 - successful) или None, если не разобрать"""
+    try:
+        _, start, end = _der_read(response, 0)
+        tag, value_start, value_end = _der_read(response, start)
+        if tag != 0x0A:
+            return None
+        return int.from_bytes(response[value_start:value_end], "big")
+    except (IndexError, ValueError):
+        return None
+
+
+def ocsp_next_update(response: bytes) -> Optional[datetime]:
+    """Самый ранний nextUpdate из ответов OCSP (None, если не указан)"""
+    try:
+        _, start, end = _der_read(response, 0)  # OCSPResponse
+        response_bytes = None
+        for tag, _, value_start, value_end in _der_children(response, start, end):
+            if tag == 0xA0:
+                response_bytes = (value_start, value_end)
+        if response_bytes is None:
+            return None
+
+        _, start, end = _der_read(response, response_bytes[0])  # ResponseBytes
+        basic = None
+        for tag, _, value_start, value_end in _der_children(response, start, end):
+            if tag == 0x04:  # OCTET STRING с BasicOCSPResponse
+                basic = value_start
+        if basic is None:
+            return None
+
+        _, start, end = _der_read(response, basic)  # BasicOCSPResponse
+        _, start, end = _der_read(response, start)  # ResponseData
+
+        next_updates = []
+        for tag, _, value_start, value_end in _der_children(response, start, end):
+            if tag != 0x30:  # responses
+                continue
+            for _, _, single_start, single_end in _der_children(response, value_start, value_end):
+                for inner_tag, _, inner_start, inner_end in _der_children(response, single_start, single_end):
+                    if inner_tag == 0xA0:  # [0] EXPLICIT nextUpdate
+                        _, time_start, time_end = _der_read(response, inner_start)
+                        next_updates.append(_parse_generalized_time(response[time_start:time_end]))
+            break
+
+        return min(next_updates) if next_updates else None
+    except (IndexError, ValueError):
+        return None
+
+
+class ValidationProxy:
+    """
+    Локальный прокси OCSP/TSP для EUSignCP.
+
+    - Ответы OCSP о статусе сертификата подписанта кэшируются до nextUpdate
+      и переиспользуются всеми подписями пакета; одновременные промахи
+      по одному ключу выполняют один запрос к АЦСК.
+    - Запросы TSP уникальны для каждой подписи и всегда передаются дальше.
+    - `latency` добавляет задержку сети, `offline` отвечает записанными
+      ответами - так пропускную способность можно мерить без сети.
+      Только с фиктивным бэкендом: nonce и хэш в записанном ответе TSP
+      не совпадут с новым запросом, и EUSignCP такой ответ отвергнет.
+    """
+
+    def __init__(
+        self,
+        config: ValidationProxyConfig
+    ):
+        self.config = config
+        self._cache: dict[bytes, tuple[float, bytes]] = {}
+        self._key_locks: dict[bytes, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+        self.stats = {
+            "ocsp_requests": 0,
+            "ocsp_hits": 0,
+            "tsp_requests": 0,
+            "upstream_calls": 0,
+            "upstream_errors": 0
+        }
+
+        if config.record_dir:
+            Path(config.record_dir).mkdir(parents=True, exist_ok=True)
+
+    @property
+    def port(self) -> int:
+        if self._server:
+            return self._server.server_address[1]
+        return self.config.port
+
+    @property
+    def ocsp_url(self) -> str:
+        return f"http://{self.config.host}:{self.port}/ocsp/"
+
+    @property
+    def tsp_url(self) -> str:
+        return f"http://{self.config.host}:{self.port}/tsp/"
+
+    def start(self) -> "ValidationProxy":
+        """Запустить HTTP-сервер в фоновом потоке"""
+        self._server = ThreadingHTTPServer((self.config.host, self.config.port), _ProxyHandler)
+        self._server.daemon_threads = True
+        self._server.proxy = self
+        self._thread = threading.Thread(
+            target=self._server.serve_forever,
+            name="validation-proxy",
+            daemon=True
+        )
+        self._thread.start()
+        logging.info(
+            f"Validation proxy listening on {self.config.host}:{self.port} "
+            f"(offline={self.config.offline}, latency={self.config.latency}s)"
+        )
+        return self
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        logging.info(f"Validation proxy stopped: {self.stats}")
+
+    def _count(self, name: str):
+        with self._lock:
+            self.stats[name] += 1
+
+    def handle(
+        self,
+        kind: str,
+        body: bytes,
+        content_type: Optional[str] = None
+    ) -> tuple[bytes, str]:
+        """Ответить на запрос OCSP/TSP: (тело ответа, Content-Type)"""
+        if self.config.latency > 0:
+            time.sleep(self.config.latency)
+
+        if kind == "tsp":
+            self._count("tsp_requests")
+            return self._fetch("tsp", body, content_type), TSP_RESPONSE_TYPE
+
+        self._count("ocsp_requests")
+        if not self.config.cache_ocsp:
+            return self._fetch("ocsp", body, content_type), OCSP_RESPONSE_TYPE
+
+        key = ocsp_cache_key(body)
+        cached = self._cache_get(key)
+        if cached is not None:
+            self._count("ocsp_hits")
+            return cached, OCSP_RESPONSE_TYPE
+
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            cached = self._cache_get(key)
+            if cached is not None:
+                self._count("ocsp_hits")
+                return cached, OCSP_RESPONSE_TYPE
+
+            response = self._fetch("ocsp", body, content_type, key)
+            self._cache_put(key, response)
+            return response, OCSP_RESPONSE_TYPE
+
+    def _cache_get(self, key: bytes) -> Optional[bytes]:
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                return None
+            expires_at, response = entry
+            if expires_at <= time.time():
+                del self._cache[key]
+                return None
+            return response
+
+    def _cache_put(
+        self,
+        key: bytes,
+        response: bytes
+    ):
+        if ocsp_response_status(response) != 0:
+            return
+
+        next_update = ocsp_next_update(response)
+        if next_update is not None:
+            expires_at = next_update.timestamp()
+        else:
+            expires_at = time.time() + self.config.ocsp_default_ttl
+
+        if expires_at > time.time():
+            with self._lock:
+                self._cache[key] = (expires_at, response)
+
+    def _record_path(
+        self,
+        kind: str,
+        key: Optional[bytes]
+    ) -> Optional[Path]:
+        if not self.config.record_dir:
+            return None
+        name = f"ocsp-{key.hex()}.der" if kind == "ocsp" and key else f"{kind}-last.der"
+        return Path(self.config.record_dir) / name
+
+    def _fetch(
+        self,
+        kind: str,
+        body: bytes,
+        content_type: Optional[str],
+        key: Optional[bytes] = None
+    ) -> bytes:
+        record_path = self._record_path(kind, key)
+
+        if self.config.offline:
+            if record_path and record_path.exists():
+                return record_path.read_bytes()
+            return STUB_OCSP_RESPONSE if kind == "ocsp" else STUB_TSP_RESPONSE
+
+        upstream = self.config.ocsp_upstream if kind == "ocsp" else self.config.tsp_upstream
+        request = urllib.request.Request(
+            upstream,
+            data=body,
+            headers={"Content-Type": content_type or f"application/{kind}-request"},
+            method="POST"
+        )
+
+        self._count("upstream_calls")
+        try:
+            with urllib.request.urlopen(request, timeout=self.config.timeout) as response:
+                payload = response.read()
+        except Exception:
+            self._count("upstream_errors")
+            raise
+
+        if record_path:
+            record_path.write_bytes(payload)
+        return payload
+
+
+class _ProxyHandler(BaseHTTPRequestHandler):
+    """HTTP-обработчик: /ocsp/... и /tsp/... передаются в `ValidationProxy`"""
+
+    def _kind(self) -> Optional[str]:
+        if self.path.startswith("/ocsp"):
+            return "ocsp"
+        if self.path.startswith("/tsp"):
+            return "tsp"
+        return None
+
+    def _reply(
+        self,
+        kind: Optional[str],
+        body: bytes
+    ):
+        if kind is None:
+            self.send_error(404)
+            return
+
+        try:
+            payload, content_type = self.server.proxy.handle(kind, body, self.headers.get("Content-Type"))
+        except Exception as e:
+            logging.warning(f"Validation proxy {kind} upstream error: {e}")
+            self.send_error(502, str(e))
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        self._reply(self._kind(), self.rfile.read(length))
+
+    def do_GET(self):
+        # OCSP по GET: запрос в base64 в конце пути (RFC 6960, A.1)
+        kind = self._kind()
+        encoded = urllib.request.unquote(self.path.split("/", 2)[-1])
+        try:
+            body = base64.b64decode(encoded)
+        except ValueError:
+            self.send_error(400)
+            return
+        self._reply(kind, body)
+
+    def log_message(self, format, *args):
+        logging.debug(f"Validation proxy: {format % args}")
+
+
+_proxies: dict[tuple, ValidationProxy] = {}
+_proxies_lock = threading.Lock()
+
+
+def get_validation_proxy(config: ValidationProxyConfig) -> ValidationProxy:
+    """
+    Общий прокси процесса для данных настроек (запускается один раз).
+    Прокси с другими настройками (автономный режим, задержка, адреса АЦСК)
+    - отдельный экземпляр. При `serve=False` сервер не запускается -
+    используется уже работающий.
+    """
+    key = astuple(config)
+    with _proxies_lock:
+        proxy = _proxies.get(key)
+        if proxy is None:
+            proxy = ValidationProxy(config)
+            if config.serve:
+                proxy.start()
+            _proxies[key] = proxy
+        return proxy
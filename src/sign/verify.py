@@ -0,0 +1,240 @@
+import os
+import json
+import time
+import logging
+import multiprocessing
+from pathlib import Path
+from collections import Counter
+from typing import Optional, Callable, Iterable, Iterator
+from concurrent.futures import (
+    ThreadPoolExecutor,
+    ProcessPoolExecutor,
+    FIRST_COMPLETED,
+    wait
+)
+
+from src.sign.model import SignerConfig, VerifyResult
+from src.sign.backends import SignatureVerifier, create_verifier
+from src.sign.thread_signer import resolve_root_folder
+
+SIGNATURE_SUFFIX = ".p7s"
+
+# Статусы, которые попадают в отчёт: подпись не прошла проверку (в т.ч. не
+# совпадает с документом), подпись без документа, документ без подписи
+REPORTED_STATUSES = ("invalid", "orphan", "missing")
+
+
+def verify_pair(
+    verifier: SignatureVerifier,
+    file_path: str,
+    signature_path: str
+) -> VerifyResult:
+    """Проверить одну пару документ + .p7s"""
+    start_time = time.perf_counter()
+
+    try:
+        if os.path.getsize(signature_path) == 0:
+            raise ValueError("Empty signature file")
+
+        sign_info = verifier.verify(file_path, signature_path)
+        return VerifyResult(
+            file_path=file_path,
+            signature_path=signature_path,
+            status="valid",
+            signer=sign_info.get("pszSubjCN", ""),
+            processing_time=time.perf_counter() - start_time
+        )
+    except Exception as e:
+        return VerifyResult(
+            file_path=file_path,
+            signature_path=signature_path,
+            status="invalid",
+            error_message=str(e),
+            processing_time=time.perf_counter() - start_time
+        )
+
+
+# Проверяющий бэкенд процесса пула (один на процесс)
+_process_verifier: Optional[SignatureVerifier] = None
+
+
+def _init_verify_worker(config: SignerConfig, log_level: int = logging.WARNING):
+    """Инициализатор процесса пула: своя библиотека в каждом процессе"""
+    global _process_verifier
+    logging.basicConfig(level=log_level)
+    _process_verifier = create_verifier(config)
+
+
+def _process_verify_pair(file_path: str, signature_path: str) -> VerifyResult:
+    return verify_pair(_process_verifier, file_path, signature_path)
+
+
+class BatchVerifier:
+    """Пакетная проверка существующих подписей .p7s"""
+
+    def __init__(
+        self,
+        config: SignerConfig,
+        extensions: list[str],
+        verifier: Optional[SignatureVerifier] = None
+    ):
+        self.config = config
+        self.extensions = [ext.lower() for ext in extensions]
+        self.verifier = verifier
+        self.report_path: Optional[Path] = None
+
+    def find_pairs(
+        self,
+        root_folder: Path
+    ) -> Iterator[tuple[str, Optional[str]]]:
+        """
+        Пары (документ, подпись) в дереве.
+
+        Документ без подписи - (документ, None),
+        подпись без документа - ("", подпись).
+        """
+        for dir_path, _, file_names in os.walk(root_folder):
+            names = set(file_names)
+
+            for name in file_names:
+                lower = name.lower()
+
+                if lower.endswith(SIGNATURE_SUFFIX):
+                    if name[:-len(SIGNATURE_SUFFIX)] not in names:
+                        yield "", os.path.join(dir_path, name)
+                    continue
+
+                if os.path.splitext(lower)[1] in self.extensions:
+                    signature_name = name + SIGNATURE_SUFFIX
+                    yield (
+                        os.path.join(dir_path, name),
+                        os.path.join(dir_path, signature_name) if signature_name in names else None
+                    )
+
+    def verify_folder(
+        self,
+        root_folder: Path,
+        report_path: Optional[Path] = None,
+        progress_callback: Optional[Callable[[int, int, str], None]] = None
+    ) -> dict[str, int]:
+        """
+        Проверить все подписи в папке.
+
+        Недействительные, лишние и отсутствующие подписи построчно
+        пишутся в отчёт JSON Lines. Возвращает количество по статусам.
+
+        Дерево обходится по ходу проверки, как при подписи: пока обход
+        не закончен, общее число в прогрессе - найденное на этот момент.
+        """
+        root_folder = resolve_root_folder(root_folder)
+
+        if report_path is None:
+            report_path = Path("reports") / f"verify_{time.strftime('%Y%m%d_%H%M%S')}.jsonl"
+        report_path = Path(report_path)
+        report_path.parent.mkdir(parents=True, exist_ok=True)
+        self.report_path = report_path
+
+        counts: Counter = Counter()
+        completed = 0
+        found = 0
+        scan_done = False
+
+        def scan() -> Iterator[tuple[str, Optional[str]]]:
+            nonlocal found, scan_done
+            for pair in self.find_pairs(root_folder):
+                found += 1
+                yield pair
+            scan_done = True
+            logging.info(f"Found {found} documents and signatures to verify in {root_folder}")
+
+        with open(report_path, "w", encoding="utf-8") as report:
+
+            def record(result: VerifyResult):
+                nonlocal completed
+                counts[result.status] += 1
+                completed += 1
+
+                if result.status in REPORTED_STATUSES:
+                    report.write(json.dumps({
+                        "file_path": result.file_path,
+                        "signature_path": result.signature_path,
+                        "status": result.status,
+                        "error": result.error_message
+                    }, ensure_ascii=False) + "\n")
+
+                if progress_callback:
+                    progress_callback(
+                        completed,
+                        found,
+                        'файлів' if scan_done else 'файлів (пошук триває)'
+                    )
+
+            for result in self._run_parallel(scan()):
+                record(result)
+
+        summary = {status: counts.get(status, 0) for status in ("valid",) + REPORTED_STATUSES}
+        logging.info(f"Verification completed: {summary}, report: {report_path}")
+        return summary
+
+    def _run_parallel(
+        self,
+        pairs: Iterable[tuple[str, Optional[str]]]
+    ) -> Iterator[VerifyResult]:
+        """
+        Проверка в пуле потоков или процессов.
+
+        Пары берутся из `pairs` по мере освобождения места: в работе не
+        больше `max_workers * 4` пар, чтобы на больших архивах не держать
+        в памяти ни список файлов, ни фьючерсы на все файлы сразу.
+        Подпись без документа и документ без подписи не проверяются.
+        """
+        window = self.config.max_workers * 4
+        owned_verifier = False
+
+        if self.config.execution_backend == "process":
+            executor = ProcessPoolExecutor(
+                max_workers=self.config.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_verify_worker,
+                initargs=(self.config, logging.getLogger().getEffectiveLevel())
+            )
+            submit = lambda pair: executor.submit(_process_verify_pair, *pair)
+        else:
+            if self.verifier is None:
+                self.verifier = create_verifier(self.config)
+                owned_verifier = True
+            executor = ThreadPoolExecutor(max_workers=self.config.max_workers)
+            submit = lambda pair: executor.submit(verify_pair, self.verifier, *pair)
+
+        pending_pairs = iter(pairs)
+        in_flight = {}
+
+        try:
+            while True:
+                for file_path, signature_path in pending_pairs:
+                    if not file_path:
+                        yield VerifyResult("", signature_path, "orphan",
+                                           error_message="Signature without document")
+                    elif signature_path is None:
+                        yield VerifyResult(file_path, "", "missing",
+                                           error_message="Document is not signed")
+                    else:
+                        in_flight[submit((file_path, signature_path))] = (file_path, signature_path)
+                        if len(in_flight) >= window:
+                            break
+
+                if not in_flight:
+                    break
+
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    file_path, signature_path = in_flight.pop(future)
+                    try:
+                        yield future.result()
+                    except Exception as e:
+                        yield VerifyResult(file_path, signature_path, "invalid", error_message=str(e))
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+            if owned_verifier:
+                self.verifier.close()
+                self.verifier = None
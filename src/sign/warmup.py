@@ -0,0 +1,173 @@
+import os
+import json
+import time
+import logging
+import threading
+from pathlib import Path
+from dataclasses import dataclass, field
+from typing import Optional
+
+from src.sign.key_registry import KeyProfile
+
+# Пакет сертификатов ЦСК, который Dockerfile кладёт в образ
+DEFAULT_CA_CERTIFICATES = Path("/data/certificates/CACertificates.p7b")
+
+
+@dataclass
+class WarmupStatus:
+    """Состояние прогрева библиотеки"""
+    state: str = "pending"  # 'pending' | 'running' | 'ready' | 'failed'
+    error: str = ""
+    elapsed: float = 0.0
+    keys_loaded: list[str] = field(default_factory=list)
+    ca_certificates_loaded: bool = False
+
+    @property
+    def ready(self) -> bool:
+        return self.state == "ready"
+
+
+def profiles_from_env(
+    keys_folder: Path,
+    env_name: str = "ALL_KEYS"
+) -> list[KeyProfile]:
+    """
+    Ключи из `ALL_KEYS` ({"файл ключа": "файл сертификата"}, как в README).
+
+    Ошибка в переменной только записывается в журнал: без прогрева
+    ключ загрузится при первой подписи.
+    """
+    raw = os.getenv(env_name)
+    if not raw:
+        return []
+
+    try:
+        keys = json.loads(raw)
+    except ValueError as e:
+        logging.warning(f"Warm-up: cannot parse {env_name}: {e}")
+        return []
+    if not isinstance(keys, dict):
+        logging.warning(f"Warm-up: {env_name} must map key files to certificate files")
+        return []
+
+    profiles = []
+    for key_file, cert_file in keys.items():
+        if not key_file:
+            continue
+        if cert_file is not None and not isinstance(cert_file, str):
+            logging.warning(f"Warm-up: skipping key {key_file}, certificate must be a file name")
+            continue
+        profiles.append(KeyProfile.for_files(
+            key_file_path=str(Path(keys_folder) / key_file),
+            cert_path=str(Path(keys_folder) / cert_file) if cert_file else None
+        ))
+    return profiles
+
+
+class EngineWarmup:
+    """
+    Фоновый прогрев EUSignCP при старте сервиса.
+
+    Загружает нативный модуль и инициализирует библиотеку, сохраняет
+    сертификаты ЦСК в файловое хранилище и кладёт ключи из `profiles`
+    в реестр ключей (байты ключа и проверенный сертификат). Контексты
+    приватных ключей открываются при первой подписи: для них нужен пароль.
+
+    Подпись, начатая во время прогрева, ждёт ту же инициализацию
+    библиотеки, а не запускает вторую.
+    """
+
+    def __init__(
+        self,
+        profiles: Optional[list[KeyProfile]] = None,
+        ca_certificates_path: Optional[Path] = DEFAULT_CA_CERTIFICATES
+    ):
+        self.profiles = profiles or []
+        self.ca_certificates_path = ca_certificates_path
+        self.status = WarmupStatus()
+        self._done = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "EngineWarmup":
+        """Запустить прогрев в фоне (повторный вызов ничего не делает)"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="eusign-warmup", daemon=True)
+            self._thread.start()
+        return self
+
+    def wait(
+        self,
+        timeout: Optional[float] = None
+    ) -> bool:
+        """Дождаться окончания прогрева; True, если библиотека готова"""
+        self._done.wait(timeout)
+        return self.status.ready
+
+    def _run(self):
+        # Импорт здесь: модуль менеджера не тянет нативную библиотеку до прогрева
+        from src.sign.signManager import get_library_interface, get_key_registry
+
+        self.status.state = "running"
+        start = time.perf_counter()
+
+        try:
+            iface = get_library_interface()
+
+            if self.ca_certificates_path and Path(self.ca_certificates_path).exists():
+                self._load_ca_certificates(iface)
+
+            registry = get_key_registry()
+            for profile in self.profiles:
+                try:
+                    entry = registry.acquire(profile)
+                    try:
+                        if profile.cert_path:
+                            entry.manager.load_and_check_certificate()
+                    finally:
+                        registry.release(profile)
+                    self.status.keys_loaded.append(profile.key_file_path)
+                except Exception as e:
+                    logging.warning(f"Warm-up: failed to preload key {profile.key_file_path}: {e}")
+
+            self.status.state = "ready"
+
+        except Exception as e:
+            logging.error(f"Warm-up failed: {e}")
+            self.status.state = "failed"
+            self.status.error = str(e)
+
+        finally:
+            self.status.elapsed = time.perf_counter() - start
+            self._done.set()
+            logging.info(
+                f"EUSignCP warm-up {self.status.state} in {self.status.elapsed:.2f}s, "
+                f"keys: {len(self.status.keys_loaded)}/{len(self.profiles)}"
+            )
+
+    def _load_ca_certificates(self, iface):
+        """Сохранить сертификаты ЦСК (.p7b) в файловое хранилище библиотеки"""
+        with open(self.ca_certificates_path, "rb") as f:
+            certificates = f.read()
+
+        try:
+            iface.SaveCertificates(certificates, len(certificates))
+            iface.RefreshFileStore(True)
+            self.status.ca_certificates_loaded = True
+        except Exception as e:
+            logging.warning(f"Warm-up: failed to load CA certificates {self.ca_certificates_path}: {e}")
+
+
+_warmup: Optional[EngineWarmup] = None
+_warmup_lock = threading.Lock()
+
+
+def start_warmup(
+    profiles: Optional[list[KeyProfile]] = None,
+    ca_certificates_path: Optional[Path] = DEFAULT_CA_CERTIFICATES
+) -> EngineWarmup:
+    """Прогрев процесса: запускается один раз, повторные вызовы возвращают тот же"""
+    global _warmup
+    with _warmup_lock:
+        if _warmup is None:
+            _warmup = EngineWarmup(profiles, ca_certificates_path).start()
+    return _warmup
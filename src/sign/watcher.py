@@ -0,0 +1,281 @@
+"""
+Режим наблюдения: документы подписываются по мере появления в папках.
+
+    python -m src.sign.watcher --root /app/data/Projects/Inbox --key src/sign/keys/stas.jks
+
+Пароль ключа - `--password` или переменная окружения `WATCH_KEY_PASSWORD`.
+Для папок, смонтированных с хоста Windows (bind mount), события inotify
+не приходят - нужен `--polling`.
+"""
+import os
+import time
+import signal
+import logging
+import argparse
+import threading
+from pathlib import Path
+from typing import Callable, Optional
+from concurrent.futures import ThreadPoolExecutor
+
+from src.sign.model import SignTask, SignResult, SignerConfig
+from src.sign.backends import SignerBackend
+from src.sign.thread_signer import SignatureService, resolve_root_folder
+
+# События, после которых файл мог появиться или дописаться
+_FILE_EVENTS = ("created", "modified", "moved", "closed")
+
+
+class _EventHandler:
+    """Обработчик событий watchdog (наблюдатель вызывает только `dispatch`)"""
+
+    def __init__(self, notify: Callable[[str], None]):
+        self._notify = notify
+
+    def dispatch(self, event):
+        if event.is_directory or event.event_type not in _FILE_EVENTS:
+            return
+        # У перемещения важен новый путь (файл дописан во временный и переименован)
+        self._notify(os.fsdecode(getattr(event, "dest_path", "") or event.src_path))
+
+
+class WatchSigner:
+    """
+    Подпись новых документов по событиям файловой системы.
+
+    Событие только отмечает файл. Подпись начинается, когда размер и mtime
+    файла не менялись `settle_time` секунд и файл открывается на чтение:
+    недописанный файл (копирование по сети, сохранение из сканера) не
+    подписывается. Документы с уже существующей `.p7s` пропускаются.
+
+    Подпись идёт в постоянно работающем пуле из `config.max_workers`
+    потоков с повторами по `config.max_attempts`; `.p7s` кладётся рядом
+    с документом. Повторного обхода дерева нет.
+    """
+
+    def __init__(
+        self,
+        config: SignerConfig,
+        roots: list[Path],
+        key_password: str,
+        extensions: Optional[list[str]] = None,
+        settle_time: float = 2.0,
+        use_polling: bool = False,
+        backend: Optional[SignerBackend] = None,
+        on_result: Optional[Callable[[SignResult], None]] = None
+    ):
+        self.config = config
+        self.roots = [resolve_root_folder(root) for root in roots]
+        self.extensions = [ext.lower() for ext in extensions or ['.pdf', '.xml']]
+        self.key_password = key_password
+        self.settle_time = settle_time
+        self.use_polling = use_polling
+        self.on_result = on_result
+        self.stats = {"signed": 0, "failed": 0, "skipped": 0}
+
+        self._backend = backend
+        self._service: Optional[SignatureService] = None
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._observer = None
+        self._settler: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+        self._lock = threading.Lock()
+        # Файл -> (время последнего события или изменения, (размер, mtime))
+        self._pending: dict[str, tuple[float, Optional[tuple[int, int]]]] = {}
+        self._in_progress: set[str] = set()
+
+    def start(self) -> "WatchSigner":
+        """Запустить пул подписи и наблюдение за папками"""
+        self._service = SignatureService(self.config, self._backend)
+        self._pool = ThreadPoolExecutor(
+            max_workers=self.config.max_workers,
+            thread_name_prefix="watch-sign"
+        )
+        self._settler = threading.Thread(target=self._settle_loop, name="watch-settle", daemon=True)
+        self._settler.start()
+        self._start_observer()
+        logging.info(f"Watching {', '.join(map(str, self.roots))} for {', '.join(self.extensions)}")
+        return self
+
+    def _start_observer(self):
+        # watchdog нужен только этому режиму
+        if self.use_polling:
+            from watchdog.observers.polling import PollingObserver as Observer
+        else:
+            from watchdog.observers import Observer
+
+        self._observer = Observer()
+        handler = _EventHandler(self.notify)
+        for root in self.roots:
+            self._observer.schedule(handler, str(root), recursive=True)
+        self._observer.start()
+
+    def run_forever(self):
+        """Работать до Ctrl+C / SIGTERM"""
+        signal.signal(signal.SIGTERM, lambda signum, frame: self._stop.set())
+        self.start()
+        try:
+            while not self._stop.wait(1.0):
+                pass
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
+
+    def stop(self):
+        """Остановить наблюдение и дождаться начатых подписей"""
+        self._stop.set()
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join()
+            self._observer = None
+        if self._settler is not None:
+            self._settler.join()
+            self._settler = None
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+        if self._service is not None:
+            self._service.close()
+            self._service = None
+        logging.info(f"Watch mode stopped: {self.stats}")
+
+    def notify(
+        self,
+        path: str
+    ):
+        """Файл создан или изменён: подписать, когда перестанет меняться"""
+        if os.path.splitext(path)[1].lower() not in self.extensions:
+            return
+        with self._lock:
+            if path not in self._in_progress:
+                self._pending[path] = (time.monotonic(), self._file_state(path))
+
+    def _file_state(
+        self,
+        path: str
+    ) -> Optional[tuple[int, int]]:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return stat.st_size, stat.st_mtime_ns
+
+    def _settle_loop(self):
+        interval = max(self.settle_time / 4, 0.05)
+        while not self._stop.wait(interval):
+            for path in self._settled_files():
+                self._pool.submit(self._sign, path)
+
+    def _settled_files(self) -> list[str]:
+        """Файлы, не менявшиеся `settle_time` секунд (переводятся в работу)"""
+        now = time.monotonic()
+        with self._lock:
+            candidates = [
+                (path, state) for path, (seen, state) in self._pending.items()
+                if now - seen >= self.settle_time
+            ]
+
+        ready = []
+        for path, state in candidates:
+            current = self._file_state(path)
+            readable = current is not None and current == state and self._readable(path)
+            with self._lock:
+                if self._pending.get(path, (None, None))[1] != state:
+                    # Пришло новое событие - ждём дальше
+                    continue
+                if current is None:
+                    # Файл удалён или переименован до подписи
+                    del self._pending[path]
+                elif not readable:
+                    self._pending[path] = (now, current)
+                else:
+                    del self._pending[path]
+                    self._in_progress.add(path)
+                    ready.append(path)
+        return ready
+
+    def _readable(
+        self,
+        path: str
+    ) -> bool:
+        """Файл, который ещё держит пишущая программа, на Windows не открывается"""
+        try:
+            with open(path, "rb") as f:
+                f.read(1)
+            return True
+        except OSError:
+            return False
+
+    def _sign(
+        self,
+        path: str
+    ):
+        try:
+            task = SignTask(file_path=path, key_password=self.key_password)
+            if os.path.exists(task.get_signature_path()):
+                self._count("skipped")
+                return
+
+            result = self._service.sign_file(task)
+            self._count("signed" if result.success else "failed")
+            if result.success:
+                logging.info(f"Watch mode: signed {path} in {result.processing_time:.2f}s")
+            else:
+                logging.error(f"Watch mode: failed to sign {path}: {result.error_message}")
+
+            if self.on_result:
+                self.on_result(result)
+        finally:
+            with self._lock:
+                self._in_progress.discard(path)
+
+    def _count(
+        self,
+        outcome: str
+    ):
+        with self._lock:
+            self.stats[outcome] += 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sign documents as they arrive in watched folders")
+    parser.add_argument("--root", action="append", required=True, help="Папка наблюдения (можно несколько)")
+    parser.add_argument("--key", required=True, help="Файл ключа")
+    parser.add_argument("--cert", default=None, help="Файл сертификата")
+    parser.add_argument("--password", default=os.getenv("WATCH_KEY_PASSWORD"), help="Пароль ключа")
+    parser.add_argument("--workers", type=int, default=4, help="Потоков подписи")
+    parser.add_argument("--extensions", default=".pdf,.xml", help="Расширения документов через запятую")
+    parser.add_argument("--settle", type=float, default=2.0, help="Сколько секунд файл не должен меняться")
+    parser.add_argument("--polling", action="store_true", help="Опрос вместо событий (bind mount с Windows)")
+    parser.add_argument("--bes", action="store_true", help="CAdES-BES вместо CAdES-X Long")
+    args = parser.parse_args()
+
+    if not args.password:
+        parser.error("--password or WATCH_KEY_PASSWORD is required")
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s %(levelname)s [%(module)s:%(funcName)s] %(message)s'
+    )
+
+    config = SignerConfig(
+        key_file_path=Path(args.key),
+        cert_file_path=Path(args.cert) if args.cert else None,
+        is_sign_long_type=not args.bes,
+        max_attempts=3,
+        max_workers=args.workers,
+        write_behind=False
+    )
+    WatchSigner(
+        config,
+        [Path(root) for root in args.root],
+        args.password,
+        extensions=args.extensions.split(","),
+        settle_time=args.settle,
+        use_polling=args.polling
+    ).run_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+import os
+import time
+import queue
+import logging
+import platform
+import threading
+from concurrent.futures import Future
+from typing import Optional
+
+from src.sign.metrics import percentile
+
+
+def _tmp_path(path: str) -> str:
+    # Не .p7s: сканер и проверка не примут недописанный файл за подпись
+    return f"{path}.{os.getpid()}.tmp"
+
+
+def _fsync_dir(path: str):
+    """Зафиксировать переименование в каталоге (на Windows не поддерживается)"""
+    if platform.system() == "Windows":
+        return
+    fd = os.open(path or ".", os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def write_atomic(
+    path: str,
+    data: bytes,
+    fsync: bool = False
+):
+    """Записать файл через временный файл и переименование: файл либо целый, либо его нет"""
+    tmp_path = _tmp_path(path)
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class SignatureWriter:
+    """
+    Отложенная запись .p7s в отдельном потоке.
+
+    Потоки подписи отдают байты подписи через `submit` и сразу берут
+    следующий файл. Писатель забирает из очереди до `batch_size` подписей
+    и пишет их во временные файлы группой: сначала данные всех файлов,
+    затем fsync всех файлов подряд (первый fsync фиксирует журнал ФС, и
+    остальные почти ничего не стоят), затем переименование всей группы
+    и один fsync каждого затронутого каталога.
+
+    Результат `Future` - время от `submit` до появления файла на месте (сек).
+    Очередь ограничена `max_pending`: при медленном диске потоки подписи
+    ждут, а не копят подписи в памяти.
+    """
+
+    def __init__(
+        self,
+        batch_size: int = 32,
+        max_pending: int = 256,
+        fsync: bool = True
+    ):
+        self.batch_size = batch_size
+        self.fsync = fsync
+        self.latencies: list[float] = []
+
+        self._queue: queue.Queue = queue.Queue(maxsize=max_pending)
+        self._futures: dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def submit(
+        self,
+        path: str,
+        data: bytes
+    ) -> Future:
+        """Поставить подпись в очередь записи"""
+        future = Future()
+        with self._lock:
+            self._futures[path] = future
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run,
+                    name="signature-writer",
+                    daemon=True
+                )
+                self._thread.start()
+
+        self._queue.put((path, data, future, time.perf_counter()))
+        return future
+
+    def take(
+        self,
+        path: str
+    ) -> Optional[Future]:
+        """Забрать `Future` записи файла (один раз на `submit`)"""
+        with self._lock:
+            return self._futures.pop(path, None)
+
+    def flush(self):
+        """Дождаться записи всего, что уже в очереди"""
+        if self._thread is not None:
+            self._queue.join()
+
+    def close(self):
+        """Дописать очередь и остановить поток"""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(None)
+            thread.join()
+
+    def summary(self) -> str:
+        """Сводка задержки записи"""
+        return (
+            f"files={len(self.latencies)}, "
+            f"p50={percentile(self.latencies, 50):.3f}s, "
+            f"p95={percentile(self.latencies, 95):.3f}s"
+        )
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                self._queue.task_done()
+                return
+
+            batch = [item]
+            stop = False
+            while len(batch) < self.batch_size:
+                try:
+                    next_item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if next_item is None:
+                    stop = True
+                    break
+                batch.append(next_item)
+
+            try:
+                self._write_batch(batch)
+            finally:
+                for _ in range(len(batch) + stop):
+                    self._queue.task_done()
+
+            if stop:
+                return
+
+    def _write_batch(
+        self,
+        batch: list[tuple[str, bytes, Future, float]]
+    ):
+        opened = []
+        for path, data, future, submitted in batch:
+            tmp_path = _tmp_path(path)
+            try:
+                f = open(tmp_path, "wb")
+            except Exception as e:
+                logging.error(f"Failed to write signature {path}: {e}")
+                future.set_exception(e)
+                continue
+            opened.append((path, tmp_path, future, submitted, f))
+            try:
+                f.write(data)
+                f.flush()
+            except Exception as e:
+                logging.error(f"Failed to write signature {path}: {e}")
+                future.set_exception(e)
+
+        # fsync группой - после записи данных всех файлов
+        written = []
+        for path, tmp_path, future, submitted, f in opened:
+            try:
+                if self.fsync and not future.done():
+                    os.fsync(f.fileno())
+                f.close()
+            except Exception as e:
+                logging.error(f"Failed to write signature {path}: {e}")
+                if not future.done():
+                    future.set_exception(e)
+            if future.done():
+                f.close()
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+            else:
+                written.append((path, tmp_path, future, submitted))
+
+        directories = set()
+        for path, tmp_path, future, submitted in written:
+            try:
+                os.replace(tmp_path, path)
+                directories.add(os.path.dirname(path))
+            except Exception as e:
+                logging.error(f"Failed to place signature {path}: {e}")
+                future.set_exception(e)
+
+        if self.fsync:
+            for directory in directories:
+                try:
+                    _fsync_dir(directory)
+                except OSError as e:
+                    logging.warning(f"Failed to fsync directory {directory}: {e}")
+
+        for path, tmp_path, future, submitted in written:
+            if not future.done():
+                latency = time.perf_counter() - submitted
+                self.latencies.append(latency)
+                future.set_result(latency)
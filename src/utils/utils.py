@@ -1,21 +1,41 @@
 import logging
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Callable
 
 from src.sign.signManager import EUSignCPManager
-from src.sign.thread_signer import FileScanner
+from src.sign.thread_signer import resolve_root_folder
+from src.sign.purge import SignaturePurger, PurgeSummary
 
 def remove_signed_files(
     root_path_dir: str,
-    extensions: Optional[list] = None
-):
-    if extensions is None:
-        extensions = ['.pdf', '.xml']
-    file_manager = FileScanner(extensions)
-    file_manager.find_unsigned_files(
-        root_folder=root_path_dir,
-        delete_signatures=True
+    dry_run: bool = False,
+    older_than_days: Optional[float] = None,
+    pattern: Optional[str] = None,
+    workers: int = 8,
+    progress_callback: Optional[Callable[[int, int, str], None]] = None
+) -> PurgeSummary:
+    """
+    Удалить все подписи .p7s в дереве (с `dry_run` - только посчитать)
+
+    `older_than_days` - только подписи старше стольких дней,
+    `pattern` - шаблон пути подписи относительно корня (fnmatch).
+    """
+    root_folder = resolve_root_folder(root_path_dir)
+    purger = SignaturePurger(
+        workers=workers,
+        older_than=older_than_days * 86400 if older_than_days else None,
+        pattern=pattern or None
     )
+    return purger.run(root_folder, dry_run=dry_run, progress_callback=progress_callback)
+
+
+def delete_signature_files(
+    paths: list[str],
+    workers: int = 8,
+    progress_callback: Optional[Callable[[int, int, str], None]] = None
+) -> PurgeSummary:
+    """Удалить подписи из предварительного подсчёта (`remove_signed_files(..., dry_run=True).paths`)"""
+    return SignaturePurger(workers=workers).delete(paths, progress_callback=progress_callback)
 
 
 def analyze_jks_detailed(iface, jks_bytes, key_password):
@@ -12,9 +12,11 @@ import streamlit as st
 from dotenv import load_dotenv
 import streamlit.components.v1 as components
 
-from src.utils.utils import remove_signed_files
-from src.sign.services import sign_folder_documents
+from src.utils.utils import remove_signed_files, delete_signature_files
+from src.sign.services import sign_folder_documents, verify_folder_signatures
+from src.sign.jobs import get_job_manager
 from src.sign.signManager import EUSignCPManager
+from src.sign.warmup import start_warmup, profiles_from_env
 
 load_dotenv()
 
@@ -35,11 +37,29 @@ KEYS_FILES = {
     for key, cert in KEYS_FILES.items()
 }
 
+JOB_STATE_LABELS = {
+    "queued": "у черзі",
+    "running": "підписується",
+    "done": "завершено",
+    "failed": "помилка",
+    "interrupted": "перервано перезапуском сервісу"
+}
+JOB_STATE_ICONS = {"queued": "⏳", "running": "🔄", "done": "✅", "failed": "❌", "interrupted": "⚠️"}
+
 
 class StreamlitApp:
     def __init__(self):
         """Инициализация приложения"""
         self.initialize_session_state()
+        # Прогрев библиотеки один раз на процесс, в фоне - страница не ждёт.
+        # Ошибка прогрева не должна ломать отрисовку: ключ загрузится при подписи
+        try:
+            self.warmup = start_warmup(profiles_from_env(KEYS_FOLDER))
+        except Exception as e:
+            logging.error(f"Warm-up could not be started: {e}")
+            self.warmup = None
+        # Пакеты подписи выполняются в фоне, общие для всех сессий процесса
+        self.jobs = get_job_manager(max_workers=int(os.getenv("SIGN_MAX_WORKERS", "17")))
 
     def initialize_session_state(self):
         """Инициализация состояния сессии"""
@@ -112,6 +132,16 @@ class StreamlitApp:
         """Отрисовка бокового меню"""
         with st.sidebar:
             st.title("🔑 CAdES-X Long Signer")
+            
+            status = self.warmup.status if self.warmup else None
+            if status is None:
+                st.caption("⚪ Прогрів бібліотеки вимкнено")
+            elif status.ready:
+                st.caption(f"🟢 Бібліотека готова ({status.elapsed:.1f} с, ключів: {len(status.keys_loaded)})")
+            elif status.state == "failed":
+                st.caption(f"🔴 Помилка ініціалізації бібліотеки: {status.error}")
+            else:
+                st.caption("⏳ Ініціалізація бібліотеки...")
             st.markdown("---")
             
             # Режим підпису
@@ -155,6 +185,12 @@ class StreamlitApp:
                 key="is_long_sign"
             )
             
+            st.checkbox(
+                "Кешувати відповіді OCSP (локальний проксі)",
+                value=False,
+                key="use_validation_proxy"
+            )
+            
             # Показуємо slider тільки для пакетного режиму
             if st.session_state.sign_mode == 'batch':
                 st.slider(
@@ -165,6 +201,28 @@ class StreamlitApp:
                     step=1,
                     key='workers_num'
                 )
+                st.checkbox(
+                    "Адаптивна кількість потоків (не більше обраної)",
+                    value=False,
+                    key='adaptive_concurrency'
+                )
+                st.checkbox(
+                    "Один підпис для однакових файлів",
+                    value=False,
+                    key='deduplicate'
+                )
+                st.radio(
+                    "🗂️ Порядок підпису",
+                    ['Як знайдено', 'Спочатку великі', 'По папках'],
+                    key='schedule_policy_radio',
+                    help="«По папках» - кожна папка справи готова якнайшвидше; «Спочатку великі» - менше чекання на великі файли в кінці"
+                )
+                st.radio(
+                    "⚙️ Режим виконання",
+                    ['Потоки', 'Процеси'],
+                    key='execution_backend_radio',
+                    horizontal=True
+                )
             else:
                 # Для одного файлу встановлюємо 1 потік
                 if 'workers_num' not in st.session_state:
@@ -177,6 +235,8 @@ class StreamlitApp:
                 if st.button("❌ Видалити підписи"):
                     if st.dialog("Видалення всіх підписів"):
                         self.dell_signs()
+                if st.button("🔍 Перевірити підписи"):
+                    self.verify_signs()
     
     def validate_load_key(self):
         if st.session_state.user_secrets:
@@ -218,13 +278,58 @@ class StreamlitApp:
         if ("root_folder" in st.session_state and st.session_state.root_folder != ""):
             st.write("Шлях для видалення:")
             st.success(f"{st.session_state.root_folder}")
+            
+            col1, col2 = st.columns(2)
+            older_than_days = col1.number_input("Старші за (днів)", min_value=0, value=0, step=1)
+            pattern = col2.text_input("Шаблон шляху", placeholder="*/Ace_*/*.pdf.p7s")
+            filters = {"older_than_days": older_than_days or None, "pattern": pattern}
+            
+            # Попередній підрахунок (нічого не видаляється) - один раз на папку і фільтри,
+            # а не на кожен перезапуск скрипта
+            preview_key = (st.session_state.root_folder, older_than_days, pattern)
+            cached = st.session_state.get("purge_preview")
+            if cached is None or cached[0] != preview_key:
+                with st.spinner("Підрахунок підписів..."):
+                    cached = (preview_key, remove_signed_files(st.session_state.root_folder, dry_run=True, **filters))
+                st.session_state.purge_preview = cached
+            preview = cached[1]
+            
+            if not preview.files:
+                st.info("Підписів для видалення не знайдено")
+                return
+            
             st.warning(f"""
                 ## ⚠️ Увага!
-                Буде видалено всі підписи, які знаходятся в кінцевих папках за шляхом!"""
+                Буде видалено {preview.files} підписів ({preview.bytes / 1024 / 1024:.1f} МБ) за шляхом!"""
+            )
+            st.dataframe(
+                [
+                    {"Папка": folder, "Підписів": count, "МБ": round(size / 1024 / 1024, 2)}
+                    for folder, (count, size) in sorted(preview.by_folder.items(), key=lambda item: -item[1][0])
+                ],
+                hide_index=True
             )
+            
             ok = st.button("Підтвердити")
             if ok:
-                remove_signed_files(st.session_state.root_folder)
+                progress_bar = st.progress(0)
+                status_text = st.empty()
+                
+                def update_progress(
+                    completed: int,
+                    total: int,
+                    elements_message: str = "підписів"
+                ):
+                    if total:
+                        progress_bar.progress(int(completed / total * 100))
+                    status_text.text(f"Видалено {completed} з {total} {elements_message}")
+                
+                # Видаляються саме ті підписи, що показані в попередньому підрахунку
+                summary = delete_signature_files(preview.paths, progress_callback=update_progress)
+                st.session_state.purge_preview = None
+                if summary.failed:
+                    st.error(f"Не вдалося видалити {summary.failed} підписів, деталі в журналі")
+                    return
                 st.session_state.dell_sign_toast = True
                 st.rerun()
         else:
@@ -233,6 +338,43 @@ class StreamlitApp:
                 Вкажіть шлях в полі на головній сторінці."""
             )
 
+    @st.dialog("Перевірка підписів")
+    def verify_signs(self):
+        if not ("root_folder" in st.session_state and st.session_state.root_folder != ""):
+            st.warning("""
+                ## ⚠️ Не вказано шлях до папки!
+                Вкажіть шлях в полі на головній сторінці."""
+            )
+            return
+        
+        st.write("Шлях для перевірки:")
+        st.success(f"{st.session_state.root_folder}")
+        
+        if st.button("Перевірити"):
+            progress_bar = st.progress(0)
+            status_text = st.empty()
+            
+            def update_progress(
+                completed: int,
+                total: int,
+                elements_message: str = "файлів"
+            ):
+                progress_bar.progress(int(completed / total * 100))
+                status_text.text(f"Перевірено {completed} з {total} {elements_message}")
+            
+            with st.spinner("Перевірка...", show_time=True):
+                success, message = verify_folder_signatures(
+                    root_folder=st.session_state.root_folder,
+                    workers=st.session_state.workers_num,
+                    callback_progress=update_progress
+                )
+            
+            progress_bar.empty()
+            if success:
+                st.success(message)
+            else:
+                st.error(message)
+
     @st.dialog("Завантажте файли для підпису")
     def download_secrets(self):
         cert_file = st.file_uploader(
@@ -340,43 +482,71 @@ class StreamlitApp:
                     )
             
             if st.session_state.sign_btn:
-                start = st.success("✅ Розпочато підпис пакету документів...")
-                info = st.warning('УВАГА!\nНЕ ЗАКРИВАТИ ЦЕ ВІКНО І НЕ ПЕРЕХОДИТИ НА ІНШІ МОДУЛІ ПІСЛЯ СТАРТУ', icon="⚠️")
-                progress_bar = st.progress(0)
-                status_text = st.empty()
-                
-                def update_progress(
-                    completed: int,
-                    total: int,
-                    elements_message: str = "документів"
-                ):
-                    progress = int(completed / total * 100)
-                    progress_bar.progress(progress)
-                    status_text.text(f"Опрацьовано {completed} з {total} {elements_message}")
-                
-                with st.spinner("Підписування...", show_time=True):
-                    success, message = sign_folder_documents(
+                # Пакет выполняется менеджером заданий: вкладку можно закрыть,
+                # повторное нажатие для той же папки вернёт то же задание
+                try:
+                    job = self.jobs.submit(
                         root_folder=st.session_state.root_folder,
                         key_file=st.session_state.key_file,
-                        is_long_sign=st.session_state.is_long_sign,
-                        cert_file=st.session_state.cert_file,
                         key_password=st.session_state.key_password,
                         workers=st.session_state.workers_num,
-                        callback_progress=update_progress
+                        is_long_sign=st.session_state.is_long_sign,
+                        cert_file=st.session_state.cert_file,
+                        execution_backend=(
+                            'process'
+                            if st.session_state.execution_backend_radio == 'Процеси'
+                            else 'thread'
+                        ),
+                        use_validation_proxy=st.session_state.use_validation_proxy,
+                        adaptive_concurrency=st.session_state.adaptive_concurrency,
+                        deduplicate=st.session_state.deduplicate,
+                        schedule_policy={
+                            'Спочатку великі': 'largest_first',
+                            'По папках': 'by_folder'
+                        }.get(st.session_state.schedule_policy_radio, 'scan')
                     )
-                
-                start.text("✅ Обробка закінчена!")
-                if success:
-                    st.success(message)
+                except ValueError:
+                    st.error("❌ Ця папка вже підписується іншим ключем або з іншими параметрами")
                 else:
-                    st.error(message)
-                
-                progress_bar.empty()
-                info.empty()
+                    st.session_state.job_id = job.id
+                    st.success("✅ Пакет поставлено в чергу. Вікно можна закрити - підпис продовжиться на сервері")
                 st.session_state.sign_btn = False
-                
-                if st.button('Підписати знов'):
-                    st.rerun()
+        
+        self.render_jobs()
+    
+    @st.fragment(run_every=2)
+    def render_jobs(self):
+        """Задания подписи всех сессий (обновляется каждые 2 секунды)"""
+        jobs = self.jobs.jobs()[:10]
+        if not jobs:
+            return
+        
+        st.markdown("---")
+        st.subheader("📦 Пакети підпису")
+        for job in jobs:
+            own = job.id == st.session_state.get("job_id")
+            with st.container(border=True):
+                st.markdown(
+                    f"{JOB_STATE_ICONS[job.state]} **{job.root_folder}** - {JOB_STATE_LABELS[job.state]}"
+                    f"{' (ваш пакет)' if own else ''}"
+                )
+                if job.state == "queued":
+                    st.caption(f"Очікує вільних потоків ({job.workers} з {self.jobs.max_workers})")
+                elif job.state == "running":
+                    if job.total:
+                        st.progress(min(int(job.completed / job.total * 100), 100))
+                        text = f"Опрацьовано {job.completed} з {job.total} {job.elements_message}"
+                        if job.folders_completed:
+                            text += f", готових папок: {job.folders_completed}"
+                        st.text(text)
+                    else:
+                        st.caption("Пошук документів...")
+                elif job.message:
+                    with st.expander("Результат", expanded=own):
+                        if job.success:
+                            st.success(job.message)
+                        else:
+                            st.error(job.message)
 
     def render_single_sign_page(self):
         """Страница подписи одного файла"""
@@ -448,6 +618,10 @@ class StreamlitApp:
                         cert_file=st.session_state.cert_file,
                         key_password=key_password,
                         workers=st.session_state.workers_num,
+                        # Временная папка: журнал, снимок и отчёт для неё не нужны
+                        journal_dir=None,
+                        snapshot_dir=None,
+                        report_dir=None
                     )
                 
                 if success:
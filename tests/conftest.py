@@ -0,0 +1,43 @@
+import pytest
+
+from src.sign.thread_signer import BatchSigner
+
+
+@pytest.fixture
+def make_documents():
+    """
+    Псевдо-PDF для пакетных тестов: `make_documents(root, count, folders=0)`.
+
+    Файл i - `doc_{i}.pdf` с уникальным содержимым; при `folders` лежит
+    в `claim_{i % folders}`, иначе прямо в `root`. Возвращает пути по порядку.
+    """
+    def make(root, count, folders=0):
+        files = []
+        for i in range(count):
+            folder = root / f"claim_{i % folders}" if folders else root
+            folder.mkdir(parents=True, exist_ok=True)
+            path = folder / f"doc_{i}.pdf"
+            path.write_bytes(b"%PDF-1.4\n" + str(i).encode())
+            files.append(path)
+        return files
+
+    return make
+
+
+@pytest.fixture
+def make_signer():
+    """
+    `BatchSigner` на фиктивном бэкенде: одна попытка, два потока, только .pdf;
+    остальные аргументы и замены - через `make_signer(**options)`
+    """
+    def make(**options):
+        defaults = {
+            "key_file_path": "",
+            "max_attempts": 1,
+            "max_workers": 2,
+            "extensions": ['.pdf'],
+            "signer_backend": "fake"
+        }
+        return BatchSigner(**{**defaults, **options})
+
+    return make
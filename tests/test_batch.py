@@ -0,0 +1,177 @@
+import threading
+
+from src.sign.model import SignerConfig
+from src.sign.retry import ValidationServiceError
+from src.sign.report import read_report
+from src.sign.backends import FakeSignerBackend
+from src.sign.key_registry import KeyProfile, KeyRegistry
+from src.sign.validation_proxy import DEFAULT_ENDPOINTS, SharedEndpoints
+from src.sign.thread_signer import BatchOrchestrator
+
+
+def test_window_bounds_unfinished_tasks(tmp_path, make_documents, make_signer):
+    make_documents(tmp_path, 40)
+    signer = make_signer(fake_latency=0.005)
+    orchestrator = signer.orchestrator
+    orchestrator.config.max_in_flight_per_worker = 2
+
+    started = 0
+    peak = 0
+    lock = threading.Lock()
+    sign_task = orchestrator._sign_task
+
+    def counting_sign_task(state):
+        nonlocal started, peak
+        with lock:
+            started += 1
+            peak = max(peak, started - orchestrator._finished)
+        return sign_task(state)
+
+    orchestrator._sign_task = counting_sign_task
+    summary = signer.sign_documents_batch(tmp_path, "")
+
+    assert summary.total == summary.successful == 40
+    assert peak <= 4
+
+
+def test_retried_tasks_complete_without_polling(tmp_path, make_documents, make_signer):
+    make_documents(tmp_path, 20)
+    signer = make_signer(
+        max_attempts=5,
+        retry_delay=0,
+        max_workers=3,
+        fake_failure_rate=0.4,
+        report_dir=tmp_path / "reports",
+        report_format="jsonl"
+    )
+    signer.orchestrator.config.breaker_failure_threshold = 0
+
+    progress = []
+    summary = signer.sign_documents_batch(
+        tmp_path, "", progress_callback=lambda *args: progress.append(args)
+    )
+
+    rows = list(read_report(summary.report_path))
+    assert summary.total == len(rows) == 20
+    assert sorted(row["file_path"] for row in rows) == sorted(str(p) for p in tmp_path.glob("*.pdf"))
+    assert summary.retried == sum(1 for row in rows if row["attempts"] > 1) > 0
+    assert progress[-1] == (20, 20, 'документів')
+
+
+def test_failed_result_recording_does_not_hang_batch(tmp_path, make_documents, make_signer):
+    make_documents(tmp_path, 10)
+    signer = make_signer()
+    orchestrator = signer.orchestrator
+    record_result = orchestrator._record_result
+    failures = [OSError("disk full")]
+
+    def failing_record_result(result):
+        if failures:
+            raise failures.pop()
+        record_result(result)
+
+    orchestrator._record_result = failing_record_result
+    outcome = []
+    worker = threading.Thread(target=lambda: outcome.append(signer.sign_documents_batch(tmp_path, "")))
+    worker.start()
+    worker.join(10)
+
+    assert not worker.is_alive()
+    # Результат, который не удалось записать, не учитывается повторно
+    assert outcome[0].total == 9
+
+
+def test_document_errors_do_not_trip_breaker(tmp_path, make_documents, make_signer):
+    make_documents(tmp_path, 12)
+    signer = make_signer(fake_failure_rate=1.0)
+    signer.orchestrator.config.breaker_failure_threshold = 3
+
+    summary = signer.sign_documents_batch(tmp_path, "")
+
+    assert summary.failed == 12
+    assert signer.orchestrator.breaker.trips == 0
+
+
+def test_validation_errors_trip_breaker(tmp_path, make_documents, make_signer):
+    make_documents(tmp_path, 6)
+    signer = make_signer(max_workers=1)
+    config = signer.orchestrator.config
+    config.breaker_failure_threshold = 2
+    config.breaker_reset_timeout = 0.01
+
+    def unreachable_tsp(task, timer=None):
+        raise ValidationServiceError("TSP unreachable")
+
+    signer.orchestrator.signature_service.backend.sign = unreachable_tsp
+    summary = signer.sign_documents_batch(tmp_path, "")
+
+    assert summary.failed == 6
+    assert signer.orchestrator.breaker.trips > 0
+
+
+class _LeasingBackend(FakeSignerBackend):
+    """Как EUSignBackend: адреса OCSP/TSP заняты с создания бэкенда до `close`"""
+
+    def __init__(self, endpoints: SharedEndpoints):
+        super().__init__()
+        self.endpoints = endpoints
+        self.endpoints.acquire(DEFAULT_ENDPOINTS)
+        self.held = True
+
+    def close(self):
+        if self.held:
+            self.held = False
+            self.endpoints.release()
+
+
+def test_empty_batch_releases_validation_endpoints(tmp_path):
+    endpoints = SharedEndpoints(lambda e: None)
+    config = SignerConfig(key_file_path="", max_attempts=1, max_workers=2, signer_backend="fake", deduplicate=True)
+    orchestrator = BatchOrchestrator(config, ['.pdf'], backend=_LeasingBackend(endpoints))
+
+    summary = orchestrator.process_folder(tmp_path, "")
+
+    assert summary.total == 0
+    assert endpoints.users == 0
+
+
+class _RegistryBackend(FakeSignerBackend):
+    """Как EUSignBackend: запись реестра ключей взята с создания бэкенда до `close`"""
+
+    def __init__(self, registry: KeyRegistry, profile: KeyProfile):
+        super().__init__()
+        self.registry = registry
+        self.profile = profile
+        self.registry.acquire(profile)
+        self.held = True
+
+    def close(self):
+        if self.held:
+            self.held = False
+            self.registry.release(self.profile)
+
+
+def test_empty_batch_returns_key_to_registry(tmp_path):
+    registry = KeyRegistry(lambda profile: FakeSignerBackend())
+    profile = KeyProfile("company_a.jks")
+    config = SignerConfig(key_file_path="", max_attempts=1, max_workers=2, signer_backend="fake", deduplicate=True)
+    orchestrator = BatchOrchestrator(config, ['.pdf'], backend=_RegistryBackend(registry, profile))
+
+    orchestrator.process_folder(tmp_path, "")
+
+    assert registry.users(profile) == 0
+
+
+def test_document_errors_do_not_lower_concurrency(tmp_path, make_documents, make_signer):
+    make_documents(tmp_path, 40)
+    signer = make_signer(
+        max_workers=4,
+        fake_failure_rate=1.0,
+        adaptive_concurrency=True
+    )
+    signer.orchestrator.config.breaker_failure_threshold = 0
+
+    summary = signer.sign_documents_batch(tmp_path, "")
+
+    assert summary.failed == 40
+    assert signer.orchestrator.concurrency.limit >= 2
@@ -0,0 +1,66 @@
+import mmap
+
+from src.sign import buffers
+from src.sign.buffers import CopyStats, open_input_buffer, call_with_buffer
+
+
+def _bytes_only(data):
+    if not isinstance(data, bytes):
+        raise TypeError("bytes expected")
+    return len(data)
+
+
+def test_mmap_input_is_not_copied(tmp_path, monkeypatch):
+    monkeypatch.setattr(buffers, "copy_stats", CopyStats())
+    path = tmp_path / "doc.pdf"
+    path.write_bytes(b"x" * 4096)
+
+    with open_input_buffer(str(path)) as data:
+        assert isinstance(data, mmap.mmap)
+        assert call_with_buffer("len-test", len, data) == 4096
+
+    assert buffers.copy_stats.bytes_signed == 4096
+    assert buffers.copy_stats.bytes_copied == 0
+
+
+def test_bytes_only_binding_falls_back_once(tmp_path, monkeypatch):
+    monkeypatch.setattr(buffers, "copy_stats", CopyStats())
+    monkeypatch.setattr(buffers, "_native_accepts_buffers", {})
+    path = tmp_path / "doc.pdf"
+    path.write_bytes(b"x" * 1024)
+
+    for _ in range(2):
+        with open_input_buffer(str(path)) as data:
+            assert call_with_buffer("bytes-only", _bytes_only, data) == 1024
+
+    assert buffers._native_accepts_buffers == {"bytes-only": False}
+    assert buffers.copy_stats.bytes_copied == 2048
+    assert buffers.copy_stats.fallbacks == 2
+
+
+def test_empty_and_copy_mode_read_into_bytes(tmp_path):
+    empty = tmp_path / "empty.pdf"
+    empty.write_bytes(b"")
+    with open_input_buffer(str(empty)) as data:
+        assert data == b""
+
+    path = tmp_path / "doc.pdf"
+    path.write_bytes(b"abc")
+    with open_input_buffer(str(path), zero_copy=False) as data:
+        assert data == b"abc"
+
+
+def test_unmappable_file_is_read_into_bytes(tmp_path, monkeypatch):
+    monkeypatch.setattr(buffers, "copy_stats", CopyStats())
+
+    def no_mmap(*args, **kwargs):
+        raise OSError("mmap is not supported on this file system")
+
+    monkeypatch.setattr(buffers.mmap, "mmap", no_mmap)
+    path = tmp_path / "doc.pdf"
+    path.write_bytes(b"x" * 1024)
+
+    with open_input_buffer(str(path)) as data:
+        assert data == b"x" * 1024
+
+    assert buffers.copy_stats.bytes_copied == 1024
@@ -0,0 +1,31 @@
+from src.sign.concurrency import AdaptiveConcurrencyLimiter
+from src.sign.metrics import percentile
+
+
+def complete(limiter: AdaptiveConcurrencyLimiter, count: int, latency: float, success: bool):
+    for _ in range(count):
+        limiter.acquire()
+        limiter.release(latency, success)
+
+
+def test_percentile():
+    assert percentile([], 95) == 0.0
+    assert percentile([3, 1, 2], 50) == 2
+    assert percentile(list(range(1, 101)), 95) == 95
+
+
+def test_limit_grows_while_healthy():
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=2, max_limit=4, window=5)
+    complete(limiter, 20, latency=0.1, success=True)
+    assert limiter.limit == 4
+    assert [limit for _, limit in limiter.history] == [2, 3, 4]
+
+
+def test_limit_backs_off_on_errors_and_latency():
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=8, max_limit=8, window=5, target_p95_latency=1.0)
+    complete(limiter, 5, latency=0.1, success=False)
+    assert limiter.limit == 4
+    complete(limiter, 5, latency=5.0, success=True)
+    assert limiter.limit == 2
+    complete(limiter, 10, latency=5.0, success=True)
+    assert limiter.limit == 1
@@ -0,0 +1,38 @@
+from src.sign.model import SignTask
+from src.sign.dedup import group_duplicates
+
+
+def test_group_duplicates_hashes_only_same_size_files(tmp_path):
+    contents = [b"power of attorney", b"power of attorney", b"receipt", b"power of attornex"]
+    tasks = []
+    for i, content in enumerate(contents):
+        path = tmp_path / f"doc_{i}.pdf"
+        path.write_bytes(content)
+        tasks.append(SignTask(file_path=str(path), key_password=""))
+
+    primaries, duplicates = group_duplicates(tasks)
+
+    assert sorted(t.file_path for t in primaries) == sorted(tasks[i].file_path for i in (0, 2, 3))
+    assert duplicates == {tasks[0].file_path: [tasks[1]]}
+
+
+def test_batch_signs_identical_files_once(tmp_path, make_signer):
+    root = tmp_path / "docs"
+    for claim in range(5):
+        folder = root / f"claim_{claim}"
+        folder.mkdir(parents=True)
+        (folder / "poa.pdf").write_bytes(b"%PDF-1.4\nsame power of attorney")
+        (folder / "claim.pdf").write_bytes(b"%PDF-1.4\nclaim " + str(claim).encode())
+
+    progress = []
+    signer = make_signer(deduplicate=True)
+    summary = signer.sign_documents_batch(
+        root, "", progress_callback=lambda *args: progress.append(args[:2])
+    )
+
+    assert summary.total == summary.successful == 10
+    assert signer.orchestrator.dedup_stats["signatures_saved"] == 4
+    assert progress[-1] == (10, 10)
+
+    signatures = {(root / f"claim_{c}" / "poa.pdf.p7s").read_bytes() for c in range(5)}
+    assert len(signatures) == 1
@@ -0,0 +1,48 @@
+import hashlib
+
+import pytest
+
+from src.sign.model import SignTask, SignerConfig
+from src.sign.backends import FakeSignerBackend, FAKE_SIGNATURE_MAGIC, create_backend
+
+
+def test_fake_backend_writes_signature(tmp_path):
+    document = tmp_path / "doc.pdf"
+    document.write_bytes(b"%PDF-1.4 test")
+    
+    backend = FakeSignerBackend()
+    output = backend.sign(SignTask(file_path=str(document), key_password=""))
+    
+    assert output == f"{document}.p7s"
+    expected = FAKE_SIGNATURE_MAGIC + hashlib.sha256(b"%PDF-1.4 test").hexdigest().encode()
+    with open(output, "rb") as f:
+        assert f.read() == expected
+
+
+def test_fake_backend_failures_are_deterministic(tmp_path):
+    paths = []
+    for i in range(50):
+        document = tmp_path / f"doc_{i}.pdf"
+        document.write_bytes(str(i).encode())
+        paths.append(str(document))
+    
+    def run() -> list[bool]:
+        backend = FakeSignerBackend(failure_rate=0.3, seed=7)
+        outcome = []
+        for path in paths:
+            try:
+                backend.sign(SignTask(file_path=path, key_password=""))
+                outcome.append(True)
+            except RuntimeError:
+                outcome.append(False)
+        return outcome
+    
+    first = run()
+    assert first == run()
+    assert 0 < first.count(False) < len(first)
+
+
+def test_create_backend_rejects_unknown_name():
+    config = SignerConfig(key_file_path="", signer_backend="unknown")
+    with pytest.raises(ValueError):
+        create_backend(config)
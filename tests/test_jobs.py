@@ -0,0 +1,85 @@
+import json
+import threading
+
+import pytest
+
+from src.sign.jobs import JobManager
+
+
+class BlockingRunner:
+    """Вместо sign_folder_documents: ждёт разрешения завершиться"""
+
+    def __init__(self, folders):
+        self.release = {folder: threading.Event() for folder in folders}
+        self.calls = []
+
+    def __call__(self, root_folder, key_password, callback_progress, callback_folder, **kwargs):
+        self.calls.append((root_folder, key_password, kwargs))
+        callback_progress(1, 2, "документів")
+        self.release[root_folder].wait(5)
+        callback_folder(None)
+        callback_progress(2, 2, "документів")
+        return True, f"signed {root_folder}"
+
+
+def test_jobs_share_worker_budget(tmp_path):
+    runner = BlockingRunner(["a", "b", "c"])
+    manager = JobManager(tmp_path / "jobs", max_workers=10, runner=runner)
+
+    a = manager.submit("a", "key.jks", "secret", workers=6, deduplicate=True)
+    b = manager.submit("b", "key.jks", "secret", workers=6)
+    c = manager.submit("c", "key.jks", "secret", workers=20)
+
+    assert manager.get(a.id).state == "running"
+    assert manager.get(b.id).state == "queued"
+    assert c.workers == 10
+    # Повторная отправка той же папки - то же задание
+    assert manager.submit("b", "key.jks", "secret").id == b.id
+
+    runner.release["a"].set()
+    assert manager.wait(a.id, 5).state == "done"
+    assert manager.get(b.id).state in ("running", "done")
+    assert manager.get(c.id).state == "queued"
+
+    runner.release["b"].set()
+    runner.release["c"].set()
+    done = manager.wait(c.id, 5)
+    assert (done.state, done.completed, done.total, done.folders_completed) == ("done", 2, 2, 1)
+    assert done.message == "signed c"
+    assert [call[0] for call in runner.calls] == ["a", "b", "c"]
+    assert runner.calls[0][2]["deduplicate"] is True
+
+
+def test_jobs_are_restored_from_disk(tmp_path):
+    runner = BlockingRunner(["a", "b"])
+    manager = JobManager(tmp_path / "jobs", runner=runner)
+    finished = manager.submit("a", "key.jks", "secret")
+    runner.release["a"].set()
+    manager.wait(finished.id, 5)
+
+    running = manager.submit("b", "key.jks", "secret")
+    saved = json.loads((tmp_path / "jobs" / f"{running.id}.json").read_text(encoding="utf-8"))
+    assert saved["state"] == "running" and "secret" not in json.dumps(saved)
+
+    restored = JobManager(tmp_path / "jobs", runner=runner)
+    assert restored.get(finished.id).message == "signed a"
+    assert restored.get(running.id).state == "interrupted"
+
+    runner.release["b"].set()
+    manager.wait(running.id, 5)
+
+
+def test_same_folder_with_other_key_is_rejected(tmp_path):
+    runner = BlockingRunner(["a"])
+    manager = JobManager(tmp_path / "jobs", max_workers=10, runner=runner)
+    job = manager.submit("a", "key.jks", "secret", is_long_sign=True)
+
+    with pytest.raises(ValueError):
+        manager.submit("a", "other.jks", "secret", is_long_sign=True)
+    with pytest.raises(ValueError):
+        manager.submit("a", "key.jks", "secret", is_long_sign=False)
+    assert manager.submit("a", "key.jks", "secret", is_long_sign=True).id == job.id
+
+    runner.release["a"].set()
+    assert manager.wait(job.id, 5).state == "done"
+    assert len(runner.calls) == 1
@@ -0,0 +1,92 @@
+import os
+
+import pytest
+
+from src.sign.model import SignResult
+from src.sign.journal import SigningJournal
+from src.sign.backends import FAKE_SIGNATURE_MAGIC
+from src.sign.report import read_report
+
+
+@pytest.fixture
+def journal_signer(tmp_path, make_signer):
+    """Пакет с журналом в tmp_path/journal и отчётом JSON Lines"""
+    def make(**options):
+        return make_signer(
+            journal_dir=tmp_path / "journal",
+            report_dir=tmp_path / "reports",
+            report_format="jsonl",
+            **options
+        )
+
+    return make
+
+
+def test_unfinished_batch_is_restored_after_restart(tmp_path, make_documents):
+    files = make_documents(tmp_path / "docs", 4, folders=2)
+    journal = SigningJournal(tmp_path / "batch.journal.jsonl", fsync_every=1)
+    journal.begin(files, tmp_path / "docs")
+
+    (tmp_path / "signed.p7s").write_bytes(b"sig")
+    journal.record_result(SignResult(str(files[0]), str(tmp_path / "signed.p7s"), True))
+    journal.close()
+
+    # Оборванная последняя запись после падения процесса
+    with open(journal.path, "a", encoding="utf-8") as f:
+        f.write('{"event": "done", "fi')
+
+    restored = SigningJournal(journal.path)
+    assert restored.unfinished
+    assert restored.pending_files() == files[1:]
+
+
+def test_resume_re_signs_torn_signatures_without_rescanning(tmp_path, make_documents, journal_signer):
+    root = tmp_path / "docs"
+    files = make_documents(root, 4, folders=2)
+    journal = SigningJournal.for_folder(tmp_path / "journal", root, extensions=[".pdf"])
+    journal.begin(files[:2], root)
+    journal.close()
+
+    # Оборванная запись подписи от прерванного пакета
+    torn = files[0].with_name(files[0].name + ".p7s")
+    torn.write_bytes(b"IITSIGN")
+
+    summary = journal_signer().sign_documents_batch(root, "")
+
+    rows = list(read_report(summary.report_path))
+    assert sorted(row["file_path"] for row in rows) == sorted(str(f) for f in files[:2])
+    assert torn.read_bytes().startswith(FAKE_SIGNATURE_MAGIC)
+    assert not SigningJournal.for_folder(tmp_path / "journal", root, extensions=[".pdf"]).unfinished
+
+
+def test_completed_folders_are_skipped_on_next_scan(tmp_path, make_documents, journal_signer):
+    root = tmp_path / "docs"
+    make_documents(root, 4, folders=2)
+
+    assert journal_signer().sign_documents_batch(root, "").total == 4
+
+    journal = SigningJournal.for_folder(tmp_path / "journal", root, extensions=[".pdf"])
+    assert sorted(journal.complete_subdirs(root)) == ["claim_0", "claim_1"]
+    assert journal.complete_subdirs(root / "claim_0") == []
+
+    (root / "claim_1" / "new.pdf").write_bytes(b"%PDF-1.4\nnew")
+    assert journal.complete_subdirs(root / "claim_1") is None
+
+    summary = journal_signer().sign_documents_batch(root, "")
+    rows = list(read_report(summary.report_path))
+    assert [row["file_path"] for row in rows] == [str(root / "claim_1" / "new.pdf")]
+
+
+def test_new_extensions_rescan_completed_folders(tmp_path, make_documents, journal_signer):
+    root = tmp_path / "docs"
+    make_documents(root, 4, folders=2)
+    assert journal_signer().sign_documents_batch(root, "").total == 4
+
+    # Файл .docx уже был в папке: mtime папки тот же, что в журнале
+    mtime_ns = (root / "claim_0").stat().st_mtime_ns
+    (root / "claim_0" / "old.docx").write_bytes(b"docx")
+    os.utime(root / "claim_0", ns=(mtime_ns, mtime_ns))
+
+    summary = journal_signer(extensions=['.pdf', '.docx']).sign_documents_batch(root, "")
+    rows = list(read_report(summary.report_path))
+    assert [row["file_path"] for row in rows] == [str(root / "claim_0" / "old.docx")]
@@ -0,0 +1,99 @@
+import threading
+
+from src.sign.key_registry import KeyProfile, KeyRegistry
+
+
+class _Entry:
+    created = 0
+
+    def __init__(self, profile):
+        type(self).created += 1
+        self.profile = profile
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+def test_entry_is_created_once_per_profile_and_type():
+    registry = KeyRegistry(_Entry)
+    long_sign = KeyProfile("company_a.jks", is_sign_long_type=True)
+    bes_sign = KeyProfile("company_a.jks", is_sign_long_type=False)
+
+    first = registry.acquire(long_sign)
+    assert registry.acquire(KeyProfile("company_a.jks")) is first
+    assert registry.acquire(bes_sign) is not first
+    assert len(registry) == 2
+
+
+def test_idle_entries_are_evicted_lru():
+    registry = KeyRegistry(_Entry, max_entries=2, idle_timeout=None)
+    profiles = [KeyProfile(f"company_{i}.jks") for i in range(3)]
+
+    entries = [registry.acquire(p) for p in profiles[:2]]
+    registry.release(profiles[0])
+    registry.release(profiles[1])
+    registry.acquire(profiles[0])  # company_0 - недавно использованный
+    registry.release(profiles[0])
+
+    registry.acquire(profiles[2])
+
+    assert entries[1].closed and not entries[0].closed
+    assert profiles[1] not in registry and profiles[0] in registry
+
+
+def test_entries_in_use_are_never_evicted():
+    registry = KeyRegistry(_Entry, max_entries=1, idle_timeout=None)
+    first = registry.acquire(KeyProfile("company_a.jks"))
+    registry.acquire(KeyProfile("company_b.jks"))
+
+    assert not first.closed and len(registry) == 2
+
+    registry.release(KeyProfile("company_a.jks"))
+    assert first.closed and len(registry) == 1
+
+
+def test_idle_timeout_evicts_unused_entries():
+    registry = KeyRegistry(_Entry, idle_timeout=0.0)
+    entry = registry.acquire(KeyProfile("company_a.jks"))
+    registry.release(KeyProfile("company_a.jks"))
+
+    registry.acquire(KeyProfile("company_b.jks"))
+
+    assert entry.closed
+
+
+def test_concurrent_acquire_creates_single_entry():
+    _Entry.created = 0
+    registry = KeyRegistry(_Entry)
+    profile = KeyProfile("company_a.jks")
+    entries = []
+
+    threads = [threading.Thread(target=lambda: entries.append(registry.acquire(profile))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert _Entry.created == 1
+    assert all(e is entries[0] for e in entries)
+
+
+def test_replaced_key_file_gets_new_entry(tmp_path):
+    key_file = tmp_path / "company_a.jks"
+    key_file.write_bytes(b"old key")
+    registry = KeyRegistry(_Entry, idle_timeout=None)
+
+    old_profile = KeyProfile.for_files(str(key_file))
+    old = registry.acquire(old_profile)
+    registry.release(old_profile)
+    assert registry.acquire(KeyProfile.for_files(str(key_file))) is old
+
+    key_file.write_bytes(b"new key, other size")
+    new_profile = KeyProfile.for_files(str(key_file))
+    new = registry.acquire(new_profile)
+
+    # Старая версия ещё используется - закрывается только после release
+    assert new is not old and not old.closed
+    registry.release(old_profile)
+    assert old.closed and old_profile not in registry and new_profile in registry
@@ -0,0 +1,11 @@
+from src.sign.metrics import StageTimer
+
+
+def test_stage_timer_accumulates():
+    timer = StageTimer()
+    timer.add("sign", 1.0)
+    timer.add("sign", 0.5)
+    with timer.stage("read"):
+        pass
+    assert timer.timings["sign"] == 1.5
+    assert timer.timings["read"] >= 0.0
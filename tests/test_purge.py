@@ -0,0 +1,64 @@
+import os
+import time
+
+from src.sign.purge import SignaturePurger
+
+
+def _tree(root):
+    for claim in ("claim_a", "claim_b"):
+        for part in range(3):
+            folder = root / claim / f"part_{part}"
+            folder.mkdir(parents=True)
+            (folder / "doc.pdf").write_bytes(b"%PDF-1.4\n")
+            (folder / "doc.pdf.p7s").write_bytes(b"s" * 100)
+    (root / "cover.xml.p7s").write_bytes(b"s" * 10)
+
+
+def test_dry_run_counts_signatures_per_folder_without_deleting(tmp_path):
+    _tree(tmp_path)
+
+    summary = SignaturePurger(workers=4).run(tmp_path, dry_run=True)
+
+    assert (summary.files, summary.bytes, summary.deleted) == (7, 610, 0)
+    assert summary.by_folder == {"claim_a": [3, 300], "claim_b": [3, 300], ".": [1, 10]}
+    assert len(list(tmp_path.rglob("*.p7s"))) == 7
+
+
+def test_purge_deletes_in_batches_and_reports_progress(tmp_path):
+    _tree(tmp_path)
+    progress = []
+
+    summary = SignaturePurger(workers=4, batch_size=2).run(
+        tmp_path, progress_callback=lambda *args: progress.append(args)
+    )
+
+    assert (summary.files, summary.deleted, summary.failed) == (7, 7, 0)
+    assert not list(tmp_path.rglob("*.p7s")) and len(list(tmp_path.rglob("*.pdf"))) == 6
+    assert progress[-1] == (7, 7, 'підписів')
+
+
+def test_purge_filters_by_pattern_and_age(tmp_path):
+    _tree(tmp_path)
+    old = time.time() - 10 * 86400
+    os.utime(tmp_path / "claim_a" / "part_0" / "doc.pdf.p7s", (old, old))
+
+    by_pattern = SignaturePurger(pattern="claim_b/*").run(tmp_path)
+    by_age = SignaturePurger(older_than=86400).run(tmp_path)
+
+    assert by_pattern.deleted == 3 and not list((tmp_path / "claim_b").rglob("*.p7s"))
+    assert by_age.deleted == 1 and len(list(tmp_path.rglob("*.p7s"))) == 3
+
+
+def test_delete_removes_exactly_previewed_signatures(tmp_path):
+    _tree(tmp_path)
+    purger = SignaturePurger(workers=2, batch_size=2, pattern="claim_a/*")
+    preview = purger.run(tmp_path, dry_run=True)
+    # Подпись, появившаяся после подсчёта, не удаляется
+    (tmp_path / "claim_a" / "late.pdf.p7s").write_bytes(b"s")
+    progress = []
+
+    summary = purger.delete(preview.paths, progress_callback=lambda *args: progress.append(args))
+
+    assert (summary.files, summary.deleted, summary.failed) == (3, 3, 0)
+    assert [p.name for p in (tmp_path / "claim_a").rglob("*.p7s")] == ["late.pdf.p7s"]
+    assert progress[-1] == (3, 3, 'підписів')
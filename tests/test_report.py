@@ -0,0 +1,39 @@
+from src.sign.model import SignResult
+from src.sign.metrics import LatencyHistogram
+from src.sign.report import BatchResults, read_report
+
+
+def test_histogram_percentiles_are_close():
+    histogram = LatencyHistogram()
+    for i in range(1, 1001):
+        histogram.add(i / 1000)
+
+    assert histogram.count == 1000
+    assert abs(histogram.mean - 0.5005) < 1e-9
+    assert 0.5 <= histogram.percentile(50) <= 0.5 * 1.19
+    assert 0.95 <= histogram.percentile(95) <= 1.0
+    assert histogram.percentile(100) == 1.0
+    assert LatencyHistogram().percentile(95) == 0.0
+
+
+def test_batch_results_stream_to_report(tmp_path):
+    results = BatchResults(tmp_path / "reports", report_format="jsonl")
+    for i in range(30):
+        results.add(SignResult(
+            f"doc_{i}.pdf",
+            f"doc_{i}.pdf.p7s",
+            success=i % 3 != 0,
+            error_message="" if i % 3 else "timeout",
+            processing_time=0.1,
+            attempts=2 if i % 5 == 0 else 1,
+            stage_times={"sign": 0.05}
+        ))
+    summary = results.close()
+
+    assert (summary.total, summary.successful, summary.failed, summary.retried) == (30, 20, 10, 6)
+    assert summary.failures[0] == ("doc_0.pdf", "timeout")
+    assert summary.stage_summary()["sign"]["p50"] >= 0.05
+
+    rows = list(read_report(summary.report_path))
+    assert [row["file_path"] for row in rows] == [f"doc_{i}.pdf" for i in range(30)]
+    assert rows[1]["stage_sign"] == 0.05 and rows[1]["stage_read"] == 0.0
@@ -0,0 +1,62 @@
+import time
+import random
+import threading
+
+import pytest
+
+from src.sign.retry import RetryQueue, CircuitBreaker, ValidationServiceError, backoff_delay, validation_step
+
+
+def test_backoff_delay_is_bounded():
+    rng = random.Random(1)
+    for attempt in range(1, 12):
+        delay = backoff_delay(attempt, base_delay=10, max_delay=300, rng=rng)
+        assert 0 <= delay <= min(300, 10 * 2 ** (attempt - 1))
+
+
+def test_retry_queue_returns_only_due_items():
+    retry_queue = RetryQueue()
+    retry_queue.push("later", 60)
+    retry_queue.push("now", 0)
+    
+    assert retry_queue.pop_due() == ["now"]
+    assert len(retry_queue) == 1
+    assert 59 < retry_queue.next_due_in() <= 60
+    assert RetryQueue().next_due_in() is None
+
+
+def test_circuit_breaker_opens_and_probes():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.1)
+    breaker.wait_for_permission()
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    
+    started = time.monotonic()
+    breaker.wait_for_permission()
+    assert time.monotonic() - started >= 0.09
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    
+    # Пока идёт пробная подпись, остальные ждут её результата
+    waiter = threading.Thread(target=breaker.wait_for_permission)
+    waiter.start()
+    waiter.join(0.05)
+    assert waiter.is_alive()
+    
+    breaker.record_success()
+    waiter.join(1)
+    assert not waiter.is_alive()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.trips == 1
+
+
+def test_only_validation_errors_open_the_breaker():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30)
+    for _ in range(5):
+        breaker.wait_for_permission()
+        breaker.record_neutral()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+    with pytest.raises(ValidationServiceError):
+        with validation_step("CtxSignData"):
+            raise ConnectionError("TSP unreachable")
@@ -0,0 +1,105 @@
+import os
+import time
+
+from src.sign.snapshot import ScanSnapshot
+from src.sign.thread_signer import FileScanner
+
+
+def test_scanner_yields_first_file_before_walking_the_tree(tmp_path, make_documents):
+    make_documents(tmp_path, 40, folders=20)
+    scanner = FileScanner(['.pdf'])
+
+    files = scanner.iter_unsigned_files(tmp_path)
+    first = next(files)
+
+    assert first.suffix == ".pdf"
+    assert scanner.folders_scanned < 20
+    assert len([first, *files]) == 40
+    assert scanner.files_found == 40 and scanner.estimate_total() == 40
+
+
+def test_batch_signs_while_scanning_and_reports_final_total(tmp_path, make_documents, make_signer):
+    make_documents(tmp_path, 18, folders=6)
+    progress = []
+    signer = make_signer()
+
+    summary = signer.sign_documents_batch(
+        tmp_path, "", progress_callback=lambda *args: progress.append(args)
+    )
+
+    assert summary.total == summary.successful == 18
+    assert progress[-1] == (18, 18, 'документів')
+    assert all(done <= total for done, total, _ in progress)
+
+
+def test_scanner_checks_signatures_without_stat_calls(tmp_path, monkeypatch, make_documents):
+    make_documents(tmp_path, 6, folders=3)
+    (tmp_path / "claim_0" / "doc_0.pdf.p7s").write_bytes(b"signature")
+    (tmp_path / "claim_1" / "notes.txt").write_bytes(b"not a document")
+
+    stat_calls = []
+    real_stat = os.stat
+    monkeypatch.setattr(os, "stat", lambda *a, **kw: stat_calls.append(a) or real_stat(*a, **kw))
+
+    files = FileScanner(['.pdf']).find_unsigned_files(tmp_path)
+
+    assert sorted(f.relative_to(tmp_path).as_posix() for f in files) == [
+        "claim_0/doc_3.pdf",
+        "claim_1/doc_1.pdf", "claim_1/doc_4.pdf",
+        "claim_2/doc_2.pdf", "claim_2/doc_5.pdf",
+    ]
+    assert stat_calls == []
+
+
+def test_scanner_deletes_signatures(tmp_path, make_documents):
+    make_documents(tmp_path, 2, folders=2)
+    (tmp_path / "claim_0" / "doc_0.pdf.p7s").write_bytes(b"signature")
+    (tmp_path / "claim_1" / "doc_1.pdf.P7S").write_bytes(b"signature")
+
+    files = FileScanner(['.pdf']).find_unsigned_files(tmp_path, delete_signatures=True)
+
+    assert len(files) == 2
+    assert not list(tmp_path.rglob("*.p7s")) and not list(tmp_path.rglob("*.P7S"))
+
+
+def test_parallel_scan_matches_sequential_order(tmp_path):
+    for claim in range(8):
+        for part in range(3):
+            folder = tmp_path / f"claim_{claim}" / f"part_{part}"
+            folder.mkdir(parents=True)
+            (folder / "a.pdf").write_bytes(b"a")
+            (folder / "b.pdf").write_bytes(b"b")
+        (tmp_path / f"claim_{claim}" / "cover.pdf").write_bytes(b"c")
+
+    sequential = FileScanner(['.pdf']).find_unsigned_files(tmp_path)
+    parallel = FileScanner(['.pdf'], scan_workers=4).find_unsigned_files(tmp_path)
+
+    assert len(sequential) == 8 * 7
+    assert parallel == sequential
+
+
+def test_snapshot_skips_listing_unchanged_folders(tmp_path, monkeypatch, make_documents):
+    root = tmp_path / "docs"
+    make_documents(root, 8, folders=4)
+    (root / "claim_0" / "doc_0.pdf.p7s").write_bytes(b"signature")
+    past = time.time() - 60
+    for folder in [root, *root.iterdir()]:
+        os.utime(folder, (past, past))
+
+    first = FileScanner(['.pdf']).find_unsigned_files(root, snapshot=ScanSnapshot(tmp_path / "s.jsonl", ['.pdf']))
+
+    listed = []
+    real_scandir = os.scandir
+    monkeypatch.setattr(os, "scandir", lambda path: listed.append(path) or real_scandir(path))
+
+    snapshot = ScanSnapshot(tmp_path / "s.jsonl", ['.pdf'])
+    assert FileScanner(['.pdf']).find_unsigned_files(root, snapshot=snapshot) == first
+    assert len(first) == 7 and listed == [] and snapshot.hits == 5
+
+    (root / "claim_2" / "new.pdf").write_bytes(b"%PDF-1.4\nnew")
+    files = FileScanner(['.pdf']).find_unsigned_files(root, snapshot=ScanSnapshot(tmp_path / "s.jsonl", ['.pdf']))
+    assert len(files) == 8 and listed == [str(root / "claim_2")]
+
+    other = ScanSnapshot(tmp_path / "s.jsonl", ['.pdf', '.xml'])
+    FileScanner(['.pdf', '.xml']).find_unsigned_files(root, snapshot=other)
+    assert other.hits == 0
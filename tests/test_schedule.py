@@ -0,0 +1,71 @@
+import os
+
+import pytest
+
+from src.sign.model import SignTask, SignResult
+from src.sign.schedule import FolderTracker, order_tasks
+
+
+def _tasks(tmp_path, sizes):
+    tasks = []
+    for name, size in sizes:
+        path = tmp_path / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(b"x" * size)
+        tasks.append(SignTask(str(path), ""))
+    return tasks
+
+
+def _names(tmp_path, tasks):
+    return [os.path.relpath(task.file_path, tmp_path) for task in tasks]
+
+
+def test_order_tasks(tmp_path):
+    tasks = _tasks(tmp_path, [("a/1.pdf", 10), ("b/1.pdf", 30), ("a/2.pdf", 20), ("b/2.pdf", 5)])
+
+    assert order_tasks(tasks, "scan") == tasks
+    assert _names(tmp_path, order_tasks(tasks, "largest_first")) == ["b/1.pdf", "a/2.pdf", "a/1.pdf", "b/2.pdf"]
+    assert _names(tmp_path, order_tasks(tasks, "by_folder")) == ["a/2.pdf", "a/1.pdf", "b/1.pdf", "b/2.pdf"]
+    with pytest.raises(ValueError):
+        order_tasks(tasks, "random")
+
+
+def test_folder_tracker_reports_each_folder_once(tmp_path):
+    events = []
+    tracker = FolderTracker(events.append)
+    tasks = _tasks(tmp_path, [("a/1.pdf", 1), ("a/2.pdf", 1), ("b/1.pdf", 1)])
+    tracker.expect(tasks)
+
+    tracker.record(SignResult(tasks[0].file_path, "", True))
+    assert events == []
+    tracker.record(SignResult(tasks[1].file_path, "", False))
+    tracker.record(SignResult(tasks[2].file_path, "", True))
+
+    assert [(e.folder, e.total, e.successful, e.failed) for e in events] == [
+        (str(tmp_path / "a"), 2, 1, 1),
+        (str(tmp_path / "b"), 1, 1, 0)
+    ]
+    assert tracker.completed == 2
+
+
+@pytest.mark.parametrize("policy", ["scan", "largest_first", "by_folder"])
+def test_batch_emits_folder_events(tmp_path, policy, make_signer):
+    for claim in range(5):
+        for i in range(claim + 1):
+            path = tmp_path / f"claim_{claim}" / f"doc_{i}.pdf"
+            path.parent.mkdir(exist_ok=True)
+            path.write_bytes(b"%PDF-1.4\n" + b"x" * (i * 100 + claim))
+
+    events = []
+    signer = make_signer(
+        max_workers=3,
+        schedule_policy=policy,
+        on_folder_complete=events.append
+    )
+    summary = signer.sign_documents_batch(tmp_path, "")
+
+    assert summary.successful == 15
+    assert sorted((e.folder, e.total) for e in events) == [
+        (str(tmp_path / f"claim_{claim}"), claim + 1) for claim in range(5)
+    ]
+    assert all(e.success for e in events)
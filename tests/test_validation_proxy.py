@@ -0,0 +1,99 @@
+import time
+import threading
+import urllib.request
+from datetime import datetime, timezone
+
+import pytest
+
+from src.sign.validation_proxy import (
+    DEFAULT_ENDPOINTS,
+    SharedEndpoints,
+    ValidationProxy,
+    ValidationProxyConfig,
+    get_validation_proxy,
+    ocsp_cache_key,
+    ocsp_next_update,
+    ocsp_response_status
+)
+from src.sign.thread_signer import BatchSigner
+
+
+def der(tag: int, content: bytes) -> bytes:
+    assert len(content) < 0x80
+    return bytes([tag, len(content)]) + content
+
+
+def ocsp_request(cert_id: bytes, nonce: bytes) -> bytes:
+    request_list = der(0x30, der(0x30, der(0x30, der(0x04, cert_id))))
+    extensions = der(0xA2, der(0x30, der(0x04, nonce)))
+    return der(0x30, der(0x30, request_list + extensions))
+
+
+def ocsp_response(next_update: bytes) -> bytes:
+    single = der(0x30, der(0x30, b"") + der(0x80, b"") + der(0x18, b"20261018000000Z") + der(0xA0, der(0x18, next_update)))
+    response_data = der(0x30, der(0xA1, b"") + der(0x18, b"20261018000000Z") + der(0x30, single))
+    basic = der(0x30, response_data)
+    response_bytes = der(0xA0, der(0x30, der(0x06, b"\x2b") + der(0x04, basic)))
+    return der(0x30, der(0x0A, b"\x00") + response_bytes)
+
+
+def test_cache_key_ignores_nonce():
+    assert ocsp_cache_key(ocsp_request(b"cert", b"n1")) == ocsp_cache_key(ocsp_request(b"cert", b"n2"))
+    assert ocsp_cache_key(ocsp_request(b"cert", b"n1")) != ocsp_cache_key(ocsp_request(b"other", b"n1"))
+
+
+def test_parse_ocsp_response():
+    response = ocsp_response(b"20991231235959Z")
+    assert ocsp_response_status(response) == 0
+    assert ocsp_next_update(response) == datetime(2099, 12, 31, 23, 59, 59, tzinfo=timezone.utc)
+
+
+def test_offline_proxy_caches_ocsp(tmp_path):
+    proxy = ValidationProxy(ValidationProxyConfig(offline=True, record_dir=tmp_path)).start()
+    try:
+        body = ocsp_request(b"cert", b"n1")
+        key = ocsp_cache_key(body)
+        recorded = ocsp_response(b"20991231235959Z")
+        (tmp_path / f"ocsp-{key.hex()}.der").write_bytes(recorded)
+        
+        for nonce in (b"n1", b"n2", b"n3"):
+            request = urllib.request.Request(proxy.ocsp_url, data=ocsp_request(b"cert", nonce), method="POST")
+            with urllib.request.urlopen(request) as response:
+                assert response.read() == recorded
+        
+        assert proxy.stats["ocsp_requests"] == 3
+        assert proxy.stats["ocsp_hits"] == 2
+        assert proxy.stats["upstream_calls"] == 0
+    finally:
+        proxy.stop()
+
+
+def test_proxies_with_different_settings_are_separate():
+    live = get_validation_proxy(ValidationProxyConfig(serve=False))
+    offline = get_validation_proxy(ValidationProxyConfig(offline=True, serve=False))
+
+    assert offline is not live and offline.config.offline
+    assert get_validation_proxy(ValidationProxyConfig(serve=False)) is live
+
+
+def test_batches_with_other_endpoints_wait_for_release():
+    applied = []
+    endpoints = SharedEndpoints(applied.append)
+    proxy = ("http://127.0.0.1/ocsp/", "http://127.0.0.1/tsp/", "8080", "8080")
+
+    endpoints.acquire(proxy)
+    endpoints.acquire(proxy)
+    waiter = threading.Thread(target=endpoints.acquire, args=(DEFAULT_ENDPOINTS,))
+    waiter.start()
+    time.sleep(0.05)
+    assert applied == [proxy]
+
+    endpoints.release()
+    endpoints.release()
+    waiter.join(1)
+    assert applied == [proxy, DEFAULT_ENDPOINTS] and endpoints.users == 1
+
+
+def test_offline_proxy_is_refused_for_real_signer():
+    with pytest.raises(ValueError):
+        BatchSigner(key_file_path="", validation_proxy=ValidationProxyConfig(offline=True))
@@ -0,0 +1,76 @@
+import json
+
+from src.sign.model import SignerConfig
+from src.sign.backends import FakeSignerBackend
+from src.sign import verify
+from src.sign.verify import BatchVerifier
+
+
+def test_verify_folder_reports_invalid_missing_and_orphans(tmp_path, make_documents, make_signer):
+    root = tmp_path / "docs"
+    make_documents(root, 6, folders=2)
+    make_signer().sign_documents_batch(root, "")
+
+    (root / "claim_0" / "doc_0.pdf").write_bytes(b"tampered")
+    (root / "claim_1" / "doc_1.pdf.p7s").write_bytes(b"")
+    (root / "claim_1" / "doc_3.pdf.p7s").unlink()
+    (root / "claim_0" / "gone.pdf.p7s").write_bytes(b"orphan")
+
+    config = SignerConfig(key_file_path="", max_workers=3, signer_backend="fake")
+    verifier = BatchVerifier(config, ['.pdf'], verifier=FakeSignerBackend())
+    report = tmp_path / "report.jsonl"
+    progress = []
+
+    summary = verifier.verify_folder(
+        root,
+        report_path=report,
+        progress_callback=lambda done, total, _: progress.append((done, total))
+    )
+
+    assert summary == {"valid": 3, "invalid": 2, "orphan": 1, "missing": 1}
+    assert progress[-1] == (7, 7)
+
+    entries = [json.loads(line) for line in report.read_text(encoding="utf-8").splitlines()]
+    by_status = {}
+    for entry in entries:
+        by_status.setdefault(entry["status"], []).append(entry)
+    assert len(entries) == 4
+    assert {e["file_path"].rsplit("/", 1)[-1] for e in by_status["invalid"]} == {"doc_0.pdf", "doc_1.pdf"}
+    assert by_status["missing"][0]["file_path"].endswith("doc_3.pdf")
+    assert by_status["orphan"][0]["signature_path"].endswith("gone.pdf.p7s")
+
+
+class _ClosingVerifier(FakeSignerBackend):
+    closed = False
+
+    def close(self):
+        self.closed = True
+
+
+def test_verify_folder_scans_lazily_and_closes_its_verifier(tmp_path, monkeypatch, make_documents, make_signer):
+    root = tmp_path / "docs"
+    make_documents(root, 40, folders=4)
+    make_signer().sign_documents_batch(root, "")
+
+    created = []
+
+    def create_verifier(config):
+        created.append(_ClosingVerifier())
+        return created[-1]
+
+    monkeypatch.setattr(verify, "create_verifier", create_verifier)
+    config = SignerConfig(key_file_path="", max_workers=1, signer_backend="fake")
+    verifier = BatchVerifier(config, ['.pdf'])
+    progress = []
+
+    summary = verifier.verify_folder(
+        root,
+        report_path=tmp_path / "report.jsonl",
+        progress_callback=lambda done, total, message: progress.append((done, total, message))
+    )
+
+    assert summary["valid"] == 40
+    # Проверка началась до конца обхода дерева
+    assert progress[0][1] < 40 and progress[0][2] == 'файлів (пошук триває)'
+    assert progress[-1] == (40, 40, 'файлів')
+    assert len(created) == 1 and created[0].closed and verifier.verifier is None
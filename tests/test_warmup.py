@@ -0,0 +1,37 @@
+import json
+from pathlib import Path
+
+from src.sign.key_registry import KeyProfile
+from src.sign.warmup import profiles_from_env, WarmupStatus
+
+
+def test_profiles_from_env_reads_key_to_cert_mapping(monkeypatch):
+    monkeypatch.setenv("ALL_KEYS", json.dumps({
+        "a.jks": "a.crt",
+        "b.zs2": "",
+        "c.jks": {"cert": "c.crt"}
+    }))
+
+    profiles = profiles_from_env(Path("keys"))
+
+    assert profiles == [
+        KeyProfile.for_files(str(Path("keys") / "a.jks"), str(Path("keys") / "a.crt")),
+        KeyProfile.for_files(str(Path("keys") / "b.zs2"))
+    ]
+
+
+def test_profiles_from_env_ignores_malformed_variable(monkeypatch):
+    monkeypatch.setenv("ALL_KEYS", "{not json")
+    assert profiles_from_env(Path("keys")) == []
+
+
+def test_profiles_from_env_without_variable(monkeypatch):
+    monkeypatch.delenv("ALL_KEYS", raising=False)
+    assert profiles_from_env(Path("keys")) == []
+
+
+def test_status_is_ready_only_after_warmup():
+    status = WarmupStatus()
+    assert not status.ready
+    status.state = "ready"
+    assert status.ready
@@ -0,0 +1,59 @@
+import time
+
+from src.sign.model import SignerConfig
+from src.sign.watcher import WatchSigner
+
+
+def _watcher(tmp_path, monkeypatch, **kwargs):
+    config = SignerConfig(key_file_path="", max_workers=2, max_attempts=1, signer_backend="fake")
+    watcher = WatchSigner(config, [tmp_path], "", settle_time=0.2, **kwargs)
+    # Без watchdog: события передаются через notify
+    monkeypatch.setattr(watcher, "_start_observer", lambda: None)
+    return watcher.start()
+
+
+def _wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.02)
+    return condition()
+
+
+def test_file_is_signed_once_after_it_stops_growing(tmp_path, monkeypatch):
+    watcher = _watcher(tmp_path, monkeypatch)
+    try:
+        document = tmp_path / "claim.pdf"
+        with open(document, "wb") as f:
+            f.write(b"%PDF-1.4\n")
+            f.flush()
+            watcher.notify(str(document))
+            for _ in range(3):
+                time.sleep(0.1)
+                f.write(b"page\n")
+                f.flush()
+                watcher.notify(str(document))
+            assert not (tmp_path / "claim.pdf.p7s").exists()
+
+        assert _wait_for(lambda: watcher.stats["signed"] == 1)
+        assert (tmp_path / "claim.pdf.p7s").exists()
+    finally:
+        watcher.stop()
+
+    assert watcher.stats == {"signed": 1, "failed": 0, "skipped": 0}
+
+
+def test_other_files_and_signed_documents_are_ignored(tmp_path, monkeypatch):
+    (tmp_path / "signed.pdf").write_bytes(b"%PDF-1.4\n")
+    (tmp_path / "signed.pdf.p7s").write_bytes(b"signature")
+    (tmp_path / "notes.txt").write_bytes(b"text")
+
+    results = []
+    watcher = _watcher(tmp_path, monkeypatch, on_result=results.append)
+    try:
+        for name in ("signed.pdf", "signed.pdf.p7s", "notes.txt"):
+            watcher.notify(str(tmp_path / name))
+        assert _wait_for(lambda: watcher.stats["skipped"] == 1)
+    finally:
+        watcher.stop()
+
+    assert results == [] and watcher.stats["signed"] == 0
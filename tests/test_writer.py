@@ -0,0 +1,91 @@
+import os
+import threading
+from concurrent.futures import Future
+
+import pytest
+
+from src.sign.writer import SignatureWriter, write_atomic
+from src.sign.backends import FAKE_SIGNATURE_MAGIC
+from src.sign.report import read_report
+
+
+def test_write_atomic_leaves_no_temp_files(tmp_path):
+    target = tmp_path / "doc.pdf.p7s"
+    target.write_bytes(b"old")
+
+    write_atomic(str(target), b"new", fsync=True)
+
+    assert target.read_bytes() == b"new"
+    assert os.listdir(tmp_path) == ["doc.pdf.p7s"]
+
+
+def test_writer_places_files_and_reports_latency(tmp_path):
+    writer = SignatureWriter(batch_size=4)
+    futures = [writer.submit(str(tmp_path / f"doc_{i}.p7s"), b"sig%d" % i) for i in range(10)]
+    writer.flush()
+
+    assert all(f.result() >= 0 for f in futures)
+    assert len(writer.latencies) == 10
+    assert (tmp_path / "doc_7.p7s").read_bytes() == b"sig7"
+    assert writer.take(str(tmp_path / "doc_7.p7s")) is futures[7]
+    writer.close()
+
+
+def test_writer_fsyncs_files_after_writing_the_group(tmp_path, monkeypatch):
+    writer = SignatureWriter()
+    sizes_at_first_fsync = []
+    fsync = os.fsync
+
+    def recording_fsync(fd):
+        if not sizes_at_first_fsync:
+            sizes_at_first_fsync.extend(
+                os.path.getsize(tmp_path / name) for name in os.listdir(tmp_path) if name.endswith(".tmp")
+            )
+        fsync(fd)
+
+    monkeypatch.setattr(os, "fsync", recording_fsync)
+    batch = [(str(tmp_path / f"doc_{i}.p7s"), b"sig", Future(), 0.0) for i in range(5)]
+
+    writer._write_batch(batch)
+
+    assert sizes_at_first_fsync == [3] * 5
+    assert sorted(os.listdir(tmp_path)) == [f"doc_{i}.p7s" for i in range(5)]
+
+
+def test_writer_failure_is_reported_through_future(tmp_path):
+    writer = SignatureWriter()
+    future = writer.submit(str(tmp_path / "missing" / "doc.p7s"), b"sig")
+    writer.close()
+
+    with pytest.raises(OSError):
+        future.result()
+
+
+def test_batch_results_wait_for_write_behind(tmp_path, make_documents, make_signer):
+    root = tmp_path / "docs"
+    make_documents(root, 8)
+
+    signer = make_signer(
+        max_workers=4,
+        report_dir=tmp_path / "reports",
+        report_format="jsonl"
+    )
+    summary = signer.sign_documents_batch(root, "")
+
+    assert summary.total == summary.successful == 8
+    assert summary.stages["flush"].max > 0
+    for row in read_report(summary.report_path):
+        with open(row["output_path"], "rb") as f:
+            assert f.read().startswith(FAKE_SIGNATURE_MAGIC)
+
+
+def test_batches_do_not_leak_writer_threads(tmp_path, make_documents, make_signer):
+    root = tmp_path / "docs"
+    document = make_documents(root, 1)[0]
+
+    for _ in range(3):
+        signer = make_signer()
+        document.with_name(document.name + ".p7s").unlink(missing_ok=True)
+        assert signer.sign_documents_batch(root, "").successful == 1
+
+    assert not [t for t in threading.enumerate() if t.name == "signature-writer"]